@@ -0,0 +1,122 @@
+"""Benchmark ``/incidents`` serialization on a full page.
+
+Compares the previous response path (``dict_row`` rows rebuilt in Python and
+encoded by FastAPI's ``JSONResponse``) with the current handler, which has
+Postgres build the results array. Both are checked to produce the same
+payload. Runs against ``CRIMEGRID_DB_DSN``:
+
+    cd api && python bench_incidents.py --city chicago --period all --limit 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timezone
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+import main
+
+
+async def legacy_body(city: str, start_at: datetime | None, limit: int) -> bytes:
+    params: list = [city]
+    where = "city = %s AND latitude IS NOT NULL AND longitude IS NOT NULL"
+    if start_at is not None:
+        where += " AND occurred_at >= %s"
+        params.append(start_at)
+    params.append(limit)
+
+    async with main.pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                f"""
+                SELECT id, city, primary_type, description, occurred_at, latitude, longitude
+                FROM incidents
+                WHERE {where}
+                ORDER BY occurred_at DESC, id DESC
+                LIMIT %s
+                """,
+                params,
+            )
+            rows = await cur.fetchall()
+
+    results = [
+        {
+            "id": row["id"],
+            "city": row["city"],
+            "primary_type": row["primary_type"],
+            "description": row["description"],
+            "occurred_at": row["occurred_at"].isoformat() if row["occurred_at"] else None,
+            "latitude": float(row["latitude"]) if row["latitude"] is not None else None,
+            "longitude": float(row["longitude"]) if row["longitude"] is not None else None,
+        }
+        for row in rows
+    ]
+    return JSONResponse({"count": len(results), "results": results}).body
+
+
+async def current_body(city: str, period: str, limit: int) -> bytes:
+    request = Request({"type": "http", "headers": []})  # no conditional headers
+    response = await main.get_incidents(
+        request, city=city, period=period, crime=None, limit=limit, cursor=None, bbox=None
+    )
+    return response.body
+
+
+async def timed(label: str, make_body, repeat: int) -> bytes:
+    body = await make_body()  # warm the pool and plan cache
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = await make_body()
+        samples.append((time.perf_counter() - started) * 1000)
+    print(
+        f"{label:<8} median={statistics.median(samples):7.2f}ms "
+        f"min={min(samples):7.2f}ms bytes={len(body):,}"
+    )
+    return body
+
+
+async def run(city: str, period: str, limit: int, repeat: int) -> None:
+    since = main.PERIOD_MAP[period]
+    start_at = datetime.now(timezone.utc) - since if since is not None else None
+
+    await main.pool.open()
+    try:
+        # The current handler also computes crime-type summaries; time them
+        # separately so the comparison isolates the page itself.
+        async with main.pool.connection() as conn:
+            async with conn.cursor() as cur:
+                started = time.perf_counter()
+                await main.fetch_crime_type_counts(cur, city, start_at)
+                summary_ms = (time.perf_counter() - started) * 1000
+
+        legacy = await timed("legacy", lambda: legacy_body(city, start_at, limit), repeat)
+        current = await timed("current", lambda: current_body(city, period, limit), repeat)
+        print(f"(current includes crime-type summaries, ~{summary_ms:.2f}ms)")
+
+        legacy_payload, current_payload = json.loads(legacy), json.loads(current)
+        if legacy_payload["results"] != current_payload["results"]:
+            raise SystemExit("result payloads differ")
+        print(f"payloads match ({current_payload['count']} rows)")
+    finally:
+        await main.pool.close()
+
+
+def cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--city", default="chicago")
+    parser.add_argument("--period", default="all", choices=sorted(main.PERIOD_MAP))
+    parser.add_argument("--limit", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.city, args.period, args.limit, args.repeat))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    cli()
@@ -0,0 +1,51 @@
+"""Benchmark rate-limit checks against the configured backend.
+
+Times ``rate_limiter.check`` for one IP bucket plus one API-key bucket, as
+``authorize`` does, spread over many IPs. Set
+``CRIMEGRID_RATE_LIMIT_BACKEND=redis`` and ``CRIMEGRID_REDIS_URL`` to measure
+the shared backend:
+
+    cd api && CRIMEGRID_RATE_LIMIT_BACKEND=redis python bench_rate_limit.py --checks 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import main
+
+
+async def run(checks: int, ips: int) -> None:
+    limits = [main.rate_limits(f"10.0.{i // 256}.{i % 256}", "bench-key") for i in range(ips)]
+    for ip_limits in limits[:100]:  # warm connections and the script cache
+        await main.rate_limiter.check(ip_limits)
+
+    samples = []
+    for i in range(checks):
+        started = time.perf_counter()
+        await main.rate_limiter.check(limits[i % ips])
+        samples.append((time.perf_counter() - started) * 1_000_000)
+    samples.sort()
+
+    print(
+        f"{main.RATE_LIMIT_BACKEND}: checks={checks:,} "
+        f"p50={statistics.median(samples):.1f}us "
+        f"p99={samples[int(len(samples) * 0.99) - 1]:.1f}us "
+        f"max={samples[-1]:.1f}us"
+    )
+    await main.close_rate_limiter()
+
+
+def cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--checks", type=int, default=20000)
+    parser.add_argument("--ips", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(run(args.checks, args.ips))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    cli()
@@ -1,19 +1,54 @@
 from __future__ import annotations
 
+import asyncio
 import base64
+import csv
+import hashlib
+import io
+import json
+import logging
+import math
 import os
 import secrets
+import sys
 import time
-from collections import defaultdict, deque
 from datetime import datetime, timedelta, timezone
-from typing import Deque, Dict, List, Optional
+from email.utils import format_datetime, parsedate_to_datetime
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
+import anyio
 from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.security.api_key import APIKeyHeader
 from fastapi.openapi.utils import get_openapi
-from psycopg.rows import dict_row
-from psycopg_pool import ConnectionPool
+from psycopg.rows import dict_row, tuple_row
+from psycopg_pool import AsyncConnectionPool, PoolClosed, PoolTimeout, TooManyRequests
+from starlette.types import Receive, Scope, Send
+
+# The API runs from api/; make the repo's shared packages importable.
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from packages.ingestion.db.instrumentation import AsyncInstrumentedCursor
+
+from metrics import (
+    RATE_LIMITED,
+    PrometheusMiddleware,
+    observe_query,
+    observe_serialization,
+    register_pool,
+    render as render_metrics,
+)
+from rate_limit import RateLimiter, RedisRateLimiter
+from tile_cache import TileCache
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow export is optional
+    pa = None
+
+LOG = logging.getLogger(__name__)
 
 # -----------------------------
 # Config / Environment
@@ -54,8 +89,51 @@ def _load_cors_origins() -> list[str] | str:
 
 CORS_ORIGINS = _load_cors_origins()
 
-RATE_LIMIT_MAX = int(os.getenv("CRIMEGRID_RATE_LIMIT", "120"))   # requests
+RATE_LIMIT_MAX = int(os.getenv("CRIMEGRID_RATE_LIMIT", "120"))   # requests per client IP; 0 = off
 RATE_LIMIT_WIN = int(os.getenv("CRIMEGRID_RATE_WINDOW", "60"))   # seconds
+RATE_LIMIT_MAX_KEYS = int(os.getenv("CRIMEGRID_RATE_LIMIT_MAX_KEYS", "100000"))  # buckets tracked at once (memory backend)
+RATE_LIMIT_BACKEND = os.getenv("CRIMEGRID_RATE_LIMIT_BACKEND", "memory")   # memory (per worker) or redis (shared)
+REDIS_URL = os.getenv("CRIMEGRID_REDIS_URL", "redis://localhost:6379/0")
+REDIS_TIMEOUT = float(os.getenv("CRIMEGRID_REDIS_TIMEOUT", "0.05"))        # seconds; on timeout requests are allowed
+
+KEY_RATE_LIMIT = int(os.getenv("CRIMEGRID_KEY_RATE_LIMIT", "600"))   # requests per API key, across IPs; 0 = off
+KEY_RATE_WIN = int(os.getenv("CRIMEGRID_KEY_RATE_WINDOW", "60"))     # seconds
+
+def _load_key_quotas() -> Dict[str, Tuple[int, int]]:
+    """Per-key overrides from ``key=requests/seconds,...``."""
+    quotas: Dict[str, Tuple[int, int]] = {}
+    for item in os.getenv("CRIMEGRID_KEY_QUOTAS", "").split(","):
+        if not item.strip():
+            continue
+        key, _, quota = item.strip().rpartition("=")
+        max_requests, _, window = quota.partition("/")
+        quotas[key] = (int(max_requests), int(window or KEY_RATE_WIN))
+    return quotas
+
+KEY_QUOTAS = _load_key_quotas()
+
+# Buckets refill at requests / window per second; a zero window would divide by zero.
+if min([RATE_LIMIT_WIN, KEY_RATE_WIN] + [window for _, window in KEY_QUOTAS.values()]) <= 0:
+    raise RuntimeError("CRIMEGRID_RATE_WINDOW, CRIMEGRID_KEY_RATE_WINDOW and CRIMEGRID_KEY_QUOTAS windows must be positive")
+
+DB_POOL_MIN_SIZE = int(os.getenv("CRIMEGRID_DB_POOL_MIN", "2"))
+DB_POOL_MAX_SIZE = int(os.getenv("CRIMEGRID_DB_POOL_MAX", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("CRIMEGRID_DB_POOL_TIMEOUT", "5"))        # seconds to wait for a connection
+DB_POOL_MAX_WAITING = int(os.getenv("CRIMEGRID_DB_POOL_MAX_WAITING", "0"))  # queued requests before 503; 0 = unbounded
+DB_POOL_RETRY_AFTER = int(os.getenv("CRIMEGRID_DB_POOL_RETRY_AFTER", "1"))  # Retry-After seconds on 503
+
+TILE_CACHE_SIZE = int(os.getenv("CRIMEGRID_TILE_CACHE_SIZE", "2000"))              # tiles kept in memory
+TILE_CACHE_TTL = float(os.getenv("CRIMEGRID_TILE_CACHE_TTL", "300"))               # seconds
+TILE_CACHE_DIR = os.getenv("CRIMEGRID_TILE_CACHE_DIR") or None                     # unset = memory only
+TILE_MAX_FEATURES = int(os.getenv("CRIMEGRID_TILE_MAX_FEATURES", "20000"))         # newest first per tile
+TILE_INVALIDATION_POLL = float(os.getenv("CRIMEGRID_TILE_INVALIDATION_POLL", "30"))  # seconds
+
+CACHE_MAX_AGE = int(os.getenv("CRIMEGRID_CACHE_MAX_AGE", "60"))                  # Cache-Control max-age, seconds
+CACHE_WINDOW_SECONDS = int(os.getenv("CRIMEGRID_CACHE_WINDOW_SECONDS", "900"))   # ETag bucket for sliding periods
+INGEST_STATE_POLL = float(os.getenv("CRIMEGRID_INGEST_STATE_POLL", "15"))        # seconds
+
+EXPORT_BATCH_SIZE = int(os.getenv("CRIMEGRID_EXPORT_BATCH_SIZE", "5000"))        # rows per server-side cursor fetch
+EXPORT_MAX_CONCURRENT = int(os.getenv("CRIMEGRID_EXPORT_MAX_CONCURRENT", "2"))   # each export holds a pool connection
 
 # -----------------------------
 # App & Middleware
@@ -70,26 +148,58 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(PrometheusMiddleware)
 
 # -----------------------------
 # DB Pool
 # -----------------------------
 
-pool = ConnectionPool(
+pool = AsyncConnectionPool(
     conninfo=DATABASE_URL,
-    min_size=1,
-    max_size=5,
-    kwargs={"row_factory": dict_row},
+    min_size=DB_POOL_MIN_SIZE,
+    max_size=DB_POOL_MAX_SIZE,
+    timeout=DB_POOL_TIMEOUT,
+    max_waiting=DB_POOL_MAX_WAITING,
+    kwargs={"row_factory": dict_row, "cursor_factory": AsyncInstrumentedCursor},
+    open=False,
 )
+pool_metrics = register_pool(pool)
 
 @app.on_event("startup")
-def open_pool() -> None:
+async def open_pool() -> None:
     if pool.closed:
-        pool.open()
+        await pool.open()
 
 @app.on_event("shutdown")
-def close_pool() -> None:
-    pool.close()
+async def close_pool() -> None:
+    await pool.close()
+
+@app.exception_handler(PoolTimeout)
+@app.exception_handler(TooManyRequests)
+async def pool_exhausted(request: Request, exc: Exception) -> JSONResponse:
+    # Fail fast with a retry hint instead of letting clients hang on a saturated pool.
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Database busy, retry shortly"},
+        headers={"Retry-After": str(DB_POOL_RETRY_AFTER)},
+    )
+
+def pool_stats() -> dict:
+    stats = pool.get_stats()
+    requests = stats.get("requests_num", 0)
+    wait_ms = stats.get("requests_wait_ms", 0)
+    return {
+        "size": stats.get("pool_size", 0),
+        "available": stats.get("pool_available", 0),
+        "min_size": pool.min_size,
+        "max_size": pool.max_size,
+        "requests_waiting": stats.get("requests_waiting", 0),
+        "requests": requests,
+        "requests_queued": stats.get("requests_queued", 0),
+        "requests_rejected": stats.get("requests_errors", 0),
+        "wait_ms_total": wait_ms,
+        "wait_ms_avg": round(wait_ms / requests, 2) if requests else 0.0,
+    }
 
 # -----------------------------
 # Domain constants
@@ -128,28 +238,59 @@ PERIOD_MAP = {
     "all": None,
 }
 
+# Geohash length used to cluster at each web-map zoom level, chosen so a cell
+# spans very roughly 40-100px on screen. geohash7 (~150m) is the stored maximum.
+CLUSTER_PRECISION_BY_ZOOM = (
+    (3, 2),   # zoom <= 3: ~1250km cells
+    (6, 3),   # ~156km
+    (8, 4),   # ~39km
+    (11, 5),  # ~4.9km
+    (13, 6),  # ~1.2km
+)
+MAX_CLUSTER_PRECISION = 7
+
+def cluster_precision(zoom: int) -> int:
+    for max_zoom, precision in CLUSTER_PRECISION_BY_ZOOM:
+        if zoom <= max_zoom:
+            return precision
+    return MAX_CLUSTER_PRECISION
+
 # -----------------------------
 # Rate limiting
 # -----------------------------
 
-class RateLimiter:
-    def __init__(self, max_requests: int, window_seconds: int) -> None:
-        self.max_requests = max_requests
-        self.window = window_seconds
-        self._requests: Dict[str, Deque[float]] = defaultdict(deque)
+def build_rate_limiter():
+    if RATE_LIMIT_BACKEND == "redis":
+        import redis.asyncio as redis
 
-    def check(self, identity: str) -> None:
-        now = time.time()
-        q = self._requests[identity]
-        # drop expired
-        while q and q[0] <= now - self.window:
-            q.popleft()
-        # enforce
-        if len(q) >= self.max_requests:
-            raise HTTPException(status_code=429, detail="Rate limit exceeded")
-        q.append(now)
+        client = redis.Redis.from_url(
+            REDIS_URL,
+            socket_timeout=REDIS_TIMEOUT,
+            socket_connect_timeout=REDIS_TIMEOUT,
+        )
+        return RedisRateLimiter(client)
+    if RATE_LIMIT_BACKEND != "memory":
+        raise RuntimeError(f"Unknown CRIMEGRID_RATE_LIMIT_BACKEND {RATE_LIMIT_BACKEND!r}")
+    return RateLimiter(RATE_LIMIT_MAX_KEYS)
+
+rate_limiter = build_rate_limiter()
 
-rate_limiter = RateLimiter(RATE_LIMIT_MAX, RATE_LIMIT_WIN)
+@app.on_event("shutdown")
+async def close_rate_limiter() -> None:
+    if isinstance(rate_limiter, RedisRateLimiter):
+        await rate_limiter.close()
+
+def rate_limits(client_ip: str, api_key: Optional[str]) -> List[Tuple[str, int, float]]:
+    limits = []
+    if RATE_LIMIT_MAX > 0:
+        limits.append((f"ip:{client_ip}", RATE_LIMIT_MAX, RATE_LIMIT_WIN))
+    if api_key:
+        max_requests, window = KEY_QUOTAS.get(api_key, (KEY_RATE_LIMIT, KEY_RATE_WIN))
+        if max_requests > 0:
+            # Buckets are named by a digest so keys never reach the shared store.
+            key_id = hashlib.blake2b(api_key.encode(), digest_size=8).hexdigest()
+            limits.append((f"key:{key_id}", max_requests, window))
+    return limits
 
 # -----------------------------
 # API key auth
@@ -157,7 +298,7 @@ rate_limiter = RateLimiter(RATE_LIMIT_MAX, RATE_LIMIT_WIN)
 
 api_key_header = APIKeyHeader(name="x-api-key", auto_error=False)
 
-def verify_api_key(x_api_key: Optional[str] = Header(default=None)) -> bool:
+async def verify_api_key(x_api_key: Optional[str] = Header(default=None)) -> bool:
     # If API_KEYS empty, treat as open (dev escape hatch)
     if not API_KEYS:
         return True
@@ -169,9 +310,20 @@ def verify_api_key(x_api_key: Optional[str] = Header(default=None)) -> bool:
             return True
     raise HTTPException(status_code=403, detail="Invalid API key")
 
-def authorize(request: Request, _: bool = Depends(verify_api_key)) -> None:
+async def authorize(
+    request: Request,
+    _: bool = Depends(verify_api_key),
+    x_api_key: Optional[str] = Header(default=None),
+) -> None:
     client_ip = request.client.host if request.client else "anonymous"
-    rate_limiter.check(client_ip)
+    wait = await rate_limiter.check(rate_limits(client_ip, x_api_key))
+    if wait > 0:
+        RATE_LIMITED.inc()
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": str(math.ceil(wait))},
+        )
 
 # -----------------------------
 # OpenAPI security (for /docs -> "Authorize")
@@ -203,17 +355,32 @@ def custom_openapi():
 app.openapi = custom_openapi
 
 # -----------------------------
-# Routes
+# Serialization
 # -----------------------------
 
-@app.get("/incidents", dependencies=[Depends(authorize)])
-def get_incidents(
-    city: str = Query(..., description="City identifier, e.g. 'chicago'"),
-    period: str = Query("30d", description="Time window: 24h, 7d, 30d, 90d, 365d, all"),
-    crime: Optional[str] = Query(None, description="Crime primary_type to filter"),
-    limit: int = Query(1000, ge=1, le=5000, description="Max incidents to return"),
-    cursor: Optional[str] = Query(None, description="Opaque cursor for pagination"),
-):
+class RawJSON(str):
+    """Already-serialized JSON that :func:`json_response` splices in verbatim."""
+
+def json_response(payload: dict) -> Response:
+    """Encode a flat response envelope, embedding ``RawJSON`` values as-is.
+
+    Lets large arrays built by Postgres skip a decode/re-encode round trip
+    through Python objects.
+    """
+    parts = []
+    for key, value in payload.items():
+        encoded = value if isinstance(value, RawJSON) else json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        parts.append(f"{json.dumps(key)}:{encoded}")
+    return Response(content="{" + ",".join(parts) + "}", media_type="application/json")
+
+# -----------------------------
+# Filters
+# -----------------------------
+
+BBox = Tuple[float, float, float, float]
+
+def resolve_window(city: str, period: str) -> Tuple[str, Optional[datetime]]:
+    """Validate city/period, returning the city key and period start (None = all)."""
     city_key = city.lower()
     if city_key not in ALLOWED_CITIES:
         raise HTTPException(status_code=400, detail="Unsupported city")
@@ -225,7 +392,27 @@ def get_incidents(
     start_at: Optional[datetime] = None
     if since is not None:
         start_at = datetime.now(timezone.utc) - since
+    return city_key, start_at
 
+def parse_bbox(bbox: Optional[str]) -> Optional[BBox]:
+    """Parse ``minLng,minLat,maxLng,maxLat`` (WGS84) or raise a 400."""
+    if bbox is None:
+        return None
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(part) for part in bbox.split(","))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="bbox must be minLng,minLat,maxLng,maxLat") from exc
+    if not (-180 <= min_lng <= max_lng <= 180 and -90 <= min_lat <= max_lat <= 90):
+        raise HTTPException(status_code=400, detail="bbox out of range or min > max")
+    return min_lng, min_lat, max_lng, max_lat
+
+def incident_filters(
+    city_key: str,
+    start_at: Optional[datetime],
+    crime: Optional[str],
+    bbox: Optional[BBox],
+) -> Tuple[List[str], List[object]]:
+    """WHERE clauses and params shared by the incident endpoints."""
     params: List[object] = [city_key]
     where_clauses = ["city = %s", "latitude IS NOT NULL", "longitude IS NOT NULL"]
 
@@ -237,6 +424,205 @@ def get_incidents(
         where_clauses.append("primary_type = %s")
         params.append(crime.upper())
 
+    if bbox is not None:
+        # && is index-assisted by incidents_geom_idx (GIST).
+        where_clauses.append("geom && ST_MakeEnvelope(%s, %s, %s, %s, 4326)")
+        params.extend(bbox)
+
+    return where_clauses, params
+
+# -----------------------------
+# Summaries
+# -----------------------------
+
+async def fetch_crime_type_counts(cur, city_key: str, start_at: Optional[datetime]) -> List[dict]:
+    """Per-primary_type counts for a city since ``start_at`` (all time if None).
+
+    Whole UTC days come from ``incident_daily_summary``; the partial first
+    day of a windowed period is counted live from ``incidents`` (a short
+    range on ``incidents_city_occurred_idx``), so totals stay exact.
+    """
+    await cur.execute(
+        """
+        WITH buckets AS (
+            SELECT primary_type, incident_count AS count, last_occurred_at
+            FROM incident_daily_summary
+            WHERE city = %(city)s
+              AND (%(start_at)s::timestamptz IS NULL
+                   OR day > (%(start_at)s::timestamptz AT TIME ZONE 'UTC')::date)
+            UNION ALL
+            SELECT primary_type, COUNT(*), MAX(occurred_at)
+            FROM incidents
+            WHERE %(start_at)s::timestamptz IS NOT NULL
+              AND city = %(city)s
+              AND occurred_at >= %(start_at)s::timestamptz
+              AND occurred_at < (
+                  ((%(start_at)s::timestamptz AT TIME ZONE 'UTC')::date + 1)::timestamp AT TIME ZONE 'UTC'
+              )
+            GROUP BY primary_type
+        )
+        SELECT primary_type, SUM(count)::bigint AS count, MAX(last_occurred_at) AS last_occurred_at
+        FROM buckets
+        GROUP BY primary_type
+        HAVING SUM(count) > 0
+        ORDER BY count DESC
+        """,
+        {"city": city_key, "start_at": start_at},
+    )
+    return await cur.fetchall()
+
+def summarize_aggregates(crime_counts: List[dict]) -> dict:
+    last_occurred_at = max(
+        (row["last_occurred_at"] for row in crime_counts if row["last_occurred_at"]),
+        default=None,
+    )
+    return {
+        "total_incidents": sum(row["count"] for row in crime_counts),
+        "last_occurred_at": last_occurred_at.isoformat() if last_occurred_at else None,
+    }
+
+# -----------------------------
+# Conditional requests
+# -----------------------------
+
+# city -> (latest succeeded ingest run id, its completion time), refreshed in
+# the background so validators can be checked without touching the database.
+ingest_state: Dict[str, Tuple[int, datetime]] = {}
+
+async def watch_ingest_state() -> None:
+    while True:
+        try:
+            async with pool.connection() as conn:
+                async with conn.cursor() as cur:
+                    await cur.execute(
+                        """
+                        SELECT city, last_ingest_run_id, last_ingest_at
+                        FROM city_stats
+                        WHERE last_ingest_run_id IS NOT NULL AND last_ingest_at IS NOT NULL
+                        """
+                    )
+                    rows = await cur.fetchall()
+            ingest_state.clear()
+            ingest_state.update({row["city"]: (row["last_ingest_run_id"], row["last_ingest_at"]) for row in rows})
+        except asyncio.CancelledError:
+            raise
+        except PoolClosed:  # shutting down; the pool closes before watchers are cancelled
+            return
+        except Exception:  # keep the last known state; responses just stay uncached
+            LOG.warning("Ingest state poll failed", exc_info=True)
+        await asyncio.sleep(INGEST_STATE_POLL)
+
+_ingest_watcher: Optional[asyncio.Task] = None
+
+@app.on_event("startup")
+async def start_ingest_watcher() -> None:
+    global _ingest_watcher
+    _ingest_watcher = asyncio.create_task(watch_ingest_state())
+
+@app.on_event("shutdown")
+async def stop_ingest_watcher() -> None:
+    if _ingest_watcher is not None:
+        _ingest_watcher.cancel()
+
+def cache_validators(
+    scope: str,
+    cities: List[str],
+    period: Optional[str],
+    params: Dict[str, object],
+) -> Optional[Tuple[str, datetime]]:
+    """Weak ETag and Last-Modified for a response derived from ``cities``' data.
+
+    The ETag covers ``scope``, ``period`` and ``params``, so different queries
+    never share one. Both change when a new ingest run succeeds for any of
+    the cities. Sliding
+    periods (``24h`` ... ``365d``) also roll over every CACHE_WINDOW_SECONDS,
+    since rows age out of them between ingests. Returns None while ingest
+    state is unknown.
+    """
+    states = [ingest_state.get(city) for city in cities]
+    if not states or any(state is None for state in states):
+        return None
+
+    last_modified = max(state[1] for state in states)
+    bucket = None
+    if period is not None and PERIOD_MAP.get(period) is not None:
+        bucket = int(time.time() // CACHE_WINDOW_SECONDS)
+        bucket_start = datetime.fromtimestamp(bucket * CACHE_WINDOW_SECONDS, timezone.utc)
+        last_modified = max(last_modified, bucket_start)
+
+    key = json.dumps(
+        [scope, [state[0] for state in states], period, bucket, sorted(params.items())],
+        default=str,
+        separators=(",", ":"),
+    )
+    etag = 'W/"' + hashlib.blake2b(key.encode(), digest_size=12).hexdigest() + '"'
+    return etag, last_modified.replace(microsecond=0)
+
+def not_modified(request: Request, validators: Optional[Tuple[str, datetime]]) -> Optional[Response]:
+    """A 304 response if the request's conditional headers match ``validators``."""
+    if validators is None:
+        return None
+    etag, last_modified = validators
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Weak comparison: W/"x" and "x" match.
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        matched = "*" in candidates or etag.removeprefix("W/") in candidates
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since is None:
+            return None
+        try:
+            matched = last_modified <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return None
+
+    if not matched:
+        return None
+    response = Response(status_code=304)
+    apply_cache_headers(response, validators)
+    return response
+
+def apply_cache_headers(response: Response, validators: Optional[Tuple[str, datetime]]) -> None:
+    if validators is None:
+        response.headers["Cache-Control"] = "no-cache"
+        return
+    etag, last_modified = validators
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    response.headers["Cache-Control"] = f"public, max-age={CACHE_MAX_AGE}"
+    # Responses depend on the caller's key being valid; keep shared caches per key.
+    response.headers["Vary"] = "X-API-Key"
+
+# -----------------------------
+# Routes
+# -----------------------------
+
+@app.get("/incidents", dependencies=[Depends(authorize)])
+async def get_incidents(
+    request: Request,
+    city: str = Query(..., description="City identifier, e.g. 'chicago'"),
+    period: str = Query("30d", description="Time window: 24h, 7d, 30d, 90d, 365d, all"),
+    crime: Optional[str] = Query(None, description="Crime primary_type to filter"),
+    limit: int = Query(1000, ge=1, le=5000, description="Max incidents to return"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor for pagination"),
+    bbox: Optional[str] = Query(None, description="Viewport filter: minLng,minLat,maxLng,maxLat"),
+):
+    city_key, start_at = resolve_window(city, period)
+    bbox_filter = parse_bbox(bbox)
+    validators = cache_validators(
+        "incidents",
+        [city_key],
+        period,
+        {"crime": crime.upper() if crime else None, "limit": limit, "cursor": cursor, "bbox": bbox_filter},
+    )
+    cached = not_modified(request, validators)
+    if cached is not None:
+        return cached
+
+    where_clauses, params = incident_filters(city_key, start_at, crime, bbox_filter)
+
     if cursor:
         try:
             cursor_decoded = base64.urlsafe_b64decode(cursor.encode()).decode()
@@ -247,96 +633,511 @@ def get_incidents(
         except Exception as exc:  # invalid cursor
             raise HTTPException(status_code=400, detail="Invalid cursor") from exc
 
+    # Postgres renders the page as a JSON array (row_to_json keeps column
+    # order and emits compact output), so rows never become Python objects.
+    # The oldest row's key is returned alongside to build the next cursor.
     query = f"""
-        SELECT id, city, primary_type, description, occurred_at, latitude, longitude
-        FROM incidents
-        WHERE {' AND '.join(where_clauses)}
-        ORDER BY occurred_at DESC, id DESC
-        LIMIT %s
+        WITH page AS (
+            SELECT id, city, primary_type, description, occurred_at, latitude, longitude
+            FROM incidents
+            WHERE {' AND '.join(where_clauses)}
+            ORDER BY occurred_at DESC, id DESC
+            LIMIT %s
+        )
+        SELECT
+            COUNT(*) AS count,
+            COALESCE('[' || string_agg(row_to_json(page)::text, ',' ORDER BY occurred_at DESC, id DESC) || ']', '[]')
+                AS results,
+            (array_agg(occurred_at ORDER BY occurred_at, id))[1] AS last_occurred_at,
+            (array_agg(id ORDER BY occurred_at, id))[1] AS last_id
+        FROM page
     """
     params.append(limit)
 
-    with pool.connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(query, params)
-            rows = cur.fetchall()
-
-            cur.execute(
-                """
-                SELECT primary_type, COUNT(*) AS count
-                FROM incidents
-                WHERE city = %s
-                GROUP BY primary_type
-                ORDER BY count DESC
-                """,
-                (city_key,),
-            )
-            crime_counts = cur.fetchall()
-
-            cur.execute(
-                """
-                SELECT COUNT(*) AS total, MAX(occurred_at) AS last_occurred_at
-                FROM incidents
-                WHERE city = %s
-                """,
-                (city_key,),
-            )
-            aggregates = cur.fetchone()
-
-    results = [
-        {
-            "id": row["id"],
-            "city": row["city"],
-            "primary_type": row["primary_type"],
-            "description": row["description"],
-            "occurred_at": row["occurred_at"].isoformat() if row["occurred_at"] else None,
-            "latitude": float(row["latitude"]) if row["latitude"] is not None else None,
-            "longitude": float(row["longitude"]) if row["longitude"] is not None else None,
-        }
-        for row in rows
-    ]
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            with observe_query("incidents_page"):
+                await cur.execute(query, params)
+                page = await cur.fetchone()
+
+            # Summaries describe the whole period, so only the first page
+            # computes them; cursor pages return null instead.
+            crime_counts = None
+            if not cursor:
+                with observe_query("crime_type_counts"):
+                    crime_counts = await fetch_crime_type_counts(cur, city_key, start_at)
 
     next_cursor = None
-    if len(results) == limit:
-        last = results[-1]
-        if last["occurred_at"]:
-            cursor_payload = f"{last['occurred_at']}|{last['id']}"
-            next_cursor = base64.urlsafe_b64encode(cursor_payload.encode()).decode()
+    if page["count"] == limit and page["last_occurred_at"]:
+        cursor_payload = f"{page['last_occurred_at'].isoformat()}|{page['last_id']}"
+        next_cursor = base64.urlsafe_b64encode(cursor_payload.encode()).decode()
 
+    with observe_serialization("/incidents"):
+        response = json_response({
+            "city": city_key,
+            "period": period,
+            "count": page["count"],
+            "results": RawJSON(page["results"]),
+            "next_cursor": next_cursor,
+            "crime_type_counts": (
+                [{"primary_type": row["primary_type"], "count": row["count"]} for row in crime_counts]
+                if crime_counts is not None
+                else None
+            ),
+            "aggregates": summarize_aggregates(crime_counts) if crime_counts is not None else None,
+        })
+    apply_cache_headers(response, validators)
+    return response
+
+@app.get("/incidents/clusters", dependencies=[Depends(authorize)])
+async def get_incident_clusters(
+    request: Request,
+    response: Response,
+    city: str = Query(..., description="City identifier, e.g. 'chicago'"),
+    zoom: int = Query(..., ge=0, le=22, description="Web map zoom level"),
+    period: str = Query("30d", description="Time window: 24h, 7d, 30d, 90d, 365d, all"),
+    crime: Optional[str] = Query(None, description="Crime primary_type to filter"),
+    bbox: Optional[str] = Query(None, description="Viewport filter: minLng,minLat,maxLng,maxLat"),
+    limit: int = Query(500, ge=1, le=5000, description="Max cells to return (densest first)"),
+):
+    city_key, start_at = resolve_window(city, period)
+    bbox_filter = parse_bbox(bbox)
+    validators = cache_validators(
+        "clusters",
+        [city_key],
+        period,
+        {"zoom": zoom, "crime": crime.upper() if crime else None, "bbox": bbox_filter, "limit": limit},
+    )
+    cached = not_modified(request, validators)
+    if cached is not None:
+        return cached
+
+    where_clauses, params = incident_filters(city_key, start_at, crime, bbox_filter)
+    where_clauses.append("geohash7 IS NOT NULL")
+    precision = cluster_precision(zoom)
+
+    # Cells are prefixes of the stored geohash7, so grouping needs no
+    # geometry work. Each cell is placed at the mean of its points.
+    query = f"""
+        WITH by_type AS (
+            SELECT
+                left(geohash7, %s) AS cell,
+                primary_type,
+                COUNT(*) AS count,
+                SUM(latitude) AS lat_sum,
+                SUM(longitude) AS lng_sum
+            FROM incidents
+            WHERE {' AND '.join(where_clauses)}
+            GROUP BY 1, 2
+        )
+        SELECT
+            cell,
+            SUM(count)::bigint AS count,
+            SUM(lat_sum) / SUM(count) AS latitude,
+            SUM(lng_sum) / SUM(count) AS longitude,
+            json_object_agg(primary_type, count ORDER BY count DESC, primary_type) AS crime_type_counts,
+            SUM(SUM(count)) OVER ()::bigint AS total_incidents,
+            COUNT(*) OVER () AS total_cells
+        FROM by_type
+        GROUP BY cell
+        ORDER BY count DESC, cell
+        LIMIT %s
+    """
+
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            with observe_query("incident_clusters"):
+                await cur.execute(query, [precision, *params, limit])
+                rows = await cur.fetchall()
+
+    total_cells = rows[0]["total_cells"] if rows else 0
+    apply_cache_headers(response, validators)
     return {
         "city": city_key,
         "period": period,
-        "count": len(results),
-        "results": results,
-        "next_cursor": next_cursor,
-        "crime_type_counts": [
-            {"primary_type": row["primary_type"], "count": row["count"]} for row in crime_counts
+        "zoom": zoom,
+        "precision": precision,
+        "count": len(rows),
+        "total_incidents": rows[0]["total_incidents"] if rows else 0,
+        "truncated": total_cells > len(rows),
+        "clusters": [
+            {
+                "geohash": row["cell"],
+                "count": row["count"],
+                "latitude": row["latitude"],
+                "longitude": row["longitude"],
+                "crime_type_counts": row["crime_type_counts"],
+            }
+            for row in rows
         ],
-        "aggregates": {
-            "total_incidents": (aggregates["total"] if aggregates else None),
-            "last_occurred_at": (
-                aggregates["last_occurred_at"].isoformat()
-                if (aggregates and aggregates["last_occurred_at"])
-                else None
+    }
+
+# -----------------------------
+# Bulk export
+# -----------------------------
+
+# Column name -> Arrow type; also the CSV header and NDJSON key order.
+EXPORT_COLUMNS: List[Tuple[str, str]] = [
+    ("id", "string"),
+    ("city", "string"),
+    ("primary_type", "string"),
+    ("description", "string"),
+    ("iucr", "string"),
+    ("occurred_at", "timestamp"),
+    ("reported_at", "timestamp"),
+    ("arrest", "bool"),
+    ("domestic", "bool"),
+    ("district", "string"),
+    ("beat", "string"),
+    ("ward", "string"),
+    ("community_area", "string"),
+    ("location_description", "string"),
+    ("street_block", "string"),
+    ("latitude", "float64"),
+    ("longitude", "float64"),
+]
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+}
+
+# End-of-stream marker of the Arrow IPC streaming format.
+ARROW_EOS = b"\xff\xff\xff\xff\x00\x00\x00\x00"
+
+export_slots = asyncio.Semaphore(EXPORT_MAX_CONCURRENT)
+
+def arrow_schema():
+    types = {"string": pa.string(), "timestamp": pa.timestamp("us", tz="UTC"), "bool": pa.bool_(), "float64": pa.float64()}
+    return pa.schema([(name, types[kind]) for name, kind in EXPORT_COLUMNS])
+
+def csv_value(value: object) -> object:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+async def stream_export(query: str, params: List[object], fmt: str) -> AsyncIterator[bytes]:
+    """Run an export query on a server-side cursor and yield it batch by batch.
+
+    The first chunk (the CSV header or Arrow schema; empty for NDJSON) is
+    produced once the query has started, so callers can await it to surface
+    pool and query errors before the response begins. Only one batch of rows
+    is held in memory at a time.
+    """
+    # Exports can run for minutes while holding a connection, so cap how many
+    # run at once rather than letting them drain the pool.
+    if export_slots.locked():
+        raise HTTPException(
+            status_code=503,
+            detail="Too many exports in progress, retry shortly",
+            headers={"Retry-After": str(DB_POOL_RETRY_AFTER)},
+        )
+    async with export_slots:
+        conn = await pool.getconn()
+        try:
+            # A named cursor keeps the result set on the server; rows are
+            # fetched EXPORT_BATCH_SIZE at a time as the client reads.
+            cur = conn.cursor(name="incident_export", row_factory=tuple_row)
+            with observe_query("export_open"):
+                await cur.execute(query, params)
+
+            if fmt == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer, lineterminator="\n")
+                writer.writerow([name for name, _ in EXPORT_COLUMNS])
+                yield buffer.getvalue().encode()
+            elif fmt == "arrow":
+                schema = arrow_schema()
+                yield schema.serialize().to_pybytes()
+            else:
+                yield b""
+
+            while True:
+                rows = await cur.fetchmany(EXPORT_BATCH_SIZE)
+                if not rows:
+                    break
+                if fmt == "csv":
+                    buffer.seek(0)
+                    buffer.truncate()
+                    writer.writerows([csv_value(value) for value in row] for row in rows)
+                    yield buffer.getvalue().encode()
+                elif fmt == "arrow":
+                    batch = pa.RecordBatch.from_arrays(
+                        [pa.array(column, type=field.type) for column, field in zip(zip(*rows), schema)],
+                        schema=schema,
+                    )
+                    yield batch.serialize().to_pybytes()
+                else:
+                    # Postgres already rendered each row as a JSON object.
+                    yield ("\n".join(row[0] for row in rows) + "\n").encode()
+
+            if fmt == "arrow":
+                yield ARROW_EOS
+        finally:
+            # Also runs when the client disconnects mid-stream; shield the
+            # cleanup so the connection always goes back to the pool.
+            with anyio.CancelScope(shield=True):
+                try:
+                    await conn.rollback()
+                except Exception:  # a broken connection is discarded by the pool
+                    pass
+                await pool.putconn(conn)
+
+async def prepend(first: bytes, rest: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    try:
+        yield first
+        async for chunk in rest:
+            yield chunk
+    finally:
+        # Close the export generator so its connection goes back to the pool
+        # now rather than whenever the abandoned generator is collected.
+        await rest.aclose()
+
+class ExportResponse(StreamingResponse):
+    """StreamingResponse that closes its body iterator however streaming ends.
+
+    Starlette stops iterating when the client disconnects but leaves the
+    iterator suspended; closing it runs ``stream_export``'s cleanup.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            with anyio.CancelScope(shield=True):
+                await self.body_iterator.aclose()
+
+@app.get("/incidents/export", dependencies=[Depends(authorize)])
+async def export_incidents(
+    city: str = Query(..., description="City identifier, e.g. 'chicago'"),
+    period: str = Query("30d", description="Time window: 24h, 7d, 30d, 90d, 365d, all"),
+    crime: Optional[str] = Query(None, description="Crime primary_type to filter"),
+    bbox: Optional[str] = Query(None, description="Viewport filter: minLng,minLat,maxLng,maxLat"),
+    format: str = Query("ndjson", description="ndjson, csv or arrow (Arrow IPC stream)"),
+):
+    city_key, start_at = resolve_window(city, period)
+    bbox_filter = parse_bbox(bbox)
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Unsupported format")
+    if format == "arrow" and pa is None:
+        raise HTTPException(status_code=501, detail="Arrow export requires pyarrow")
+
+    where_clauses, params = incident_filters(city_key, start_at, crime, bbox_filter)
+    columns = ", ".join(name for name, _ in EXPORT_COLUMNS)
+    select = "row_to_json(export)::text" if format == "ndjson" else columns
+    query = f"""
+        SELECT {select}
+        FROM (
+            SELECT {columns}
+            FROM incidents
+            WHERE {' AND '.join(where_clauses)}
+        ) AS export
+        ORDER BY occurred_at DESC, id DESC
+    """
+
+    chunks = stream_export(query, params, format)
+    first = await chunks.__anext__()
+
+    media_type, extension = EXPORT_FORMATS[format]
+    filename = f"crimegrid-{city_key}-{period}.{extension}"
+    return ExportResponse(
+        prepend(first, chunks),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+# -----------------------------
+# Vector tiles
+# -----------------------------
+
+TILE_EXTENT = 4096
+# Ingestion records changed tiles at this zoom (TILE_INVALIDATION_ZOOM in
+# packages/ingestion/db/operations.py); deeper tiles are cheap and not cached.
+TILE_CACHE_MAX_ZOOM = 16
+# Re-read invalidations this far back so rows from transactions that were
+# still open at the previous poll are not missed.
+TILE_INVALIDATION_OVERLAP = timedelta(seconds=60)
+
+tile_cache = TileCache(max_entries=TILE_CACHE_SIZE, ttl_seconds=TILE_CACHE_TTL, directory=TILE_CACHE_DIR)
+
+async def watch_tile_invalidations() -> None:
+    since: Optional[datetime] = None
+    while True:
+        try:
+            async with pool.connection() as conn:
+                async with conn.cursor() as cur:
+                    await cur.execute("SELECT now() AS polled_at")
+                    polled_at = (await cur.fetchone())["polled_at"]
+                    # First poll: anything cached (e.g. on disk) within the TTL may be stale.
+                    floor = since - TILE_INVALIDATION_OVERLAP if since else polled_at - timedelta(seconds=TILE_CACHE_TTL)
+                    await cur.execute(
+                        "SELECT city, z, x, y FROM tile_invalidations WHERE invalidated_at > %s",
+                        (floor,),
+                    )
+                    rows = await cur.fetchall()
+            tile_cache.invalidate((row["city"], row["z"], row["x"], row["y"]) for row in rows)
+            since = polled_at
+        except asyncio.CancelledError:
+            raise
+        except PoolClosed:  # shutting down; the pool closes before watchers are cancelled
+            return
+        except Exception:  # keep serving; entries still expire by TTL
+            LOG.warning("Tile invalidation poll failed", exc_info=True)
+        await asyncio.sleep(TILE_INVALIDATION_POLL)
+
+_tile_watcher: Optional[asyncio.Task] = None
+
+@app.on_event("startup")
+async def start_tile_watcher() -> None:
+    global _tile_watcher
+    _tile_watcher = asyncio.create_task(watch_tile_invalidations())
+
+@app.on_event("shutdown")
+async def stop_tile_watcher() -> None:
+    if _tile_watcher is not None:
+        _tile_watcher.cancel()
+
+@app.get("/tiles/{city}/{z}/{x}/{y}.mvt", dependencies=[Depends(authorize)])
+async def get_tile(
+    city: str,
+    z: int,
+    x: int,
+    y: int,
+    period: str = Query("30d", description="Time window: 24h, 7d, 30d, 90d, 365d, all"),
+    crime: Optional[str] = Query(None, description="Crime primary_type to filter"),
+):
+    city_key, start_at = resolve_window(city, period)
+    if not (0 <= z <= 22 and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise HTTPException(status_code=400, detail="Invalid tile coordinates")
+
+    key = (city_key, z, x, y)
+    variant = f"{period}-{crime.upper() if crime else 'ALL'}"
+    cacheable = z <= TILE_CACHE_MAX_ZOOM
+    tile = tile_cache.get(key, variant) if cacheable else None
+
+    if tile is None:
+        where_clauses, params = incident_filters(city_key, start_at, crime, None)
+        query = f"""
+            WITH bounds AS (
+                SELECT ST_TileEnvelope(%s, %s, %s) AS tile
             ),
+            features AS (
+                SELECT
+                    ST_AsMVTGeom(ST_Transform(incidents.geom, 3857), bounds.tile, %s, 0, true) AS geom,
+                    incidents.id,
+                    incidents.primary_type,
+                    incidents.description,
+                    EXTRACT(EPOCH FROM incidents.occurred_at)::bigint AS occurred_at
+                FROM incidents, bounds
+                WHERE {' AND '.join(where_clauses)}
+                  AND incidents.geom && ST_Transform(bounds.tile, 4326)
+                ORDER BY incidents.occurred_at DESC
+                LIMIT %s
+            )
+            SELECT ST_AsMVT(features, 'incidents', %s, 'geom') AS tile
+            FROM features
+        """
+        async with pool.connection() as conn:
+            async with conn.cursor() as cur:
+                with observe_query("tile"):
+                    await cur.execute(query, [z, x, y, TILE_EXTENT, *params, TILE_MAX_FEATURES, TILE_EXTENT])
+                    tile = bytes((await cur.fetchone())["tile"] or b"")
+        if cacheable:
+            tile_cache.put(key, variant, tile)
+
+    return Response(content=tile, media_type="application/vnd.mapbox-vector-tile")
+
+# -----------------------------
+# Heatmaps
+# -----------------------------
+
+def tile_lng(x: float, zoom: int) -> float:
+    return x / 2 ** zoom * 360 - 180
+
+def tile_lat(y: float, zoom: int) -> float:
+    return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / 2 ** zoom))))
+
+@app.get("/heatmap", dependencies=[Depends(authorize)])
+async def get_heatmap(
+    city: str = Query(..., description="City identifier, e.g. 'chicago'"),
+    period: str = Query("30d", description="Time window: 24h, 7d, 30d, 90d, 365d, all"),
+    crime: Optional[str] = Query(None, description="Crime primary_type to filter"),
+):
+    # Grids are precomputed by the heatmap_refresh ingestion job; this is a
+    # primary-key read.
+    city_key, _ = resolve_window(city, period)
+    primary_type = crime.upper() if crime else "ALL"
+
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            with observe_query("heatmap_grid"):
+                await cur.execute(
+                    """
+                    SELECT grid_zoom, x0, y0, width, height, bandwidth_m, incident_count,
+                           max_density, intensity, computed_at
+                    FROM heatmap_grids
+                    WHERE city = %s AND period = %s AND primary_type = %s
+                    """,
+                    (city_key, period, primary_type),
+                )
+                row = await cur.fetchone()
+
+    if row is None:
+        raise HTTPException(status_code=404, detail="No heatmap computed for this city/period/crime")
+
+    zoom, x0, y0 = row["grid_zoom"], row["x0"], row["y0"]
+    return {
+        "city": city_key,
+        "period": period,
+        "primary_type": primary_type,
+        "computed_at": row["computed_at"].isoformat(),
+        "incident_count": row["incident_count"],
+        "bandwidth_m": row["bandwidth_m"],
+        "grid": {
+            "zoom": zoom,
+            "x0": x0,
+            "y0": y0,
+            "width": row["width"],
+            "height": row["height"],
+            "bounds": [
+                tile_lng(x0, zoom),
+                tile_lat(y0 + row["height"], zoom),
+                tile_lng(x0 + row["width"], zoom),
+                tile_lat(y0, zoom),
+            ],
         },
+        # Density in incidents/km^2 is level / 255 * max_density.
+        "max_density": row["max_density"],
+        "encoding": "uint8 row-major from the north-west corner, zlib-compressed, base64",
+        "intensity": base64.b64encode(row["intensity"]).decode(),
     }
 
 @app.get("/cities", dependencies=[Depends(authorize)])
-def list_cities():
-    with pool.connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT city, COUNT(*) AS total, MAX(occurred_at) AS last_occurred_at
-                FROM incidents
-                GROUP BY city
-                """
-            )
-            rows = cur.fetchall()
+async def list_cities(request: Request, response: Response):
+    validators = cache_validators("cities", sorted(ingest_state), None, {})
+    cached = not_modified(request, validators)
+    if cached is not None:
+        return cached
+
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            with observe_query("city_stats"):
+                await cur.execute(
+                    """
+                    SELECT city, total_incidents, last_occurred_at, last_ingest_at, refreshed_at
+                    FROM city_stats
+                    """
+                )
+                rows = await cur.fetchall()
 
     summaries = {row["city"]: row for row in rows}
 
+    def isoformat(value: Optional[datetime]) -> Optional[str]:
+        return value.isoformat() if value else None
+
     data = []
     for key, meta in CITY_METADATA.items():
         summary = summaries.get(key, {})
@@ -346,20 +1147,24 @@ def list_cities():
                 "label": meta["label"],
                 "center": meta["center"],
                 "zoom": meta["zoom"],
-                "total_incidents": summary.get("total", 0),
-                "last_occurred_at": (
-                    summary.get("last_occurred_at").isoformat()
-                    if summary.get("last_occurred_at")
-                    else None
-                ),
+                "total_incidents": summary.get("total_incidents", 0),
+                "last_occurred_at": isoformat(summary.get("last_occurred_at")),
+                "last_ingest_at": isoformat(summary.get("last_ingest_at")),
+                "stats_refreshed_at": isoformat(summary.get("refreshed_at")),
             }
         )
 
+    apply_cache_headers(response, validators)
     return {"cities": data}
 
 @app.get("/health")
-def health_check():
-    return {"status": "ok", "time": datetime.now(timezone.utc).isoformat()}
+async def health_check():
+    return {"status": "ok", "time": datetime.now(timezone.utc).isoformat(), "pool": pool_stats()}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    payload, content_type = render_metrics(pool_metrics)
+    return Response(content=payload, media_type=content_type)
 
 # -----------------------------
 # Dev runner
@@ -0,0 +1,154 @@
+"""Prometheus instrumentation for the API: requests, queries and the pool."""
+
+from __future__ import annotations
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+
+REQUEST_SECONDS = Histogram(
+    "crimegrid_http_request_duration_seconds",
+    "Time to send the full response, by route template and status.",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+RESPONSE_BYTES = Histogram(
+    "crimegrid_http_response_size_bytes",
+    "Response body size, by route template.",
+    ["route"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216),
+)
+QUERY_SECONDS = Histogram(
+    "crimegrid_db_query_seconds",
+    "Database query time (execute and fetch) by query name.",
+    ["query"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+SERIALIZE_SECONDS = Histogram(
+    "crimegrid_serialize_seconds",
+    "Time to encode a response body, by route template.",
+    ["route"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+RATE_LIMITED = Counter(
+    "crimegrid_rate_limit_rejections_total",
+    "Requests rejected with 429 by the rate limiter.",
+)
+
+
+@contextmanager
+def observe_query(name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        QUERY_SECONDS.labels(name).observe(time.perf_counter() - started)
+
+
+@contextmanager
+def observe_serialization(route: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        SERIALIZE_SECONDS.labels(route).observe(time.perf_counter() - started)
+
+
+class PrometheusMiddleware:
+    """Time every request and measure its body, labelled by route template.
+
+    Plain ASGI rather than ``BaseHTTPMiddleware`` so streamed responses are
+    timed until their last chunk and are not buffered.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the scope; unmatched
+            # paths share one label so scans cannot explode cardinality.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_SECONDS.labels(scope["method"], route, str(status)).observe(time.perf_counter() - started)
+            RESPONSE_BYTES.labels(route).observe(size)
+
+
+class PoolCollector:
+    """Export psycopg pool statistics at scrape time."""
+
+    def __init__(self, pool) -> None:
+        self.pool = pool
+
+    def collect(self):
+        stats = self.pool.get_stats()
+        size = stats.get("pool_size", 0)
+        available = stats.get("pool_available", 0)
+        gauges = {
+            "crimegrid_db_pool_size": ("Open connections.", size),
+            "crimegrid_db_pool_in_use": ("Connections checked out.", size - available),
+            "crimegrid_db_pool_available": ("Idle connections.", available),
+            "crimegrid_db_pool_max_size": ("Configured maximum connections.", self.pool.max_size),
+            "crimegrid_db_pool_requests_waiting": ("Requests queued for a connection.", stats.get("requests_waiting", 0)),
+        }
+        for name, (documentation, value) in gauges.items():
+            yield GaugeMetricFamily(name, documentation, value=value)
+
+        counters = {
+            "crimegrid_db_pool_requests": ("Connection requests.", stats.get("requests_num", 0)),
+            "crimegrid_db_pool_requests_queued": ("Connection requests that had to wait.", stats.get("requests_queued", 0)),
+            "crimegrid_db_pool_requests_errors": ("Connection requests that timed out or were rejected.", stats.get("requests_errors", 0)),
+            "crimegrid_db_pool_wait_seconds": ("Total time spent waiting for a connection.", stats.get("requests_wait_ms", 0) / 1000),
+        }
+        for name, (documentation, value) in counters.items():
+            yield CounterMetricFamily(name, documentation, value=value)
+
+
+def register_pool(pool) -> PoolCollector:
+    collector = PoolCollector(pool)
+    REGISTRY.register(collector)
+    return collector
+
+
+def render(pool_collector: PoolCollector) -> tuple[bytes, str]:
+    """Metrics payload and content type.
+
+    With ``PROMETHEUS_MULTIPROC_DIR`` set (several uvicorn workers) request
+    and query metrics are merged across workers; pool metrics always describe
+    the worker answering the scrape.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+        registry.register(pool_collector)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,157 @@
+"""Token-bucket rate limiting, in process or shared through Redis."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Sequence, Tuple
+
+LOG = logging.getLogger(__name__)
+
+# (bucket key, max requests, window seconds). A bucket holds up to
+# ``max requests`` tokens and refills at ``max requests / window`` per second.
+Limit = Tuple[str, int, float]
+
+
+class RateLimiter:
+    """In-process token buckets; limits apply per worker process.
+
+    State is three numbers per bucket, split over lock-striped LRU maps. A
+    bucket idle for a whole window is full again, so such entries are
+    dropped as they are passed over. Each stripe holds at most
+    ``max_identities // stripes`` buckets, so no more than ``max_identities``
+    are tracked in total; beyond that the stripe's least recently seen bucket
+    is dropped, which at worst resets it to full.
+    """
+
+    STRIPES = 16
+
+    def __init__(self, max_identities: int = 100_000) -> None:
+        if max_identities < 1:
+            raise ValueError("max_identities must be at least 1")
+        self.stripes = min(self.STRIPES, max_identities)
+        self.max_per_stripe = max_identities // self.stripes
+        # key -> [tokens, last update (monotonic), window], least recently seen first
+        self._buckets = [OrderedDict() for _ in range(self.stripes)]
+        self._locks = [threading.Lock() for _ in range(self.stripes)]
+
+    async def check(self, limits: Sequence[Limit]) -> float:
+        return self.check_sync(limits)
+
+    def check_sync(self, limits: Sequence[Limit]) -> float:
+        """Take a token from every bucket in ``limits`` if all have one.
+
+        Returns 0 when the request is allowed, otherwise the seconds until it
+        would be (and no tokens are taken).
+        """
+        now = time.monotonic()
+        stripes = sorted({hash(key) % self.stripes for key, _, _ in limits})
+        for stripe in stripes:
+            self._locks[stripe].acquire()
+        try:
+            buckets: List[list] = []
+            wait = 0.0
+            for key, max_requests, window in limits:
+                bucket = self._touch(hash(key) % self.stripes, key, max_requests, window, now)
+                buckets.append(bucket)
+                if bucket[0] < 1:
+                    wait = max(wait, (1 - bucket[0]) * window / max_requests)
+            if wait == 0:
+                for bucket in buckets:
+                    bucket[0] -= 1
+            return wait
+        finally:
+            for stripe in reversed(stripes):
+                self._locks[stripe].release()
+
+    def _touch(self, stripe: int, key: str, max_requests: int, window: float, now: float) -> list:
+        buckets = self._buckets[stripe]
+        bucket = buckets.pop(key, None)
+        # evict idle buckets from the cold end
+        while buckets:
+            oldest = next(iter(buckets.values()))
+            if oldest[1] > now - oldest[2] and len(buckets) < self.max_per_stripe:
+                break
+            buckets.popitem(last=False)
+
+        if bucket is None:
+            bucket = [float(max_requests), now, window]
+        else:
+            bucket[0] = min(max_requests, bucket[0] + (now - bucket[1]) * max_requests / window)
+            bucket[1] = now
+            bucket[2] = window
+        buckets[key] = bucket
+        return bucket
+
+    def __len__(self) -> int:
+        return sum(len(buckets) for buckets in self._buckets)
+
+
+# KEYS: bucket keys; ARGV: max requests and window for each key, in pairs.
+# Refills every bucket from the server clock and takes a token from each only
+# if all have one; returns the wait in seconds as a string (0 = allowed).
+TOKEN_BUCKET_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local tokens = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local max_requests = tonumber(ARGV[2 * i - 1])
+    local window = tonumber(ARGV[2 * i])
+    local state = redis.call('HMGET', key, 't', 'ts')
+    local available = max_requests
+    if state[1] then
+        available = math.min(max_requests, tonumber(state[1]) + (now - tonumber(state[2])) * max_requests / window)
+    end
+    tokens[i] = available
+    if available < 1 then
+        wait = math.max(wait, (1 - available) * window / max_requests)
+    end
+end
+for i, key in ipairs(KEYS) do
+    local available = tokens[i]
+    if wait == 0 then
+        available = available - 1
+    end
+    redis.call('HSET', key, 't', available, 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(tonumber(ARGV[2 * i]) * 1000))
+end
+return tostring(wait)
+"""
+
+
+class RedisRateLimiter:
+    """Token buckets shared by every worker through Redis.
+
+    Each check is one EVALSHA of :data:`TOKEN_BUCKET_SCRIPT`, so refill and
+    take are atomic across processes and hosts. Buckets expire after their
+    window, when they would be full anyway. If Redis is unreachable requests
+    are allowed (and a warning logged) rather than failing the API.
+    """
+
+    def __init__(self, client, prefix: str = "crimegrid:ratelimit:") -> None:
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+        self._last_warning = 0.0
+
+    async def check(self, limits: Sequence[Limit]) -> float:
+        if not limits:
+            return 0.0
+        keys = [self.prefix + key for key, _, _ in limits]
+        args: List[float] = []
+        for _, max_requests, window in limits:
+            args.extend((max_requests, window))
+        try:
+            return float(await self._script(keys=keys, args=args))
+        except Exception:
+            now = time.monotonic()
+            if now - self._last_warning > 60:
+                self._last_warning = now
+                LOG.warning("Rate limit backend unavailable; allowing requests", exc_info=True)
+            return 0.0
+
+    async def close(self) -> None:
+        await self.client.aclose()
@@ -0,0 +1,38 @@
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+# The API modules import each other as top-level modules from api/.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main  # noqa: E402
+
+
+PARAMS = {"crime": None, "limit": 1000, "cursor": None, "bbox": None}
+
+
+@pytest.fixture(autouse=True)
+def ingest_state(monkeypatch):
+    monkeypatch.setattr(main, "ingest_state", {"chicago": (42, datetime(2025, 1, 1, tzinfo=timezone.utc))})
+
+
+def test_periods_get_different_etags():
+    etags = {period: main.cache_validators("incidents", ["chicago"], period, PARAMS)[0] for period in main.PERIOD_MAP}
+
+    assert len(set(etags.values())) == len(main.PERIOD_MAP)
+
+
+def test_same_query_keeps_its_etag():
+    first = main.cache_validators("incidents", ["chicago"], "24h", PARAMS)
+
+    assert main.cache_validators("incidents", ["chicago"], "24h", dict(PARAMS)) == first
+    assert main.cache_validators("incidents", ["chicago"], "24h", {**PARAMS, "limit": 10}) != first
+
+
+def test_new_ingest_run_changes_etag(monkeypatch):
+    first = main.cache_validators("incidents", ["chicago"], "all", PARAMS)
+    monkeypatch.setitem(main.ingest_state, "chicago", (43, datetime(2025, 1, 2, tzinfo=timezone.utc)))
+
+    assert main.cache_validators("incidents", ["chicago"], "all", PARAMS)[0] != first[0]
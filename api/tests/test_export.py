@@ -0,0 +1,114 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# The API modules import each other as top-level modules from api/.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main  # noqa: E402
+
+
+class FakeCursor:
+    """Named-cursor stand-in serving ``batches`` NDJSON batches, forever if None."""
+
+    def __init__(self, batches):
+        self.batches = batches
+
+    async def execute(self, query, params):
+        pass
+
+    async def fetchmany(self, size):
+        if self.batches == 0:
+            return []
+        if self.batches is not None:
+            self.batches -= 1
+        return [('{"id": "1"}',)] * size
+
+
+class FakeConnection:
+    def __init__(self, batches):
+        self.batches = batches
+
+    def cursor(self, name=None, row_factory=None):
+        return FakeCursor(self.batches)
+
+    async def rollback(self):
+        pass
+
+
+class FakePool:
+    def __init__(self, batches=None):
+        self.batches = batches
+        self.checked_out = 0
+        self.returned = 0
+
+    async def getconn(self):
+        self.checked_out += 1
+        return FakeConnection(self.batches)
+
+    async def putconn(self, conn):
+        self.returned += 1
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    fake = FakePool()
+    monkeypatch.setattr(main, "pool", fake)
+    monkeypatch.setattr(main, "export_slots", asyncio.Semaphore(1))
+    return fake
+
+
+async def _export(disconnect_after, spec_version):
+    """Serve an export and drop the client after ``disconnect_after`` body chunks."""
+
+    response = await main.export_incidents(city="chicago", period="30d", crime=None, bbox=None, format="ndjson")
+    bodies = 0
+    disconnected = asyncio.Event()
+
+    async def receive():
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal bodies
+        if message["type"] != "http.response.body":
+            return
+        bodies += 1
+        if bodies > disconnect_after:
+            disconnected.set()
+            if spec_version == "2.4":
+                raise OSError("client went away")  # what uvicorn raises on ASGI >= 2.4
+            await asyncio.sleep(3600)  # stuck writing to a dead socket until cancelled
+
+    scope = {"type": "http", "asgi": {"spec_version": spec_version}}
+    try:
+        await response(scope, receive, send)
+    except Exception:
+        pass
+    return bodies
+
+
+@pytest.mark.parametrize("spec_version", ["2.0", "2.4"])
+def test_disconnect_mid_export_returns_connection(pool, spec_version):
+    async def run():
+        bodies = await _export(disconnect_after=2, spec_version=spec_version)
+        # No await in between: the connection is back without waiting on
+        # garbage collection of the abandoned generators.
+        return bodies, pool.checked_out, pool.returned, main.export_slots.locked()
+
+    bodies, checked_out, returned, locked = asyncio.run(run())
+
+    assert bodies == 3
+    assert (checked_out, returned) == (1, 1)
+    assert not locked
+
+
+def test_completed_export_returns_connection(pool):
+    pool.batches = 2
+
+    bodies = asyncio.run(_export(disconnect_after=10, spec_version="2.4"))
+
+    assert bodies == 4  # prepended first chunk, two batches, final empty body
+    assert (pool.checked_out, pool.returned) == (1, 1)
@@ -0,0 +1,199 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+import redis
+
+# The API modules import each other as top-level modules from api/.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import rate_limit  # noqa: E402
+from rate_limit import RateLimiter, RedisRateLimiter  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class SingleStripeLimiter(RateLimiter):
+    # One stripe makes eviction order independent of string hashing.
+    STRIPES = 1
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", fake)
+    return fake
+
+
+def test_bucket_refills_over_window(clock):
+    limiter = RateLimiter()
+    limits = [("ip:a", 2, 10)]
+
+    assert limiter.check_sync(limits) == 0
+    assert limiter.check_sync(limits) == 0
+    assert limiter.check_sync(limits) == pytest.approx(5.0)
+
+    clock.now += 4
+    assert limiter.check_sync(limits) == pytest.approx(1.0)
+    clock.now += 1
+    assert limiter.check_sync(limits) == 0
+
+
+def test_request_takes_from_all_buckets_or_none(clock):
+    limiter = RateLimiter()
+    key = ("key:k", 3, 60)
+
+    assert limiter.check_sync([("ip:a", 1, 60), key]) == 0
+    # The IP bucket is empty, so the key bucket must not be charged either.
+    assert limiter.check_sync([("ip:a", 1, 60), key]) > 0
+    assert limiter.check_sync([("ip:a", 1, 60), key]) > 0
+    assert limiter.check_sync([("ip:b", 5, 60), key]) == 0
+    assert limiter.check_sync([("ip:c", 5, 60), key]) == 0
+    assert limiter.check_sync([("ip:d", 5, 60), key]) == pytest.approx(20.0)
+
+
+def test_idle_buckets_are_evicted(clock):
+    limiter = SingleStripeLimiter(max_identities=100)
+    limiter.check_sync([("ip:a", 1, 10)])
+
+    clock.now += 5
+    limiter.check_sync([("ip:b", 1, 10)])
+    assert len(limiter) == 2
+
+    clock.now += 6
+    limiter.check_sync([("ip:c", 1, 10)])
+    assert len(limiter) == 2  # ip:a sat idle for a whole window
+
+
+def test_least_recently_seen_bucket_dropped_at_cap(clock):
+    limiter = SingleStripeLimiter(max_identities=2)
+    limiter.check_sync([("ip:a", 1, 60)])
+    limiter.check_sync([("ip:b", 1, 60)])
+    limiter.check_sync([("ip:c", 1, 60)])
+
+    assert len(limiter) == 2
+    assert limiter.check_sync([("ip:a", 1, 60)]) == 0  # forgotten, so full again
+    assert limiter.check_sync([("ip:c", 1, 60)]) > 0
+
+
+@pytest.mark.parametrize("max_identities", [1, 10, 17, 1000])
+def test_max_identities_caps_tracked_buckets(clock, max_identities):
+    limiter = RateLimiter(max_identities=max_identities)
+    for idx in range(5000):
+        limiter.check_sync([(f"ip:{idx}", 1, 60)])
+
+    assert 0 < len(limiter) <= max_identities
+
+
+def test_rejects_empty_capacity():
+    with pytest.raises(ValueError):
+        RateLimiter(max_identities=0)
+
+
+def test_no_limits_allows():
+    assert asyncio.run(RateLimiter().check([])) == 0
+
+
+def test_zero_ip_limit_is_skipped(monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "RATE_LIMIT_MAX", 0)
+    monkeypatch.setattr(main, "KEY_RATE_LIMIT", 0)
+
+    assert main.rate_limits("203.0.113.9", "some-key") == []
+
+
+def _redis_limiter():
+    import fakeredis
+    import fakeredis.aioredis
+
+    client = fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer())
+    return RedisRateLimiter(client), client
+
+
+async def _tokens(client, key):
+    return float(await client.hget("crimegrid:ratelimit:" + key, "t"))
+
+
+def test_redis_request_needs_tokens_in_every_bucket():
+    async def run():
+        limiter, client = _redis_limiter()
+        key = ("key:k", 3, 60)
+
+        assert await limiter.check([("ip:a", 1, 60), key]) == 0
+        assert await limiter.check([("ip:a", 1, 60), key]) > 0
+        # Rejected by the IP bucket: the key bucket keeps its tokens.
+        assert await _tokens(client, "key:k") == pytest.approx(2, abs=0.01)
+
+        assert await limiter.check([("ip:b", 5, 60), key]) == 0
+        assert await limiter.check([("ip:c", 5, 60), key]) == 0
+        assert await limiter.check([("ip:d", 5, 60), key]) > 0
+        # Rejected by the key bucket: the IP bucket keeps its tokens.
+        assert await _tokens(client, "ip:d") == pytest.approx(5, abs=0.01)
+
+    asyncio.run(run())
+
+
+def test_redis_wait_is_time_until_next_token():
+    async def run():
+        limiter, _ = _redis_limiter()
+        limits = [("ip:a", 2, 10)]
+        assert await limiter.check(limits) == 0
+        assert await limiter.check(limits) == 0
+        return await limiter.check(limits)
+
+    assert asyncio.run(run()) == pytest.approx(5.0, abs=0.1)
+
+
+def test_redis_buckets_expire_after_their_window():
+    async def run():
+        limiter, client = _redis_limiter()
+        await limiter.check([("ip:a", 10, 30), ("key:k", 10, 2)])
+        return (
+            await client.pttl("crimegrid:ratelimit:ip:a"),
+            await client.pttl("crimegrid:ratelimit:key:k"),
+        )
+
+    ip_ttl, key_ttl = asyncio.run(run())
+
+    assert 29_000 < ip_ttl <= 30_000
+    assert 1_000 < key_ttl <= 2_000
+
+
+class FailingClient:
+    def __init__(self, error):
+        self.error = error
+        self.calls = 0
+
+    def register_script(self, script):
+        async def call(keys, args):
+            self.calls += 1
+            raise self.error
+
+        return call
+
+
+@pytest.mark.parametrize(
+    "error",
+    [redis.exceptions.ConnectionError("refused"), redis.exceptions.TimeoutError("timed out"), asyncio.TimeoutError()],
+)
+def test_redis_failure_allows_request_and_logs(caplog, error):
+    client = FailingClient(error)
+    limiter = RedisRateLimiter(client)
+
+    with caplog.at_level("WARNING", logger="rate_limit"):
+        waits = [asyncio.run(limiter.check([("ip:a", 1, 60)])) for _ in range(3)]
+
+    assert waits == [0, 0, 0]
+    assert client.calls == 3
+    # Logged once, not per request.
+    assert [record.getMessage() for record in caplog.records] == [
+        "Rate limit backend unavailable; allowing requests"
+    ]
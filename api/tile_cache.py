@@ -0,0 +1,107 @@
+"""Two-tier (memory LRU + disk) cache for rendered vector tiles."""
+
+from __future__ import annotations
+
+import os
+import shutil
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple
+from urllib.parse import quote
+
+TileKey = Tuple[str, int, int, int]  # city, z, x, y
+
+
+def ancestors(z: int, x: int, y: int) -> Iterator[Tuple[int, int, int]]:
+    """Yield the tile itself and every tile containing it, down to zoom 0."""
+    for level in range(z, -1, -1):
+        shift = z - level
+        yield level, x >> shift, y >> shift
+
+
+class TileCache:
+    """Cache tile bytes per (city, z, x, y) and query variant.
+
+    Entries expire after ``ttl_seconds`` (relative periods such as ``7d``
+    drift over time) and are evicted early by :meth:`invalidate` when
+    ingestion reports changed incidents. With ``directory`` set, tiles are
+    also written to ``<directory>/<city>/<z>/<x>/<y>/<variant>.mvt`` so
+    restarts and sibling workers on the same host reuse them.
+    """
+
+    def __init__(self, *, max_entries: int, ttl_seconds: float, directory: Optional[str] = None) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.directory = Path(directory) if directory else None
+        self._memory: "OrderedDict[Tuple[TileKey, str], Tuple[float, bytes]]" = OrderedDict()
+
+    def get(self, key: TileKey, variant: str) -> Optional[bytes]:
+        entry = self._memory.get((key, variant))
+        if entry is not None:
+            stored_at, data = entry
+            if time.time() - stored_at < self.ttl_seconds:
+                self._memory.move_to_end((key, variant))
+                return data
+            del self._memory[(key, variant)]
+
+        path = self._path(key, variant)
+        if path is None:
+            return None
+        try:
+            stored_at = path.stat().st_mtime
+            if time.time() - stored_at >= self.ttl_seconds:
+                return None
+            data = path.read_bytes()
+        except OSError:
+            return None
+        self._remember(key, variant, stored_at, data)
+        return data
+
+    def put(self, key: TileKey, variant: str, data: bytes) -> None:
+        self._remember(key, variant, time.time(), data)
+        path = self._path(key, variant)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(data)
+            tmp.replace(path)  # atomic, so readers never see a partial tile
+        except OSError:
+            pass  # the disk tier is best-effort
+
+    def invalidate(self, tiles: Iterable[TileKey]) -> int:
+        """Evict every cached tile overlapping ``tiles`` at or above their zoom.
+
+        Returns the number of memory entries dropped.
+        """
+        stale = {(city, *tile) for city, z, x, y in tiles for tile in ancestors(z, x, y)}
+        if not stale:
+            return 0
+        entries = [entry for entry in self._memory if entry[0] in stale]
+        for entry in entries:
+            del self._memory[entry]
+        if self.directory is not None:
+            for key in stale:
+                shutil.rmtree(self._tile_dir(key), ignore_errors=True)
+        return len(entries)
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    # ------------------------------------------------------------------
+    def _remember(self, key: TileKey, variant: str, stored_at: float, data: bytes) -> None:
+        self._memory[(key, variant)] = (stored_at, data)
+        self._memory.move_to_end((key, variant))
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _tile_dir(self, key: TileKey) -> Path:
+        city, z, x, y = key
+        return self.directory / quote(city, safe="") / str(z) / str(x) / str(y)
+
+    def _path(self, key: TileKey, variant: str) -> Optional[Path]:
+        if self.directory is None:
+            return None
+        return self._tile_dir(key) / f"{quote(variant, safe='')}.mvt"
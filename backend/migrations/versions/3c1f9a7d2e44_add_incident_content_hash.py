@@ -0,0 +1,38 @@
+"""add incident content hash
+
+Revision ID: 3c1f9a7d2e44
+Revises: 07b2718b9ff5
+Create Date: 2025-10-06 09:12:31.184022
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f9a7d2e44'
+down_revision: Union[str, Sequence[str], None] = '07b2718b9ff5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        """
+        ALTER TABLE incidents ADD COLUMN content_hash TEXT;
+        """
+    )
+    op.execute(
+        """
+        ALTER TABLE ingest_runs ADD COLUMN rows_unchanged INTEGER;
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE ingest_runs DROP COLUMN IF EXISTS rows_unchanged;")
+    op.execute("ALTER TABLE incidents DROP COLUMN IF EXISTS content_hash;")
@@ -0,0 +1,42 @@
+"""add ingest run high watermark
+
+Revision ID: 8a4e6b1c9d20
+Revises: 3c1f9a7d2e44
+Create Date: 2025-10-08 14:03:52.517390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a4e6b1c9d20'
+down_revision: Union[str, Sequence[str], None] = '3c1f9a7d2e44'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Socrata reports updated_on as a floating (zone-less) timestamp, so the
+    # watermark is stored the same way and compared verbatim in SoQL.
+    op.execute(
+        """
+        ALTER TABLE ingest_runs ADD COLUMN high_watermark TIMESTAMP;
+        """
+    )
+    op.execute(
+        """
+        CREATE INDEX ingest_runs_watermark_idx
+            ON ingest_runs (source_id, flow_name, id DESC)
+            WHERE status = 'succeeded' AND high_watermark IS NOT NULL;
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ingest_runs_watermark_idx;")
+    op.execute("ALTER TABLE ingest_runs DROP COLUMN IF EXISTS high_watermark;")
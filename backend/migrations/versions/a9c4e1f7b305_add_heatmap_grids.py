@@ -0,0 +1,54 @@
+"""add heatmap grids
+
+Revision ID: a9c4e1f7b305
+Revises: f3a8d2c6b417
+Create Date: 2025-10-13 10:41:18.264093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9c4e1f7b305'
+down_revision: Union[str, Sequence[str], None] = 'f3a8d2c6b417'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Precomputed KDE surfaces per city/period/primary_type ('ALL' = every
+    # type), written by the heatmap_refresh job and served as-is by the API.
+    # counts holds the raw int32 per-cell histogram used for incremental
+    # refreshes; intensity the uint8 quantized surface. Both are zlib
+    # compressed, row-major from the grid's north-west corner.
+    op.execute(
+        """
+        CREATE TABLE heatmap_grids (
+            city            TEXT             NOT NULL,
+            period          TEXT             NOT NULL,
+            primary_type    TEXT             NOT NULL,
+            grid_zoom       SMALLINT         NOT NULL,
+            x0              INTEGER          NOT NULL,
+            y0              INTEGER          NOT NULL,
+            width           INTEGER          NOT NULL,
+            height          INTEGER          NOT NULL,
+            bandwidth_m     DOUBLE PRECISION NOT NULL,
+            incident_count  BIGINT           NOT NULL,
+            max_density     DOUBLE PRECISION NOT NULL,
+            counts          BYTEA            NOT NULL,
+            intensity       BYTEA            NOT NULL,
+            computed_at     TIMESTAMPTZ      NOT NULL,
+            window_start    TIMESTAMPTZ,
+            PRIMARY KEY (city, period, primary_type)
+        );
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE IF EXISTS heatmap_grids;")
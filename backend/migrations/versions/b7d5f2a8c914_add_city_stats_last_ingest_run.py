@@ -0,0 +1,43 @@
+"""add city stats last ingest run
+
+Revision ID: b7d5f2a8c914
+Revises: a9c4e1f7b305
+Create Date: 2025-10-14 08:52:40.117385
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d5f2a8c914'
+down_revision: Union[str, Sequence[str], None] = 'a9c4e1f7b305'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Latest succeeded ingest run per city; the API derives ETags from it.
+    op.execute("ALTER TABLE city_stats ADD COLUMN last_ingest_run_id BIGINT;")
+    op.execute(
+        """
+        UPDATE city_stats
+        SET last_ingest_run_id = latest.run_id
+        FROM (
+            SELECT s.city, MAX(r.id) AS run_id
+            FROM ingest_runs r
+            JOIN sources s ON s.id = r.source_id
+            WHERE r.status = 'succeeded'
+            GROUP BY s.city
+        ) AS latest
+        WHERE latest.city = city_stats.city;
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE city_stats DROP COLUMN IF EXISTS last_ingest_run_id;")
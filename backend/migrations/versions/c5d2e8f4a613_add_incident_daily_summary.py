@@ -0,0 +1,56 @@
+"""add incident daily summary
+
+Revision ID: c5d2e8f4a613
+Revises: 8a4e6b1c9d20
+Create Date: 2025-10-10 11:27:08.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d2e8f4a613'
+down_revision: Union[str, Sequence[str], None] = '8a4e6b1c9d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Per city/UTC day/primary_type incident counts, maintained incrementally
+    # by the ingestion upsert path so the API never aggregates raw incidents.
+    op.execute(
+        """
+        CREATE TABLE incident_daily_summary (
+            city             TEXT        NOT NULL,
+            day              DATE        NOT NULL,
+            primary_type     TEXT        NOT NULL,
+            incident_count   BIGINT      NOT NULL,
+            last_occurred_at TIMESTAMPTZ,
+            updated_at       TIMESTAMPTZ NOT NULL DEFAULT now(),
+            PRIMARY KEY (city, day, primary_type)
+        );
+        """
+    )
+
+    op.execute(
+        """
+        INSERT INTO incident_daily_summary (city, day, primary_type, incident_count, last_occurred_at)
+        SELECT
+            city,
+            (occurred_at AT TIME ZONE 'UTC')::date,
+            primary_type,
+            COUNT(*),
+            MAX(occurred_at)
+        FROM incidents
+        GROUP BY 1, 2, 3;
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE IF EXISTS incident_daily_summary;")
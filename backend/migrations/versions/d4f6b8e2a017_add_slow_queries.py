@@ -0,0 +1,50 @@
+"""add slow queries
+
+Revision ID: d4f6b8e2a017
+Revises: b7d5f2a8c914
+Create Date: 2025-10-15 09:27:03.518264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f6b8e2a017'
+down_revision: Union[str, Sequence[str], None] = 'b7d5f2a8c914'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Sampled plans of slow statements, written by
+    # packages/ingestion/db/instrumentation.py from the API and ingestion.
+    # fingerprint identifies the statement shape (text with placeholders), so
+    # each combination of dynamic WHERE clauses is grouped separately.
+    op.execute(
+        """
+        CREATE TABLE slow_queries (
+            id              BIGSERIAL        PRIMARY KEY,
+            captured_at     TIMESTAMPTZ      NOT NULL DEFAULT now(),
+            source          TEXT             NOT NULL,
+            fingerprint     TEXT             NOT NULL,
+            statement       TEXT             NOT NULL,
+            params          JSONB,
+            duration_ms     DOUBLE PRECISION NOT NULL,
+            analyzed        BOOLEAN          NOT NULL,
+            plan            JSONB            NOT NULL,
+            plan_indexes    TEXT[]           NOT NULL,
+            plan_seq_scans  TEXT[]           NOT NULL
+        );
+        """
+    )
+    op.execute("CREATE INDEX slow_queries_fingerprint_idx ON slow_queries (fingerprint, captured_at DESC);")
+    op.execute("CREATE INDEX slow_queries_captured_idx ON slow_queries (captured_at);")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE IF EXISTS slow_queries;")
@@ -0,0 +1,62 @@
+"""add city stats
+
+Revision ID: e7b3c9a1d582
+Revises: c5d2e8f4a613
+Create Date: 2025-10-11 09:14:36.518027
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3c9a1d582'
+down_revision: Union[str, Sequence[str], None] = 'c5d2e8f4a613'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # One row per city, refreshed from incident_daily_summary whenever an
+    # ingest run succeeds, so /cities never aggregates raw incidents.
+    op.execute(
+        """
+        CREATE TABLE city_stats (
+            city             TEXT        PRIMARY KEY,
+            total_incidents  BIGINT      NOT NULL DEFAULT 0,
+            last_occurred_at TIMESTAMPTZ,
+            last_ingest_at   TIMESTAMPTZ,
+            refreshed_at     TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+        """
+    )
+
+    op.execute(
+        """
+        INSERT INTO city_stats (city, total_incidents, last_occurred_at, last_ingest_at)
+        SELECT
+            summary.city,
+            summary.total_incidents,
+            summary.last_occurred_at,
+            (
+                SELECT MAX(r.run_completed_at)
+                FROM ingest_runs r
+                JOIN sources s ON s.id = r.source_id
+                WHERE s.city = summary.city
+                  AND r.status = 'succeeded'
+            )
+        FROM (
+            SELECT city, SUM(incident_count) AS total_incidents, MAX(last_occurred_at) AS last_occurred_at
+            FROM incident_daily_summary
+            GROUP BY city
+        ) AS summary;
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE IF EXISTS city_stats;")
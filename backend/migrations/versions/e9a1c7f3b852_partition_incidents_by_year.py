@@ -0,0 +1,204 @@
+"""partition incidents by year
+
+Revision ID: e9a1c7f3b852
+Revises: d4f6b8e2a017
+Create Date: 2025-10-16 14:05:51.730918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9a1c7f3b852'
+down_revision: Union[str, Sequence[str], None] = 'd4f6b8e2a017'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Creates incidents_city_<city>_<year> for every UTC year touched by
+# [p_from, p_to] under a city partition that is range partitioned on
+# occurred_at, moving matching rows out of incidents_city_<city>_default
+# first. Cities without such a partition are left alone. Returns the number of
+# partitions created. Used by this migration, ingestion (before writing a
+# batch) and the partition_maintenance job.
+ENSURE_PARTITIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION ensure_incident_partitions(p_city text, p_from timestamptz, p_to timestamptz)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    parent       text := 'incidents_city_' || p_city;
+    default_part text := 'incidents_city_' || p_city || '_default';
+    part         text;
+    lo           timestamptz;
+    hi           timestamptz;
+    created      integer := 0;
+BEGIN
+    IF p_from IS NULL OR p_to IS NULL OR NOT EXISTS (
+        SELECT 1 FROM pg_class WHERE oid = to_regclass(parent) AND relkind = 'p'
+    ) THEN
+        RETURN 0;
+    END IF;
+
+    -- Serialize concurrent ingestion workers creating the same year.
+    PERFORM pg_advisory_xact_lock(hashtext('ensure_incident_partitions:' || p_city));
+
+    FOR year IN extract(year FROM p_from AT TIME ZONE 'UTC')::int .. extract(year FROM p_to AT TIME ZONE 'UTC')::int LOOP
+        part := parent || '_' || year;
+        CONTINUE WHEN to_regclass(part) IS NOT NULL;
+        lo := make_timestamptz(year, 1, 1, 0, 0, 0, 'UTC');
+        hi := make_timestamptz(year + 1, 1, 1, 0, 0, 0, 'UTC');
+
+        -- Build the table standalone and ATTACH it: that only takes SHARE
+        -- UPDATE EXCLUSIVE on the city partition, so readers and writers of
+        -- other years are not blocked. The CHECK lets ATTACH skip scanning it.
+        EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING STORAGE)', part, parent);
+        EXECUTE format(
+            'ALTER TABLE %I ADD CONSTRAINT %I CHECK (occurred_at >= %L AND occurred_at < %L)',
+            part, part || '_bounds', lo, hi
+        );
+        IF to_regclass(default_part) IS NOT NULL THEN
+            EXECUTE format(
+                'WITH moved AS (DELETE FROM %I WHERE occurred_at >= %L AND occurred_at < %L RETURNING *) '
+                'INSERT INTO %I SELECT * FROM moved',
+                default_part, lo, hi, part
+            );
+        END IF;
+        EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)', parent, part, lo, hi);
+        EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', part, part || '_bounds');
+        created := created + 1;
+    END LOOP;
+    RETURN created;
+END;
+$$;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Unique constraints on a partitioned table must include every partition
+    # key, so (city, id) uniqueness can no longer be enforced globally:
+    # ingestion deletes the previous version of an incident whose occurred_at
+    # changed before upserting it. The receipts FK needs a unique (city, id)
+    # and is dropped (the table is not written by any job).
+    op.execute(
+        "ALTER TABLE incident_receipts DROP CONSTRAINT IF EXISTS incident_receipts_city_incident_id_fkey;"
+    )
+
+    op.execute("ALTER TABLE incidents DETACH PARTITION incidents_city_chicago;")
+    op.execute("ALTER TABLE incidents_city_chicago RENAME TO incidents_city_chicago_unsplit;")
+    # Drop the detached table's indexes now so the new partitions can take
+    # their names; it is only read sequentially from here on.
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            r record;
+        BEGIN
+            FOR r IN
+                SELECT conname FROM pg_constraint
+                WHERE conrelid = 'incidents_city_chicago_unsplit'::regclass AND contype IN ('p', 'u')
+            LOOP
+                EXECUTE format('ALTER TABLE incidents_city_chicago_unsplit DROP CONSTRAINT %I', r.conname);
+            END LOOP;
+            FOR r IN
+                SELECT indexrelid::regclass AS name FROM pg_index
+                WHERE indrelid = 'incidents_city_chicago_unsplit'::regclass
+            LOOP
+                EXECUTE format('DROP INDEX %s', r.name);
+            END LOOP;
+        END;
+        $$;
+        """
+    )
+
+    op.execute("ALTER TABLE incidents DROP CONSTRAINT incidents_pkey;")
+    op.execute("ALTER TABLE incidents DROP CONSTRAINT incidents_city_source_id_row_uid_key;")
+    op.execute("ALTER TABLE incidents ADD PRIMARY KEY (city, id, occurred_at);")
+    op.execute("ALTER TABLE incidents ADD UNIQUE (city, source_id, row_uid, occurred_at);")
+
+    op.execute(
+        """
+        CREATE TABLE incidents_city_chicago
+            PARTITION OF incidents
+            FOR VALUES IN ('chicago')
+            PARTITION BY RANGE (occurred_at);
+        """
+    )
+    # Catches rows outside every year partition until one is created for them.
+    op.execute(
+        """
+        CREATE TABLE incidents_city_chicago_default
+            PARTITION OF incidents_city_chicago
+            DEFAULT;
+        """
+    )
+    op.execute(ENSURE_PARTITIONS_FUNCTION)
+    op.execute(
+        """
+        SELECT ensure_incident_partitions(
+            'chicago',
+            LEAST(now(), (SELECT MIN(occurred_at) FROM incidents_city_chicago_unsplit)),
+            GREATEST(now(), (SELECT MAX(occurred_at) FROM incidents_city_chicago_unsplit)) + interval '1 year'
+        );
+        """
+    )
+    # Rewrites the city's history once; run during a maintenance window.
+    op.execute("INSERT INTO incidents SELECT * FROM incidents_city_chicago_unsplit;")
+    op.execute("DROP TABLE incidents_city_chicago_unsplit;")
+    op.execute("ANALYZE incidents_city_chicago;")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE incidents DETACH PARTITION incidents_city_chicago;")
+    op.execute("ALTER TABLE incidents_city_chicago RENAME TO incidents_city_chicago_split;")
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            r record;
+        BEGIN
+            FOR r IN
+                SELECT conname FROM pg_constraint
+                WHERE conrelid = 'incidents_city_chicago_split'::regclass AND contype IN ('p', 'u')
+            LOOP
+                EXECUTE format('ALTER TABLE incidents_city_chicago_split DROP CONSTRAINT %I', r.conname);
+            END LOOP;
+            FOR r IN
+                SELECT indexrelid::regclass AS name FROM pg_index
+                WHERE indrelid = 'incidents_city_chicago_split'::regclass
+            LOOP
+                EXECUTE format('DROP INDEX %s', r.name);
+            END LOOP;
+        END;
+        $$;
+        """
+    )
+
+    op.execute("ALTER TABLE incidents DROP CONSTRAINT incidents_pkey;")
+    op.execute("ALTER TABLE incidents DROP CONSTRAINT incidents_city_source_id_row_uid_occurred_at_key;")
+    op.execute("ALTER TABLE incidents ADD PRIMARY KEY (city, id);")
+    op.execute("ALTER TABLE incidents ADD UNIQUE (city, source_id, row_uid);")
+
+    op.execute(
+        """
+        CREATE TABLE incidents_city_chicago
+            PARTITION OF incidents
+            FOR VALUES IN ('chicago');
+        """
+    )
+    op.execute("INSERT INTO incidents SELECT * FROM incidents_city_chicago_split;")
+    op.execute("DROP TABLE incidents_city_chicago_split;")
+    op.execute("DROP FUNCTION IF EXISTS ensure_incident_partitions(text, timestamptz, timestamptz);")
+
+    op.execute(
+        """
+        ALTER TABLE incident_receipts
+            ADD CONSTRAINT incident_receipts_city_incident_id_fkey
+            FOREIGN KEY (city, incident_id) REFERENCES incidents(city, id) ON DELETE CASCADE;
+        """
+    )
@@ -0,0 +1,35 @@
+"""add ingest run high watermark id
+
+Revision ID: f2b8d4c6a193
+Revises: e9a1c7f3b852
+Create Date: 2025-10-17 10:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b8d4c6a193'
+down_revision: Union[str, Sequence[str], None] = 'e9a1c7f3b852'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Socrata :id of the last row stored by a run that stopped at its row
+    # limit; with high_watermark it is the keyset position the next run
+    # resumes after. NULL when the run read everything past its watermark.
+    op.execute(
+        """
+        ALTER TABLE ingest_runs ADD COLUMN high_watermark_id TEXT;
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE ingest_runs DROP COLUMN IF EXISTS high_watermark_id;")
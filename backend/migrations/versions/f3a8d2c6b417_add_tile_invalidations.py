@@ -0,0 +1,46 @@
+"""add tile invalidations
+
+Revision ID: f3a8d2c6b417
+Revises: e7b3c9a1d582
+Create Date: 2025-10-12 15:02:51.730446
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a8d2c6b417'
+down_revision: Union[str, Sequence[str], None] = 'e7b3c9a1d582'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Web-mercator tiles (at a fixed zoom) whose incidents changed, written by
+    # the upsert path and polled by the API to evict cached vector tiles.
+    # One row per tile, so the table stays bounded by each city's footprint.
+    op.execute(
+        """
+        CREATE TABLE tile_invalidations (
+            city           TEXT        NOT NULL,
+            z              SMALLINT    NOT NULL,
+            x              INTEGER     NOT NULL,
+            y              INTEGER     NOT NULL,
+            invalidated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            PRIMARY KEY (city, z, x, y)
+        );
+        """
+    )
+    op.execute(
+        "CREATE INDEX tile_invalidations_at_idx ON tile_invalidations (invalidated_at);"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS tile_invalidations_at_idx;")
+    op.execute("DROP TABLE IF EXISTS tile_invalidations;")
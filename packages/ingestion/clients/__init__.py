@@ -1,5 +1,6 @@
 """Client utilities for fetching source data."""
 
 from .socrata import SocrataClient, SocrataRequest
+from .socrata_async import AsyncSocrataClient
 
-__all__ = ["SocrataClient", "SocrataRequest"]
+__all__ = ["AsyncSocrataClient", "SocrataClient", "SocrataRequest"]
@@ -3,9 +3,11 @@
 from __future__ import annotations
 
 import logging
+import threading
 import time
+from contextlib import nullcontext
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, Iterator, Mapping, Optional
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional, Sequence, Tuple, Union
 
 import requests
 
@@ -15,11 +17,21 @@ LOG = logging.getLogger(__name__)
 
 @dataclass(frozen=True)
 class SocrataRequest:
-    """Represents a Socrata request configuration."""
+    """Represents a Socrata request configuration.
+
+    Setting ``keyset_column`` (for example ``":id"``) pages by ordering on that
+    column and resuming with ``column > last_seen`` instead of ``$offset``. The
+    column must be unique and totally ordered; the client owns ``$order`` in
+    that mode. A tuple such as ``("updated_on", ":id")`` pages on a composite
+    key whose columns together are unique. ``keyset_start`` resumes after a
+    previously seen key (one value per keyset column).
+    """
 
     dataset_id: str
     params: Mapping[str, Any]
     limit: Optional[int] = None
+    keyset_column: Union[str, Tuple[str, ...], None] = None
+    keyset_start: Optional[Tuple[Any, ...]] = None
 
 
 class SocrataClient:
@@ -39,6 +51,10 @@ class SocrataClient:
         Initial backoff in seconds, doubled on each retry.
     session:
         Optional requests session; falls back to a shared session if omitted.
+    request_slots:
+        Optional semaphore shared between clients to cap the number of
+        in-flight HTTP requests across threads. Slots are not held while
+        backing off between retries.
     """
 
     def __init__(
@@ -50,6 +66,7 @@ class SocrataClient:
         max_retries: int = 3,
         backoff_seconds: float = 1.5,
         session: Optional[requests.Session] = None,
+        request_slots: Optional[threading.Semaphore] = None,
     ) -> None:
         self.base_url = base_url.rstrip("/")
         self.app_token = app_token
@@ -57,11 +74,16 @@ class SocrataClient:
         self.max_retries = max_retries
         self.backoff_seconds = backoff_seconds
         self._session = session or requests.Session()
+        self._request_slots = request_slots
         self._retryable_statuses = {429, 500, 502, 503, 504}
 
     def fetch_rows(self, request: SocrataRequest) -> Iterator[Dict[str, Any]]:
         """Stream rows for the provided request, handling paging automatically."""
 
+        if request.keyset_column:
+            yield from self._fetch_rows_keyset(request)
+            return
+
         total = request.limit if request.limit is not None else float("inf")
         fetched = 0
         offset = 0
@@ -88,6 +110,28 @@ class SocrataClient:
             if len(rows) < fetch_size:
                 break
 
+    def _fetch_rows_keyset(self, request: SocrataRequest) -> Iterator[Dict[str, Any]]:
+        pager = KeysetPager(request)
+        total = request.limit if request.limit is not None else float("inf")
+        fetched = 0
+
+        while fetched < total:
+            remaining = None if total is float("inf") else max(total - fetched, 0)
+            fetch_size = self.page_size if remaining is None else min(self.page_size, remaining)
+
+            rows = self._get(f"/resource/{request.dataset_id}.json", params=pager.page_params(fetch_size))
+            if not rows:
+                break
+
+            for row in rows:
+                if fetched >= total:
+                    break
+                fetched += 1
+                yield pager.advance(row)
+
+            if len(rows) < fetch_size:
+                break
+
     # ------------------------------------------------------------------
     def _get(self, path: str, *, params: Optional[Mapping[str, Any]] = None) -> Iterable[Dict[str, Any]]:
         url = f"{self.base_url}{path}"
@@ -99,7 +143,8 @@ class SocrataClient:
         while True:
             attempt += 1
             try:
-                resp = self._session.get(url, params=params, headers=headers, timeout=30)
+                with self._request_slots or nullcontext():
+                    resp = self._session.get(url, params=params, headers=headers, timeout=30)
                 if resp.status_code in self._retryable_statuses:
                     raise requests.HTTPError(f"{resp.status_code} Server Error", response=resp)
                 resp.raise_for_status()
@@ -112,4 +157,84 @@ class SocrataClient:
                 time.sleep(sleep_for)
 
 
+class KeysetPager:
+    """Builds successive keyset page parameters for a request.
+
+    Shared by the sync and async clients. ``advance`` must be called with
+    every returned row, in order, before requesting the next page.
+    """
+
+    def __init__(self, request: SocrataRequest) -> None:
+        columns = request.keyset_column
+        if not columns:
+            raise ValueError("KeysetPager requires a request with keyset_column")
+        if isinstance(columns, str):
+            columns = (columns,)
+
+        params = dict(request.params)
+        order = params.pop("$order", None)
+        if order is not None and order.split()[0].rstrip(",") != columns[0]:
+            raise ValueError(f"Keyset paging orders by {', '.join(columns)}; drop $order={order!r} from the request")
+
+        # System fields such as :id are not part of "*", so select the key
+        # explicitly and hide it again unless the caller asked for it.
+        select = params.get("$select")
+        self.strip_keys = []
+        if select is not None:
+            selected = [part.strip() for part in select.split(",")]
+            for column in columns:
+                if column in selected or ("*" in selected and not column.startswith(":")):
+                    continue
+                params["$select"] = f"{params['$select']}, {column}"
+                self.strip_keys.append(column)
+
+        if request.keyset_start is not None and len(request.keyset_start) != len(columns):
+            raise ValueError(f"keyset_start needs one value per keyset column {columns}")
+
+        self.columns = columns
+        self.base_where = params.pop("$where", None)
+        self.base_params = params
+        self.last_seen: Optional[Tuple[Any, ...]] = request.keyset_start
+
+    def page_params(self, fetch_size: int) -> Dict[str, Any]:
+        clauses = [f"({self.base_where})"] if self.base_where else []
+        if self.last_seen is not None:
+            clauses.append(_after_key(self.columns, self.last_seen))
+
+        params = dict(self.base_params)
+        params["$order"] = ", ".join(f"{column} ASC" for column in self.columns)
+        params["$limit"] = fetch_size
+        if clauses:
+            params["$where"] = " AND ".join(clauses)
+        return params
+
+    def advance(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        for column in self.columns:
+            if column not in row:
+                raise ValueError(f"Socrata row is missing keyset column {column}")
+        self.last_seen = tuple(row[column] for column in self.columns)
+        if self.strip_keys:
+            return {key: value for key, value in row.items() if key not in self.strip_keys}
+        return row
+
+
+def _after_key(columns: Sequence[str], values: Sequence[Any]) -> str:
+    """SoQL predicate for keys ordered after ``values``; SoQL has no row comparisons."""
+
+    terms = []
+    for idx, column in enumerate(columns):
+        equal = [f"{prior} = {_soql_literal(value)}" for prior, value in zip(columns[:idx], values)]
+        terms.append(" AND ".join(equal + [f"{column} > {_soql_literal(values[idx])}"]))
+    if len(terms) == 1:
+        return terms[0]
+    return "(" + " OR ".join(f"({term})" for term in terms) + ")"
+
+
+def _soql_literal(value: Any) -> str:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    text = str(value).replace("'", "''")
+    return f"'{text}'"
+
+
 __all__ = ["SocrataClient", "SocrataRequest"]
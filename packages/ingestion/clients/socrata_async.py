@@ -0,0 +1,219 @@
+"""Async Socrata client that fans a date range out into concurrent slices."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import replace
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Iterator, List, Mapping, Optional, Tuple
+
+import httpx
+
+from .socrata import KeysetPager, SocrataRequest
+
+
+LOG = logging.getLogger(__name__)
+
+
+class AsyncSocrataClient:
+    """Asynchronous counterpart to :class:`SocrataClient`.
+
+    Parameters
+    ----------
+    base_url:
+        Base portal URL such as ``https://data.cityofchicago.org``.
+    app_token:
+        Optional application token for higher rate limits.
+    page_size:
+        Number of rows to request per call. Socrata caps this at 50k.
+    concurrency:
+        Maximum number of HTTP requests in flight at once.
+    max_retries:
+        Number of retries for transient HTTP errors.
+    backoff_seconds:
+        Initial backoff in seconds, doubled on each retry.
+    client:
+        Optional ``httpx.AsyncClient``; one is created (and closed by
+        :meth:`aclose`) if omitted.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        app_token: Optional[str] = None,
+        page_size: int = 5000,
+        concurrency: int = 8,
+        max_retries: int = 3,
+        backoff_seconds: float = 1.5,
+        client: Optional[httpx.AsyncClient] = None,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.base_url = base_url.rstrip("/")
+        self.app_token = app_token
+        self.page_size = page_size
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self._client = client or httpx.AsyncClient(timeout=30)
+        self._owns_client = client is None
+        self._request_slots = asyncio.Semaphore(concurrency)
+        self._retryable_statuses = {429, 500, 502, 503, 504}
+
+    async def __aenter__(self) -> "AsyncSocrataClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._owns_client:
+            await self._client.aclose()
+
+    async def fetch_rows(self, request: SocrataRequest) -> AsyncIterator[Dict[str, Any]]:
+        """Stream rows for one request, paging sequentially like the sync client."""
+
+        async for row in self._iter_pages(request):
+            yield row
+
+    async def fetch_range(
+        self,
+        request: SocrataRequest,
+        *,
+        column: str,
+        start: datetime,
+        end: datetime,
+        slice_size: timedelta = timedelta(days=1),
+        ordered: bool = True,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Fetch ``start <= column < end`` as concurrent slices of ``slice_size``.
+
+        Each slice is paged independently (keyset paging when the request sets
+        ``keyset_column``). With ``ordered`` rows are yielded slice by slice in
+        time order; otherwise each slice is yielded as soon as it completes.
+        ``request.limit`` caps the total rows yielded across all slices. At
+        most ``2 * concurrency`` slices are buffered at any time.
+        """
+
+        if slice_size <= timedelta(0):
+            raise ValueError("slice_size must be positive")
+
+        total = request.limit if request.limit is not None else float("inf")
+        slices = iter(_iter_slices(start, end, slice_size))
+        lookahead = 2 * self.concurrency
+        pending: List[asyncio.Task] = []
+        fetched = 0
+
+        def schedule() -> None:
+            while len(pending) < lookahead:
+                bounds = next(slices, None)
+                if bounds is None:
+                    return
+                slice_request = _slice_request(request, column, *bounds)
+                pending.append(asyncio.ensure_future(self._collect(slice_request)))
+
+        try:
+            schedule()
+            while pending and fetched < total:
+                if ordered:
+                    task = pending.pop(0)
+                    rows = await task
+                else:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    task = next(iter(done))
+                    pending.remove(task)
+                    rows = task.result()
+                schedule()
+
+                for row in rows:
+                    if fetched >= total:
+                        break
+                    fetched += 1
+                    yield row
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    # ------------------------------------------------------------------
+    async def _collect(self, request: SocrataRequest) -> List[Dict[str, Any]]:
+        return [row async for row in self._iter_pages(request)]
+
+    async def _iter_pages(self, request: SocrataRequest) -> AsyncIterator[Dict[str, Any]]:
+        pager = KeysetPager(request) if request.keyset_column else None
+        total = request.limit if request.limit is not None else float("inf")
+        fetched = 0
+
+        while fetched < total:
+            remaining = None if total is float("inf") else max(total - fetched, 0)
+            fetch_size = self.page_size if remaining is None else min(self.page_size, remaining)
+
+            if pager is not None:
+                params = pager.page_params(fetch_size)
+            else:
+                params = dict(request.params)
+                params.setdefault("$limit", fetch_size)
+                params["$offset"] = fetched
+
+            rows = await self._get(f"/resource/{request.dataset_id}.json", params=params)
+            if not rows:
+                break
+
+            for row in rows:
+                if fetched >= total:
+                    break
+                fetched += 1
+                yield pager.advance(row) if pager is not None else row
+
+            if len(rows) < fetch_size:
+                break
+
+    async def _get(self, path: str, *, params: Optional[Mapping[str, Any]] = None) -> List[Dict[str, Any]]:
+        url = f"{self.base_url}{path}"
+        headers: Dict[str, str] = {}
+        if self.app_token:
+            headers["X-App-Token"] = self.app_token
+
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                async with self._request_slots:
+                    resp = await self._client.get(url, params=params, headers=headers)
+                if resp.status_code in self._retryable_statuses:
+                    raise httpx.HTTPStatusError(
+                        f"{resp.status_code} Server Error", request=resp.request, response=resp
+                    )
+                resp.raise_for_status()
+                return resp.json()
+            except httpx.HTTPError as exc:
+                if attempt > self.max_retries:
+                    raise
+                sleep_for = self.backoff_seconds * (2 ** (attempt - 1))
+                LOG.warning("Socrata request failed (%s). Retrying in %.1fs", exc, sleep_for)
+                await asyncio.sleep(sleep_for)
+
+
+def _iter_slices(start: datetime, end: datetime, size: timedelta) -> Iterator[Tuple[datetime, datetime]]:
+    current = start
+    while current < end:
+        nxt = current + size
+        yield current, min(nxt, end)
+        current = nxt
+
+
+def _slice_request(request: SocrataRequest, column: str, start: datetime, end: datetime) -> SocrataRequest:
+    start_iso = start.strftime("%Y-%m-%dT%H:%M:%S")
+    end_iso = end.strftime("%Y-%m-%dT%H:%M:%S")
+    clause = f"{column} >= '{start_iso}' AND {column} < '{end_iso}'"
+
+    params = dict(request.params)
+    base_where = params.get("$where")
+    params["$where"] = f"({base_where}) AND {clause}" if base_where else clause
+    return replace(request, params=params, limit=None)
+
+
+__all__ = ["AsyncSocrataClient"]
@@ -0,0 +1,289 @@
+"""Statement timing with sampled EXPLAIN capture for slow queries.
+
+:class:`InstrumentedCursor` (ingestion, sync) and
+:class:`AsyncInstrumentedCursor` (API, async) time every ``execute``. A
+statement slower than ``CRIMEGRID_SLOW_QUERY_MS`` is, with probability
+``CRIMEGRID_SLOW_QUERY_SAMPLE_RATE`` and at most once per
+``CRIMEGRID_SLOW_QUERY_COOLDOWN`` seconds per statement shape, explained on
+the same connection and logged along with its normalized parameters.
+With ``CRIMEGRID_SLOW_QUERY_TABLE`` enabled it is also written to
+``slow_queries``.
+
+Only plain ``SELECT``/``WITH`` statements without DML keywords or calls to
+volatile functions (looked up in ``pg_proc``) get ``EXPLAIN (ANALYZE,
+BUFFERS)``, so they run a second time; everything else gets a plain
+``EXPLAIN``. The plan is captured in a savepoint that is always rolled back,
+so a statement with side effects the checks miss cannot keep them, and a
+failure never affects the caller's transaction.
+
+Only ``execute`` is timed: ``executemany`` and ``copy`` are not instrumented.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import random
+import re
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+import psycopg
+from psycopg import sql
+from psycopg.rows import tuple_row
+from psycopg.types.json import Jsonb
+
+
+LOG = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.getenv("CRIMEGRID_SLOW_QUERY_MS", "500"))  # 0 disables capture
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv("CRIMEGRID_SLOW_QUERY_SAMPLE_RATE", "0.1"))
+SLOW_QUERY_COOLDOWN = float(os.getenv("CRIMEGRID_SLOW_QUERY_COOLDOWN", "300"))  # seconds per statement shape
+SLOW_QUERY_TABLE = os.getenv("CRIMEGRID_SLOW_QUERY_TABLE", "1").lower() not in {"0", "false", "no"}
+
+EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH|VALUES|TABLE|INSERT|UPDATE|DELETE|MERGE)\b", re.IGNORECASE)
+MODIFYING = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE)\b", re.IGNORECASE)
+READ_ONLY = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+FUNCTION_CALL = re.compile(r"([A-Za-z_][\w$]*)\s*\(")
+MAX_PARAM_ITEMS = 10
+MAX_PARAM_CHARS = 200
+MAX_TRACKED_SHAPES = 1000
+
+_last_captured: dict[str, float] = {}
+
+
+def statement_text(query: Any, context: Any) -> str:
+    """The statement with placeholders intact and whitespace collapsed."""
+
+    if isinstance(query, sql.Composable):
+        query = query.as_string(context)
+    if isinstance(query, bytes):
+        query = query.decode()
+    return " ".join(str(query).split())
+
+
+def fingerprint(statement: str) -> str:
+    return hashlib.blake2b(statement.encode(), digest_size=8).hexdigest()
+
+
+def normalize_param(value: Any) -> Any:
+    """A JSON-friendly, size-bounded rendering of one query parameter."""
+
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<{len(value)} bytes>"
+    if isinstance(value, (list, tuple)):
+        items = [normalize_param(item) for item in value[:MAX_PARAM_ITEMS]]
+        if len(value) > MAX_PARAM_ITEMS:
+            items.append(f"<{len(value) - MAX_PARAM_ITEMS} more>")
+        return items
+    text = str(getattr(value, "obj", value))  # unwrap Json/Jsonb adapters
+    if len(text) > MAX_PARAM_CHARS:
+        return text[:MAX_PARAM_CHARS] + "..."
+    return text
+
+
+def normalize_params(params: Any) -> Any:
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: normalize_param(value) for key, value in params.items()}
+    return [normalize_param(value) for value in params]
+
+
+def summarize_plan(plan: Any) -> tuple[list[str], list[str]]:
+    """Indexes used and relations read by sequential scan in a JSON plan."""
+
+    indexes: set[str] = set()
+    seq_scans: set[str] = set()
+
+    def walk(node: dict) -> None:
+        if "Index Name" in node:
+            indexes.add(node["Index Name"])
+        if node.get("Node Type") == "Seq Scan" and "Relation Name" in node:
+            seq_scans.add(node["Relation Name"])
+        for child in node.get("Plans", ()):
+            walk(child)
+
+    for entry in plan or ():
+        walk(entry.get("Plan", {}))
+    return sorted(indexes), sorted(seq_scans)
+
+
+def should_capture(statement: str, elapsed_ms: float) -> bool:
+    if SLOW_QUERY_MS <= 0 or elapsed_ms < SLOW_QUERY_MS:
+        return False
+    if not EXPLAINABLE.match(statement) or random.random() >= SLOW_QUERY_SAMPLE_RATE:
+        return False
+    key = fingerprint(statement)
+    now = time.monotonic()
+    if now - _last_captured.get(key, float("-inf")) < SLOW_QUERY_COOLDOWN:
+        return False
+    if len(_last_captured) >= MAX_TRACKED_SHAPES:
+        _last_captured.clear()
+    _last_captured[key] = now
+    return True
+
+
+def function_names(statement: str) -> list[str]:
+    """Lowercased names followed by ``(`` in a statement (keywords included)."""
+
+    return sorted({name.lower() for name in FUNCTION_CALL.findall(statement)})
+
+
+def may_analyze(statement: str) -> bool:
+    """Whether a statement is a plain query, before checking its functions."""
+
+    return bool(READ_ONLY.match(statement)) and not MODIFYING.search(statement)
+
+
+# Names that are not functions (keywords, aliases) simply do not match.
+CALLS_VOLATILE = """
+    SELECT EXISTS (SELECT 1 FROM pg_proc WHERE proname = ANY(%s) AND provolatile = 'v')
+"""
+
+
+def explain_query(query: Any, analyze: bool) -> Any:
+    options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+    prefix = f"EXPLAIN ({options}) "
+    if isinstance(query, sql.Composable):
+        return sql.Composed([sql.SQL(prefix), query])
+    if isinstance(query, bytes):
+        query = query.decode()
+    return prefix + query
+
+
+def _capture_record(source: str, statement: str, params: Any, elapsed_ms: float, analyze: bool, plan: Any) -> dict:
+    indexes, seq_scans = summarize_plan(plan)
+    record = {
+        "source": source,
+        "fingerprint": fingerprint(statement),
+        "statement": statement,
+        "params": normalize_params(params),
+        "duration_ms": round(elapsed_ms, 3),
+        "analyzed": analyze,
+        "plan": plan,
+        "plan_indexes": indexes,
+        "plan_seq_scans": seq_scans,
+    }
+    LOG.warning(
+        "Slow query %s (%s, %.1fms): indexes=%s seq_scans=%s params=%s statement=%s",
+        record["fingerprint"],
+        source,
+        elapsed_ms,
+        indexes,
+        seq_scans,
+        record["params"],
+        statement,
+    )
+    return record
+
+
+INSERT_SLOW_QUERY = """
+    INSERT INTO slow_queries (
+        source, fingerprint, statement, params, duration_ms, analyzed, plan, plan_indexes, plan_seq_scans
+    )
+    VALUES (
+        %(source)s, %(fingerprint)s, %(statement)s, %(params)s, %(duration_ms)s, %(analyzed)s,
+        %(plan)s, %(plan_indexes)s, %(plan_seq_scans)s
+    );
+"""
+
+
+def _insert_params(record: dict) -> dict:
+    return {**record, "params": Jsonb(record["params"]), "plan": Jsonb(record["plan"])}
+
+
+class InstrumentedCursor(psycopg.Cursor):
+    """Client cursor that times statements and samples slow-query plans."""
+
+    source = "ingestion"
+
+    def execute(self, query, params=None, **kwargs):
+        started = time.perf_counter()
+        result = super().execute(query, params, **kwargs)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if SLOW_QUERY_MS > 0 and elapsed_ms >= SLOW_QUERY_MS:
+            statement = statement_text(query, self)
+            if should_capture(statement, elapsed_ms):
+                self._capture(query, params, statement, elapsed_ms)
+        return result
+
+    def _capture(self, query, params, statement: str, elapsed_ms: float) -> None:
+        # Results of a client cursor are already fetched, so a second cursor
+        # on the same connection leaves them intact. A plain Cursor avoids
+        # timing the EXPLAIN itself.
+        try:
+            with self.connection.transaction():
+                with psycopg.Cursor(self.connection, row_factory=tuple_row) as cur:
+                    analyze = may_analyze(statement)
+                    if analyze:
+                        cur.execute(CALLS_VOLATILE, (function_names(statement),))
+                        analyze = not cur.fetchone()[0]
+                    cur.execute(explain_query(query, analyze), params)
+                    plan = cur.fetchone()[0]
+                # Undo anything the explained statement did, analyzed or not.
+                raise psycopg.Rollback()
+
+            record = _capture_record(self.source, statement, params, elapsed_ms, analyze, plan)
+            if SLOW_QUERY_TABLE:
+                with self.connection.transaction():
+                    with psycopg.Cursor(self.connection) as cur:
+                        cur.execute(INSERT_SLOW_QUERY, _insert_params(record))
+        except psycopg.Error:
+            LOG.warning("Could not capture plan for slow query %s", fingerprint(statement), exc_info=True)
+
+
+class AsyncInstrumentedCursor(psycopg.AsyncCursor):
+    """Async counterpart of :class:`InstrumentedCursor`."""
+
+    source = "api"
+
+    async def execute(self, query, params=None, **kwargs):
+        started = time.perf_counter()
+        result = await super().execute(query, params, **kwargs)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if SLOW_QUERY_MS > 0 and elapsed_ms >= SLOW_QUERY_MS:
+            statement = statement_text(query, self)
+            if should_capture(statement, elapsed_ms):
+                await self._capture(query, params, statement, elapsed_ms)
+        return result
+
+    async def _capture(self, query, params, statement: str, elapsed_ms: float) -> None:
+        try:
+            async with self.connection.transaction():
+                async with psycopg.AsyncCursor(self.connection, row_factory=tuple_row) as cur:
+                    analyze = may_analyze(statement)
+                    if analyze:
+                        await cur.execute(CALLS_VOLATILE, (function_names(statement),))
+                        analyze = not (await cur.fetchone())[0]
+                    await cur.execute(explain_query(query, analyze), params)
+                    plan = (await cur.fetchone())[0]
+                raise psycopg.Rollback()
+
+            record = _capture_record(self.source, statement, params, elapsed_ms, analyze, plan)
+            if SLOW_QUERY_TABLE:
+                async with self.connection.transaction():
+                    async with psycopg.AsyncCursor(self.connection) as cur:
+                        await cur.execute(INSERT_SLOW_QUERY, _insert_params(record))
+        except psycopg.Error:
+            LOG.warning("Could not capture plan for slow query %s", fingerprint(statement), exc_info=True)
+
+
+__all__ = [
+    "AsyncInstrumentedCursor",
+    "InstrumentedCursor",
+    "function_names",
+    "may_analyze",
+    "normalize_params",
+    "statement_text",
+    "summarize_plan",
+]
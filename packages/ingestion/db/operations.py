@@ -2,13 +2,17 @@
 
 from __future__ import annotations
 
-from typing import Sequence
+from datetime import date, datetime, timedelta, timezone
+from itertools import repeat
+from typing import Iterator, Sequence, Union
 
-from psycopg import Connection
+from psycopg import Connection, Cursor
 from psycopg.rows import dict_row
 from psycopg.types.json import Json
 
-from ..models import NormalizedIncident
+from ..models import IncidentBatch, NormalizedIncident
+
+Incidents = Union[Sequence[NormalizedIncident], IncidentBatch]
 
 
 def ensure_source(
@@ -67,8 +71,18 @@ def finalize_ingest_run(
     rows_fetched: int,
     rows_inserted: int,
     rows_updated: int,
+    rows_unchanged: int | None = None,
     notes: str | None = None,
+    high_watermark: datetime | None = None,
+    high_watermark_id: str | None = None,
 ) -> None:
+    """Record the outcome of an ingest run.
+
+    A succeeded run also refreshes ``city_stats`` for its source's city in the
+    same transaction, so ``/cities`` reflects the run as soon as it is marked
+    complete.
+    """
+
     with conn.cursor() as cur:
         cur.execute(
             """
@@ -79,75 +93,873 @@ def finalize_ingest_run(
                 rows_fetched = %s,
                 rows_inserted = %s,
                 rows_updated = %s,
-                notes = %s
+                rows_unchanged = %s,
+                notes = %s,
+                high_watermark = %s,
+                high_watermark_id = %s
             WHERE id = %s;
             """,
-            (status, rows_fetched, rows_inserted, rows_updated, notes, run_id),
+            (
+                status,
+                rows_fetched,
+                rows_inserted,
+                rows_updated,
+                rows_unchanged,
+                notes,
+                high_watermark,
+                high_watermark_id,
+                run_id,
+            ),
         )
+        if status == "succeeded":
+            _refresh_city_stats(cur, run_id=run_id)
     conn.commit()
 
 
+def _refresh_city_stats(cur: Cursor, *, run_id: int) -> None:
+    """Recompute the ``city_stats`` row for the city ingested by ``run_id``.
+
+    Totals come from ``incident_daily_summary`` (one index range per city),
+    not from ``incidents``.
+    """
+
+    cur.execute(
+        """
+        INSERT INTO city_stats AS stats (
+            city, total_incidents, last_occurred_at, last_ingest_at, last_ingest_run_id, refreshed_at
+        )
+        SELECT
+            s.city,
+            COALESCE(SUM(summary.incident_count), 0),
+            MAX(summary.last_occurred_at),
+            r.run_completed_at,
+            r.id,
+            now()
+        FROM ingest_runs r
+        JOIN sources s ON s.id = r.source_id
+        LEFT JOIN incident_daily_summary summary ON summary.city = s.city
+        WHERE r.id = %s
+        GROUP BY s.city, r.id, r.run_completed_at
+        ON CONFLICT (city) DO UPDATE SET
+            total_incidents = EXCLUDED.total_incidents,
+            last_occurred_at = EXCLUDED.last_occurred_at,
+            last_ingest_at = EXCLUDED.last_ingest_at,
+            last_ingest_run_id = EXCLUDED.last_ingest_run_id,
+            refreshed_at = EXCLUDED.refreshed_at;
+        """,
+        (run_id,),
+    )
+
+
+def get_high_watermark(
+    conn: Connection, *, source_id: int, flow_name: str
+) -> tuple[datetime, str | None] | None:
+    """Return the (watermark, row id) recorded by the latest succeeded run of ``flow_name``.
+
+    The row id is only set when that run stopped at its row limit.
+    """
+
+    with conn.cursor(row_factory=dict_row) as cur:
+        cur.execute(
+            """
+            SELECT high_watermark, high_watermark_id
+            FROM ingest_runs
+            WHERE source_id = %s
+              AND flow_name = %s
+              AND status = 'succeeded'
+              AND high_watermark IS NOT NULL
+            ORDER BY id DESC
+            LIMIT 1;
+            """,
+            (source_id, flow_name),
+        )
+        row = cur.fetchone()
+    return (row["high_watermark"], row["high_watermark_id"]) if row else None
+
+
+UPSERT_METHODS = ("copy", "row")
+
+_INCIDENT_COLUMNS = (
+    "city",
+    "id",
+    "source_id",
+    "ingest_run_id",
+    "external_case_id",
+    "row_uid",
+    "occurred_at",
+    "reported_at",
+    "last_updated_at",
+    "primary_type",
+    "description",
+    "iucr",
+    "arrest",
+    "domestic",
+    "district",
+    "beat",
+    "ward",
+    "community_area",
+    "location_description",
+    "street_block",
+    "latitude",
+    "longitude",
+    "x_coordinate",
+    "y_coordinate",
+    "raw_record",
+    "receipt_url",
+    "content_hash",
+)
+
+_UPSERT_CONFLICT_CLAUSE = """
+    ON CONFLICT (city, id, occurred_at) DO UPDATE SET
+        source_id = EXCLUDED.source_id,
+        ingest_run_id = EXCLUDED.ingest_run_id,
+        external_case_id = EXCLUDED.external_case_id,
+        row_uid = EXCLUDED.row_uid,
+        reported_at = EXCLUDED.reported_at,
+        last_updated_at = EXCLUDED.last_updated_at,
+        primary_type = EXCLUDED.primary_type,
+        description = EXCLUDED.description,
+        iucr = EXCLUDED.iucr,
+        arrest = EXCLUDED.arrest,
+        domestic = EXCLUDED.domestic,
+        district = EXCLUDED.district,
+        beat = EXCLUDED.beat,
+        ward = EXCLUDED.ward,
+        community_area = EXCLUDED.community_area,
+        location_description = EXCLUDED.location_description,
+        street_block = EXCLUDED.street_block,
+        latitude = EXCLUDED.latitude,
+        longitude = EXCLUDED.longitude,
+        geom = CASE
+            WHEN EXCLUDED.longitude IS NULL OR EXCLUDED.latitude IS NULL THEN NULL
+            ELSE ST_SetSRID(ST_MakePoint(EXCLUDED.longitude, EXCLUDED.latitude), 4326)
+        END,
+        geohash7 = CASE
+            WHEN EXCLUDED.longitude IS NULL OR EXCLUDED.latitude IS NULL THEN NULL
+            ELSE ST_GeoHash(ST_SetSRID(ST_MakePoint(EXCLUDED.longitude, EXCLUDED.latitude), 4326), 7)
+        END,
+        x_coordinate = EXCLUDED.x_coordinate,
+        y_coordinate = EXCLUDED.y_coordinate,
+        raw_record = EXCLUDED.raw_record,
+        receipt_url = EXCLUDED.receipt_url,
+        content_hash = EXCLUDED.content_hash,
+        updated_at = now()
+"""
+
+_SKIP_UNCHANGED_PREDICATE = """
+    WHERE incidents.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+"""
+
+
 def upsert_incidents(
     conn: Connection,
     *,
     source_id: int,
-    incidents: Sequence[NormalizedIncident],
+    incidents: Incidents,
     ingest_run_id: int | None = None,
-) -> tuple[int, int]:
-    """Insert or update incidents, returning (inserted, updated) counts."""
+    method: str = "copy",
+    skip_unchanged: bool = True,
+) -> tuple[int, int, int]:
+    """Insert or update incidents, returning (inserted, updated, unchanged) counts.
+
+    ``incidents`` may be a sequence of :class:`NormalizedIncident` or a
+    columnar :class:`IncidentBatch`, which is written without materializing
+    per-row objects.
+
+    ``method="copy"`` streams the batch into a temporary staging table with
+    ``COPY`` and merges it with one set-based ``INSERT ... SELECT``.
+    ``method="row"`` issues one ``INSERT ... ON CONFLICT`` per incident.
+
+    With ``skip_unchanged`` existing rows whose stored ``content_hash`` matches
+    the incoming fingerprint are left untouched and counted as unchanged.
+
+    Writers of the same city are serialized for the rest of the transaction
+    by an advisory lock, so the summary deltas, the insert/update counts and
+    moved-row deletes all see every row a concurrent batch wrote.
+
+    ``incident_daily_summary`` is updated in the same transaction. Touched
+    map tiles are recorded in ``tile_invalidations`` in a short transaction
+    right after the commit; if that fails the incidents stay written and the
+    error is raised, and re-sending the batch records the tiles again.
+
+    Incidents are keyed by (city, id, occurred_at) because city partitions
+    are sub-partitioned by year. An incident whose ``occurred_at`` changed
+    has its previous version deleted and is counted as updated. Missing
+    yearly partitions are created (and committed) first.
+    """
+
+    if method not in UPSERT_METHODS:
+        raise ValueError(f"Unsupported upsert method: {method}")
 
     if not incidents:
-        return (0, 0)
+        return (0, 0, 0)
+
+    try:
+        _ensure_partitions_for(conn, incidents)
+
+        with conn.cursor(row_factory=dict_row) as cur:
+            _lock_cities(cur, incidents)
+            shrunk_buckets = _apply_summary_deltas(cur, incidents)
+            tiles = _touched_tiles(cur, incidents)
+
+        if method == "copy":
+            counts = _upsert_incidents_copy(
+                conn,
+                source_id=source_id,
+                incidents=incidents,
+                ingest_run_id=ingest_run_id,
+                skip_unchanged=skip_unchanged,
+            )
+        else:
+            counts = _upsert_incidents_rowwise(
+                conn,
+                source_id=source_id,
+                incidents=incidents,
+                ingest_run_id=ingest_run_id,
+                skip_unchanged=skip_unchanged,
+            )
+        with conn.cursor(row_factory=dict_row) as cur:
+            _refresh_summary_last_occurred(cur, shrunk_buckets)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    _record_tile_invalidations(conn, tiles)
+    return counts
+
+
+# (city, UTC year) pairs this process has already ensured a partition for.
+_ensured_partition_years: set[tuple[str, int]] = set()
+
+
+def ensure_incident_partitions(conn: Connection, *, city: str, start: datetime, end: datetime) -> int:
+    """Create the yearly ``incidents`` partitions of ``city`` covering [start, end].
+
+    Rows already sitting in the city's default partition for a new year are
+    moved into it. A no-op for cities that are not sub-partitioned. Commits,
+    so the DDL locks are released before any data is written. Returns the
+    number of partitions created.
+    """
+
+    with conn.cursor(row_factory=dict_row) as cur:
+        cur.execute(
+            "SELECT ensure_incident_partitions(%s, %s, %s) AS created",
+            (city, start, end),
+        )
+        created = cur.fetchone()["created"]
+    conn.commit()
+    return created
+
+
+def fetch_incident_partitions(conn: Connection, *, city: str) -> list[dict]:
+    """Leaf partitions holding ``city``'s incidents, with bounds and size."""
+
+    with conn.cursor(row_factory=dict_row) as cur:
+        cur.execute(
+            """
+            SELECT
+                c.relname AS name,
+                pg_get_expr(c.relpartbound, c.oid) AS bounds,
+                GREATEST(c.reltuples, 0)::bigint AS estimated_rows,
+                pg_total_relation_size(c.oid) AS total_bytes
+            FROM pg_partition_tree(to_regclass(%s)) AS tree
+            JOIN pg_class AS c ON c.oid = tree.relid
+            WHERE tree.isleaf
+            ORDER BY c.relname
+            """,
+            (f"incidents_city_{city}",),
+        )
+        return cur.fetchall()
+
+
+def _ensure_partitions_for(conn: Connection, incidents: Incidents) -> None:
+    if isinstance(incidents, IncidentBatch):
+        pairs = zip(repeat(incidents.city), incidents.occurred_at)
+    else:
+        pairs = ((incident.city, incident.occurred_at) for incident in incidents)
+
+    ranges: dict[str, tuple[datetime, datetime]] = {}
+    for city, occurred_at in pairs:
+        low, high = _utc_bounds(occurred_at)
+        if all((city, year) in _ensured_partition_years for year in range(low.year, high.year + 1)):
+            continue
+        if city in ranges:
+            low, high = min(low, ranges[city][0]), max(high, ranges[city][1])
+        ranges[city] = (low, high)
+
+    for city, (low, high) in ranges.items():
+        ensure_incident_partitions(conn, city=city, start=low, end=high)
+        _ensured_partition_years.update((city, year) for year in range(low.year, high.year + 1))
+
+
+def _utc_bounds(value: datetime) -> tuple[datetime, datetime]:
+    """UTC instants bracketing ``value``; partitions are bounded by UTC year.
+
+    Naive timestamps are interpreted in the session time zone on insert, so
+    they are read as UTC and padded by a day to cover any offset.
+    """
+
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+        return value - timedelta(days=1), value + timedelta(days=1)
+    value = value.astimezone(timezone.utc)
+    return value, value
+
+
+def _lock_cities(cur: Cursor, incidents: Incidents) -> None:
+    """Take the per-city ingest lock for the rest of the transaction.
+
+    Without it two batches carrying the same new incident would both see it
+    missing, both add +1 to its summary bucket and, when their occurred_at
+    differ, both insert a version. Cities are locked in sorted order so
+    multi-city batches cannot deadlock.
+    """
+
+    if isinstance(incidents, IncidentBatch):
+        cities = [incidents.city]
+    else:
+        cities = sorted({incident.city for incident in incidents})
+    for city in cities:
+        cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"upsert_incidents:{city}",))
+
+
+def _apply_summary_deltas(cur: Cursor, incidents: Incidents) -> list[tuple[str, date, str]]:
+    """Adjust ``incident_daily_summary`` for the incidents about to be upserted.
+
+    Must run before the upsert, in the same transaction: each incoming
+    incident adds one to its (city, day, primary_type) bucket and each stored
+    version it replaces subtracts one from the bucket it was counted in, so
+    unchanged rows cancel out and moved rows shift buckets. Buckets are
+    written in key order so concurrent writers lock them consistently.
+
+    Stored versions are probed by the full key first, which prunes to one
+    yearly partition; only incidents without such a match (new or moved)
+    are looked up by (city, id) across every partition.
+
+    Returns the buckets that lost a stored version to another occurred_at or
+    primary_type; their ``last_occurred_at`` may now be too high and is fixed
+    by :func:`_refresh_summary_last_occurred` once the upsert has run.
+    """
+
+    if isinstance(incidents, IncidentBatch):
+        cities = [incidents.city] * len(incidents)
+        ids = incidents.incident_ids()
+        occurred = incidents.occurred_at
+        types = incidents.primary_type
+    else:
+        cities = [incident.city for incident in incidents]
+        ids = [incident.incident_id for incident in incidents]
+        occurred = [incident.occurred_at for incident in incidents]
+        types = [incident.primary_type for incident in incidents]
+
+    cur.execute(
+        """
+        WITH incoming AS (
+            SELECT DISTINCT ON (city, id) city, id, occurred_at, primary_type
+            FROM unnest(%s::text[], %s::text[], %s::timestamptz[], %s::text[])
+                WITH ORDINALITY AS t(city, id, occurred_at, primary_type, ord)
+            ORDER BY city, id, ord DESC
+        ),
+        same_key AS (
+            SELECT
+                existing.city,
+                existing.id,
+                existing.occurred_at,
+                existing.primary_type,
+                existing.primary_type IS DISTINCT FROM incoming.primary_type AS shrunk
+            FROM incoming
+            JOIN incidents AS existing
+                ON existing.city = incoming.city
+                AND existing.id = incoming.id
+                AND existing.occurred_at = incoming.occurred_at
+        ),
+        replaced AS (
+            SELECT city, occurred_at, primary_type, shrunk
+            FROM same_key
+            UNION ALL
+            SELECT existing.city, existing.occurred_at, existing.primary_type, true
+            FROM incoming
+            JOIN incidents AS existing
+                ON existing.city = incoming.city
+                AND existing.id = incoming.id
+                AND existing.occurred_at <> incoming.occurred_at
+            WHERE NOT EXISTS (
+                SELECT 1 FROM same_key WHERE same_key.city = incoming.city AND same_key.id = incoming.id
+            )
+        ),
+        deltas AS (
+            SELECT city, occurred_at, primary_type, 1 AS delta
+            FROM incoming
+            UNION ALL
+            SELECT city, occurred_at, primary_type, -1
+            FROM replaced
+        ),
+        applied AS (
+            INSERT INTO incident_daily_summary AS summary (
+                city, day, primary_type, incident_count, last_occurred_at
+            )
+            SELECT
+                city,
+                (occurred_at AT TIME ZONE 'UTC')::date,
+                primary_type,
+                SUM(delta),
+                MAX(occurred_at) FILTER (WHERE delta > 0)
+            FROM deltas
+            GROUP BY 1, 2, 3
+            HAVING SUM(delta) <> 0
+            ORDER BY 1, 2, 3
+            ON CONFLICT (city, day, primary_type) DO UPDATE SET
+                incident_count = summary.incident_count + EXCLUDED.incident_count,
+                last_occurred_at = GREATEST(summary.last_occurred_at, EXCLUDED.last_occurred_at),
+                updated_at = now()
+        )
+        SELECT DISTINCT city, (occurred_at AT TIME ZONE 'UTC')::date AS day, primary_type
+        FROM replaced
+        WHERE shrunk
+        ORDER BY 1, 2, 3
+        """,
+        (cities, ids, occurred, types),
+    )
+    return [(row["city"], row["day"], row["primary_type"]) for row in cur.fetchall()]
+
+
+def _refresh_summary_last_occurred(cur: Cursor, buckets: list[tuple[str, date, str]]) -> None:
+    """Recompute ``last_occurred_at`` of ``buckets`` from the stored incidents.
+
+    Must run after the upsert, in the same transaction. ``GREATEST`` in
+    :func:`_apply_summary_deltas` only ever raises it, so a bucket whose
+    latest incident moved away would otherwise keep reporting it; an empty
+    bucket gets NULL.
+    """
+
+    if not buckets:
+        return
+    cities, days, types = (list(column) for column in zip(*buckets))
+    cur.execute(
+        """
+        UPDATE incident_daily_summary AS summary
+        SET
+            last_occurred_at = (
+                SELECT MAX(incidents.occurred_at)
+                FROM incidents
+                WHERE incidents.city = summary.city
+                  AND incidents.primary_type = summary.primary_type
+                  AND incidents.occurred_at >= summary.day::timestamp AT TIME ZONE 'UTC'
+                  AND incidents.occurred_at < (summary.day + 1)::timestamp AT TIME ZONE 'UTC'
+            ),
+            updated_at = now()
+        FROM unnest(%s::text[], %s::date[], %s::text[]) AS shrunk(city, day, primary_type)
+        WHERE summary.city = shrunk.city
+          AND summary.day = shrunk.day
+          AND summary.primary_type = shrunk.primary_type
+        """,
+        (cities, days, types),
+    )
+
+
+# Zoom at which touched tiles are recorded; the API caches tiles up to this
+# zoom and evicts the recorded tile plus its ancestors.
+TILE_INVALIDATION_ZOOM = 16
+
+# Web-mercator tile coordinates of a lat/lon pair; mirrored by heatmap.tile_xy.
+_TILE_X_SQL = "LEAST(GREATEST(floor(({lon} + 180) / 360 * 2 ^ {z}), 0), 2 ^ {z} - 1)::int"
+_TILE_Y_SQL = (
+    "LEAST(GREATEST(floor("
+    "(1 - ln(tan(radians({lat})) + 1 / cos(radians({lat}))) / pi()) / 2 * 2 ^ {z}"
+    "), 0), 2 ^ {z} - 1)::int"
+)
+_MERCATOR_BOUNDS_SQL = "{lat} BETWEEN -85.0511 AND 85.0511 AND {lon} BETWEEN -180 AND 180"
+
+
+def _tile_sql(lat: str, lon: str, z: str) -> tuple[str, str, str]:
+    """SQL for (tile x, tile y, in-range predicate) given column/param expressions."""
+
+    return (
+        _TILE_X_SQL.format(lon=lon, z=z),
+        _TILE_Y_SQL.format(lat=lat, z=z),
+        _MERCATOR_BOUNDS_SQL.format(lat=lat, lon=lon),
+    )
+
+
+def _touched_tiles(cur: Cursor, incidents: Incidents) -> list[tuple[str, int, int]]:
+    """Map tiles covering incoming incidents (and moved rows' old spots).
+
+    Like :func:`_apply_summary_deltas` this runs before the upsert so stored
+    coordinates are still the previous ones, and probes by the full key
+    before falling back to (city, id) for new or moved incidents. It only reads, so no
+    ``tile_invalidations`` rows are locked for the rest of the transaction.
+    """
+
+    if isinstance(incidents, IncidentBatch):
+        cities = [incidents.city] * len(incidents)
+        ids = incidents.incident_ids()
+        occurred = incidents.occurred_at
+        latitudes = incidents.column("latitude")
+        longitudes = incidents.column("longitude")
+    else:
+        cities = [incident.city for incident in incidents]
+        ids = [incident.incident_id for incident in incidents]
+        occurred = [incident.occurred_at for incident in incidents]
+        latitudes = [incident.latitude for incident in incidents]
+        longitudes = [incident.longitude for incident in incidents]
+
+    tile_x, tile_y, in_range = _tile_sql("latitude", "longitude", "%(z)s")
+    cur.execute(
+        f"""
+        WITH incoming AS (
+            SELECT city, id, occurred_at, latitude, longitude
+            FROM unnest(
+                %(cities)s::text[], %(ids)s::text[], %(occurred)s::timestamptz[],
+                %(lats)s::float8[], %(lons)s::float8[]
+            ) AS t(city, id, occurred_at, latitude, longitude)
+        ),
+        same_key AS (
+            SELECT existing.city, existing.id, existing.latitude, existing.longitude
+            FROM incoming
+            JOIN incidents AS existing
+                ON existing.city = incoming.city
+                AND existing.id = incoming.id
+                AND existing.occurred_at = incoming.occurred_at
+        ),
+        points AS (
+            SELECT city, latitude, longitude
+            FROM incoming
+            UNION
+            SELECT city, latitude, longitude
+            FROM same_key
+            UNION
+            SELECT existing.city, existing.latitude, existing.longitude
+            FROM incoming
+            JOIN incidents AS existing
+                ON existing.city = incoming.city
+                AND existing.id = incoming.id
+                AND existing.occurred_at <> incoming.occurred_at
+            WHERE NOT EXISTS (
+                SELECT 1 FROM same_key WHERE same_key.city = incoming.city AND same_key.id = incoming.id
+            )
+        ),
+        tiles AS (
+            SELECT DISTINCT city, {tile_x} AS x, {tile_y} AS y
+            FROM points
+            WHERE {in_range}
+        )
+        SELECT city, x, y
+        FROM tiles
+        ORDER BY city, x, y
+        """,
+        {
+            "cities": cities,
+            "ids": ids,
+            "occurred": occurred,
+            "lats": latitudes,
+            "lons": longitudes,
+            "z": TILE_INVALIDATION_ZOOM,
+        },
+    )
+    return [(row["city"], row["x"], row["y"]) for row in cur.fetchall()]
+
+
+def _record_tile_invalidations(conn: Connection, tiles: list[tuple[str, int, int]]) -> None:
+    """Upsert ``tile_invalidations`` for ``tiles`` in a short transaction of its own.
+
+    Runs after the incidents are committed, so readers never see an
+    invalidation before the data behind it. Parallel writers covering the
+    same city only contend for these rows for one statement instead of a
+    whole batch. Tiles arrive in key order so writers lock them consistently.
+    """
+
+    if not tiles:
+        return
+    cities, xs, ys = (list(column) for column in zip(*tiles))
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO tile_invalidations (city, z, x, y, invalidated_at)
+                SELECT city, %s, x, y, now()
+                FROM unnest(%s::text[], %s::int[], %s::int[]) AS t(city, x, y)
+                ON CONFLICT (city, z, x, y) DO UPDATE SET invalidated_at = EXCLUDED.invalidated_at
+                """,
+                (TILE_INVALIDATION_ZOOM, cities, xs, ys),
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
 
+def _iter_incident_values(
+    incidents: Incidents,
+    *,
+    source_id: int,
+    ingest_run_id: int | None,
+) -> Iterator[tuple]:
+    """Yield column values per incident in ``_INCIDENT_COLUMNS`` order."""
+
+    if isinstance(incidents, IncidentBatch):
+        batch = incidents
+        yield from zip(
+            repeat(batch.city),
+            batch.incident_ids(),
+            repeat(source_id),
+            repeat(ingest_run_id),
+            batch.external_case_id,
+            batch.row_uid,
+            batch.occurred_at,
+            batch.reported_at,
+            batch.last_updated_at,
+            batch.primary_type,
+            batch.description,
+            batch.iucr,
+            batch.arrest,
+            batch.domestic,
+            batch.district,
+            batch.beat,
+            batch.ward,
+            batch.community_area,
+            batch.location_description,
+            batch.street_block,
+            batch.column("latitude"),
+            batch.column("longitude"),
+            batch.column("x_coordinate"),
+            batch.column("y_coordinate"),
+            map(Json, batch.raw_record),
+            batch.receipt_url,
+            batch.fingerprints(),
+        )
+        return
+
+    for incident in incidents:
+        yield (
+            incident.city,
+            incident.incident_id,
+            source_id,
+            ingest_run_id,
+            incident.external_case_id,
+            incident.row_uid,
+            incident.occurred_at,
+            incident.reported_at,
+            incident.last_updated_at,
+            incident.primary_type,
+            incident.description,
+            incident.iucr,
+            incident.arrest,
+            incident.domestic,
+            incident.district,
+            incident.beat,
+            incident.ward,
+            incident.community_area,
+            incident.location_description,
+            incident.street_block,
+            incident.latitude,
+            incident.longitude,
+            incident.x_coordinate,
+            incident.y_coordinate,
+            Json(incident.raw_record),
+            incident.receipt_url,
+            incident.fingerprint(),
+        )
+
+
+def _upsert_incidents_copy(
+    conn: Connection,
+    *,
+    source_id: int,
+    incidents: Incidents,
+    ingest_run_id: int | None,
+    skip_unchanged: bool,
+) -> tuple[int, int, int]:
+    columns = ", ".join(_INCIDENT_COLUMNS)
+    conflict_clause = _UPSERT_CONFLICT_CLAUSE + (_SKIP_UNCHANGED_PREDICATE if skip_unchanged else "")
+
+    with conn.cursor(row_factory=dict_row) as cur:
+        # ON COMMIT DELETE ROWS empties the stage whenever the caller commits,
+        # so the table is created once per connection and reused per batch.
+        cur.execute(
+            """
+            CREATE TEMP TABLE IF NOT EXISTS incidents_stage (
+                stage_seq            BIGINT GENERATED ALWAYS AS IDENTITY,
+                city                 TEXT,
+                id                   TEXT,
+                source_id            BIGINT,
+                ingest_run_id        BIGINT,
+                external_case_id     TEXT,
+                row_uid              TEXT,
+                occurred_at          TIMESTAMPTZ,
+                reported_at          TIMESTAMPTZ,
+                last_updated_at      TIMESTAMPTZ,
+                primary_type         TEXT,
+                description          TEXT,
+                iucr                 TEXT,
+                arrest               BOOLEAN,
+                domestic             BOOLEAN,
+                district             TEXT,
+                beat                 TEXT,
+                ward                 TEXT,
+                community_area       TEXT,
+                location_description TEXT,
+                street_block         TEXT,
+                latitude             DOUBLE PRECISION,
+                longitude            DOUBLE PRECISION,
+                x_coordinate         DOUBLE PRECISION,
+                y_coordinate         DOUBLE PRECISION,
+                raw_record           JSONB,
+                receipt_url          TEXT,
+                content_hash         TEXT
+            ) ON COMMIT DELETE ROWS
+            """
+        )
+
+        with cur.copy(f"COPY incidents_stage ({columns}) FROM STDIN") as copy:
+            for values in _iter_incident_values(
+                incidents, source_id=source_id, ingest_run_id=ingest_run_id
+            ):
+                copy.write_row(values)
+
+        # Remove stored versions of staged incidents whose occurred_at changed:
+        # they live under another key (and possibly another partition), so the
+        # upsert below would otherwise leave them behind as duplicates. Only
+        # incidents not stored under their staged key are looked up by
+        # (city, id), which probes every yearly partition.
+        cur.execute(
+            """
+            WITH latest AS (
+                SELECT DISTINCT ON (city, id) city, id, occurred_at
+                FROM incidents_stage
+                ORDER BY city, id, stage_seq DESC
+            ),
+            unmatched AS (
+                SELECT latest.*
+                FROM latest
+                WHERE NOT EXISTS (
+                    SELECT 1
+                    FROM incidents AS existing
+                    WHERE existing.city = latest.city
+                        AND existing.id = latest.id
+                        AND existing.occurred_at = latest.occurred_at
+                )
+            ),
+            moved AS (
+                DELETE FROM incidents AS existing
+                USING unmatched AS staged
+                WHERE existing.city = staged.city
+                    AND existing.id = staged.id
+                    AND existing.occurred_at <> staged.occurred_at
+                RETURNING existing.city, existing.id
+            )
+            SELECT COUNT(DISTINCT (city, id)) AS moved FROM moved
+            """
+        )
+        moved = cur.fetchone()["moved"]
+
+        # DISTINCT ON keeps the last staged copy of an incident so a batch that
+        # repeats an id does not trip "ON CONFLICT cannot affect row a second time".
+        # The outer SELECT reads the pre-statement snapshot of incidents, so a
+        # join against it tells inserts from updates (partitioned tables cannot
+        # return xmax). Conflicting rows skipped by the content_hash predicate
+        # are not returned at all, which is how unchanged rows are counted.
+        cur.execute(
+            f"""
+            WITH upserted AS (
+                INSERT INTO incidents (
+                    {columns}, geom, geohash7, created_at, updated_at
+                )
+                SELECT
+                    {columns},
+                    CASE
+                        WHEN longitude IS NULL OR latitude IS NULL THEN NULL
+                        ELSE ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)
+                    END,
+                    CASE
+                        WHEN longitude IS NULL OR latitude IS NULL THEN NULL
+                        ELSE ST_GeoHash(ST_SetSRID(ST_MakePoint(longitude, latitude), 4326), 7)
+                    END,
+                    now(),
+                    now()
+                FROM (
+                    SELECT DISTINCT ON (city, id) *
+                    FROM incidents_stage
+                    ORDER BY city, id, stage_seq DESC
+                ) AS staged
+                {conflict_clause}
+                RETURNING city, id, occurred_at
+            )
+            SELECT
+                COUNT(*) FILTER (WHERE existing.id IS NULL) AS inserted,
+                COUNT(*) FILTER (WHERE existing.id IS NOT NULL) AS updated,
+                (SELECT COUNT(*) FROM (SELECT DISTINCT city, id FROM incidents_stage) AS keys) AS staged
+            FROM upserted
+            LEFT JOIN incidents AS existing
+                ON existing.city = upserted.city
+                AND existing.id = upserted.id
+                AND existing.occurred_at = upserted.occurred_at
+            """
+        )
+        counts = cur.fetchone()
+
+    # Moved incidents were deleted above, so the join reports them as inserts.
+    inserted, updated = counts["inserted"] - moved, counts["updated"] + moved
+    return inserted, updated, counts["staged"] - inserted - updated
+
+
+def _upsert_incidents_rowwise(
+    conn: Connection,
+    *,
+    source_id: int,
+    incidents: Incidents,
+    ingest_run_id: int | None,
+    skip_unchanged: bool,
+) -> tuple[int, int, int]:
+    conflict_clause = _UPSERT_CONFLICT_CLAUSE + (_SKIP_UNCHANGED_PREDICATE if skip_unchanged else "")
     inserted = 0
     updated = 0
+    unchanged = 0
 
-    try:
-        with conn.cursor(row_factory=dict_row) as cur:
-            for incident in incidents:
-                params = {
-                    "city": incident.city,
-                    "id": incident.incident_id,
-                    "source_id": source_id,
-                    "ingest_run_id": ingest_run_id,
-                    "external_case_id": incident.external_case_id,
-                    "row_uid": incident.row_uid,
-                    "occurred_at": incident.occurred_at,
-                    "reported_at": incident.reported_at,
-                    "last_updated_at": incident.last_updated_at,
-                    "primary_type": incident.primary_type,
-                    "description": incident.description,
-                    "iucr": incident.iucr,
-                    "arrest": incident.arrest,
-                    "domestic": incident.domestic,
-                    "district": incident.district,
-                    "beat": incident.beat,
-                    "ward": incident.ward,
-                    "community_area": incident.community_area,
-                    "location_description": incident.location_description,
-                    "street_block": incident.street_block,
-                    "latitude": incident.latitude,
-                    "longitude": incident.longitude,
-                    "x_coordinate": incident.x_coordinate,
-                    "y_coordinate": incident.y_coordinate,
-                    "raw_record": Json(incident.raw_record),
-                    "receipt_url": incident.receipt_url,
-                    "geom_wkt": (
-                        f"POINT({incident.longitude} {incident.latitude})"
-                        if incident.longitude is not None and incident.latitude is not None
-                        else None
-                    ),
-                }
-
-                cur.execute(
-                    """
+    # Like the COPY path, only the last copy of an incident repeated within
+    # the batch is written, so both methods report the same counts.
+    latest = {}
+    for values in _iter_incident_values(incidents, source_id=source_id, ingest_run_id=ingest_run_id):
+        latest.pop(values[:2], None)
+        latest[values[:2]] = values
+
+    with conn.cursor(row_factory=dict_row) as cur:
+        for values in latest.values():
+            params = dict(zip(_INCIDENT_COLUMNS, values))
+            params["geom_wkt"] = (
+                f"POINT({params['longitude']} {params['latitude']})"
+                if params["longitude"] is not None and params["latitude"] is not None
+                else None
+            )
+
+            # The NOT EXISTS is a one-time filter: when the incident is stored
+            # under this key the cross-partition scan is skipped entirely.
+            cur.execute(
+                """
+                DELETE FROM incidents
+                WHERE city = %(city)s AND id = %(id)s AND occurred_at <> %(occurred_at)s
+                    AND NOT EXISTS (
+                        SELECT 1 FROM incidents
+                        WHERE city = %(city)s AND id = %(id)s AND occurred_at = %(occurred_at)s
+                    )
+                """,
+                params,
+            )
+            moved = cur.rowcount > 0
+
+            # As in the COPY path, the outer SELECT reads the pre-statement
+            # snapshot, so it tells inserts from updates; a row skipped by the
+            # content_hash predicate is not returned.
+            cur.execute(
+                f"""
+                WITH upserted AS (
                     INSERT INTO incidents (
                         city, id, source_id, ingest_run_id, external_case_id, row_uid,
                         occurred_at, reported_at, last_updated_at, primary_type, description,
                         iucr, arrest, domestic, district, beat, ward, community_area,
                         location_description, street_block, latitude, longitude,
                         geom, geohash7, x_coordinate, y_coordinate, raw_record, receipt_url,
-                        created_at, updated_at
+                        content_hash, created_at, updated_at
                     )
                     VALUES (
                         %(city)s, %(id)s, %(source_id)s, %(ingest_run_id)s, %(external_case_id)s, %(row_uid)s,
@@ -163,55 +975,241 @@ def upsert_incidents(
                             ELSE ST_GeoHash(ST_SetSRID(ST_GeomFromText(%(geom_wkt)s::text), 4326), 7)
                         END,
                         %(x_coordinate)s, %(y_coordinate)s, %(raw_record)s, %(receipt_url)s,
-                        now(), now()
+                        %(content_hash)s, now(), now()
                     )
-                    ON CONFLICT (city, id) DO UPDATE SET
-                        source_id = EXCLUDED.source_id,
-                        ingest_run_id = EXCLUDED.ingest_run_id,
-                        external_case_id = EXCLUDED.external_case_id,
-                        row_uid = EXCLUDED.row_uid,
-                        occurred_at = EXCLUDED.occurred_at,
-                        reported_at = EXCLUDED.reported_at,
-                        last_updated_at = EXCLUDED.last_updated_at,
-                        primary_type = EXCLUDED.primary_type,
-                        description = EXCLUDED.description,
-                        iucr = EXCLUDED.iucr,
-                        arrest = EXCLUDED.arrest,
-                        domestic = EXCLUDED.domestic,
-                        district = EXCLUDED.district,
-                        beat = EXCLUDED.beat,
-                        ward = EXCLUDED.ward,
-                        community_area = EXCLUDED.community_area,
-                        location_description = EXCLUDED.location_description,
-                        street_block = EXCLUDED.street_block,
-                        latitude = EXCLUDED.latitude,
-                        longitude = EXCLUDED.longitude,
-                        geom = CASE
-                            WHEN EXCLUDED.longitude IS NULL OR EXCLUDED.latitude IS NULL THEN NULL
-                            ELSE ST_SetSRID(ST_MakePoint(EXCLUDED.longitude, EXCLUDED.latitude), 4326)
-                        END,
-                        geohash7 = CASE
-                            WHEN EXCLUDED.longitude IS NULL OR EXCLUDED.latitude IS NULL THEN NULL
-                            ELSE ST_GeoHash(ST_SetSRID(ST_MakePoint(EXCLUDED.longitude, EXCLUDED.latitude), 4326), 7)
-                        END,
-                        x_coordinate = EXCLUDED.x_coordinate,
-                        y_coordinate = EXCLUDED.y_coordinate,
-                        raw_record = EXCLUDED.raw_record,
-                        receipt_url = EXCLUDED.receipt_url,
-                        updated_at = now()
-                    """,
-                    params,
+                    {conflict_clause}
+                    RETURNING 1
                 )
+                SELECT
+                    (SELECT COUNT(*) FROM upserted) AS written,
+                    EXISTS (
+                        SELECT 1 FROM incidents
+                        WHERE city = %(city)s AND id = %(id)s AND occurred_at = %(occurred_at)s
+                    ) AS existed
+                """,
+                params,
+            )
+            result = cur.fetchone()
+
+            if moved or (result["written"] and result["existed"]):
+                updated += 1
+            elif result["written"]:
+                inserted += 1
+            else:
+                unchanged += 1
+
+    return inserted, updated, unchanged
+
+
+def fetch_heatmap_extent(
+    conn: Connection,
+    *,
+    city: str,
+    zoom: int,
+    trim: float = 0.001,
+) -> tuple[int, int, int, int] | None:
+    """Tile range ``(x_min, y_min, x_max, y_max)`` holding a city's incidents.
+
+    The outer ``trim`` fraction on each side is ignored so a few mis-geocoded
+    points cannot stretch the grid across the map.
+    """
+
+    tile_x, tile_y, in_range = _tile_sql("latitude", "longitude", "%(z)s")
+    with conn.cursor(row_factory=dict_row) as cur:
+        cur.execute(
+            f"""
+            SELECT
+                percentile_disc(%(lo)s) WITHIN GROUP (ORDER BY x) AS x_min,
+                percentile_disc(%(lo)s) WITHIN GROUP (ORDER BY y) AS y_min,
+                percentile_disc(%(hi)s) WITHIN GROUP (ORDER BY x) AS x_max,
+                percentile_disc(%(hi)s) WITHIN GROUP (ORDER BY y) AS y_max
+            FROM (
+                SELECT {tile_x} AS x, {tile_y} AS y
+                FROM incidents
+                WHERE city = %(city)s AND {in_range}
+            ) AS tiles;
+            """,
+            {"city": city, "z": zoom, "lo": trim, "hi": 1 - trim},
+        )
+        row = cur.fetchone()
+    if row is None or row["x_min"] is None:
+        return None
+    return row["x_min"], row["y_min"], row["x_max"], row["y_max"]
+
+
+def fetch_heatmap_counts(
+    conn: Connection,
+    *,
+    city: str,
+    zoom: int,
+    start_at: datetime | None,
+    parent_tiles: Sequence[tuple[int, int]] | None = None,
+) -> list[dict]:
+    """Incident counts per (primary_type, tile x, tile y) at ``zoom``.
+
+    With ``parent_tiles`` only incidents inside those tiles (one zoom level
+    coarser) are counted, each tile found through the GIST index on ``geom``.
+    """
+
+    tile_x, tile_y, in_range = _tile_sql("latitude", "longitude", "%(z)s")
+    params = {"city": city, "z": zoom, "start_at": start_at}
+    period_filter = "AND occurred_at >= %(start_at)s" if start_at is not None else ""
+
+    if parent_tiles is None:
+        query = f"""
+            SELECT primary_type, {tile_x} AS cx, {tile_y} AS cy, COUNT(*) AS count
+            FROM incidents
+            WHERE city = %(city)s AND {in_range} {period_filter}
+            GROUP BY 1, 2, 3;
+        """
+    else:
+        # Envelopes are widened slightly and points re-assigned by the tile
+        # formula, so edge points are counted once, in the same tile the
+        # upsert path recorded.
+        params["xs"] = [tile[0] for tile in parent_tiles]
+        params["ys"] = [tile[1] for tile in parent_tiles]
+        query = f"""
+            WITH parents AS (
+                SELECT px, py
+                FROM unnest(%(xs)s::int[], %(ys)s::int[]) AS t(px, py)
+            )
+            SELECT cells.primary_type, cells.cx, cells.cy, COUNT(*) AS count
+            FROM parents
+            CROSS JOIN LATERAL (
+                SELECT primary_type, {tile_x} AS cx, {tile_y} AS cy
+                FROM incidents
+                WHERE city = %(city)s
+                  AND geom && ST_Expand(ST_Transform(ST_TileEnvelope(%(z)s - 1, px, py), 4326), 1e-5)
+                  AND {in_range} {period_filter}
+            ) AS cells
+            WHERE cells.cx / 2 = parents.px AND cells.cy / 2 = parents.py
+            GROUP BY 1, 2, 3;
+        """
+
+    with conn.cursor(row_factory=dict_row) as cur:
+        cur.execute(query, params)
+        return cur.fetchall()
 
-                status = cur.statusmessage or ""
-                if status.startswith("INSERT"):
-                    inserted += 1
-                else:
-                    updated += 1
 
+def fetch_tile_invalidations(
+    conn: Connection,
+    *,
+    city: str,
+    zoom: int,
+    since: datetime,
+) -> list[tuple[int, int]]:
+    """Tiles at ``zoom`` whose incidents changed after ``since``."""
+
+    with conn.cursor(row_factory=dict_row) as cur:
+        cur.execute(
+            """
+            SELECT x, y
+            FROM tile_invalidations
+            WHERE city = %s AND z = %s AND invalidated_at > %s;
+            """,
+            (city, zoom, since),
+        )
+        return [(row["x"], row["y"]) for row in cur.fetchall()]
+
+
+def fetch_incident_tiles(
+    conn: Connection,
+    *,
+    city: str,
+    zoom: int,
+    occurred_from: datetime,
+    occurred_to: datetime,
+) -> list[tuple[int, int]]:
+    """Distinct tiles at ``zoom`` holding incidents with ``occurred_from <= occurred_at < occurred_to``."""
+
+    tile_x, tile_y, in_range = _tile_sql("latitude", "longitude", "%(z)s")
+    with conn.cursor(row_factory=dict_row) as cur:
+        cur.execute(
+            f"""
+            SELECT DISTINCT {tile_x} AS x, {tile_y} AS y
+            FROM incidents
+            WHERE city = %(city)s
+              AND occurred_at >= %(occurred_from)s
+              AND occurred_at < %(occurred_to)s
+              AND {in_range};
+            """,
+            {"city": city, "z": zoom, "occurred_from": occurred_from, "occurred_to": occurred_to},
+        )
+        return [(row["x"], row["y"]) for row in cur.fetchall()]
+
+
+def load_heatmap_grids(conn: Connection, *, city: str) -> list[dict]:
+    """Stored heatmap rows for a city, including the raw count grids."""
+
+    with conn.cursor(row_factory=dict_row) as cur:
+        cur.execute(
+            """
+            SELECT period, primary_type, grid_zoom, x0, y0, width, height, bandwidth_m,
+                   counts, computed_at, window_start
+            FROM heatmap_grids
+            WHERE city = %s;
+            """,
+            (city,),
+        )
+        return cur.fetchall()
+
+
+def save_heatmap_grids(
+    conn: Connection,
+    *,
+    city: str,
+    period: str,
+    grids: Sequence[dict],
+    computed_at: datetime,
+    window_start: datetime | None,
+) -> None:
+    """Replace every heatmap row for ``(city, period)`` with ``grids`` and commit.
+
+    Each grid dict carries ``primary_type``, ``grid_zoom``, ``x0``, ``y0``,
+    ``width``, ``height``, ``bandwidth_m``, ``incident_count``,
+    ``max_density`` and the encoded ``counts``/``intensity`` arrays.
+    """
+
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                DELETE FROM heatmap_grids
+                WHERE city = %s AND period = %s AND NOT (primary_type = ANY(%s));
+                """,
+                (city, period, [grid["primary_type"] for grid in grids]),
+            )
+            cur.executemany(
+                """
+                INSERT INTO heatmap_grids (
+                    city, period, primary_type, grid_zoom, x0, y0, width, height, bandwidth_m,
+                    incident_count, max_density, counts, intensity, computed_at, window_start
+                )
+                VALUES (
+                    %(city)s, %(period)s, %(primary_type)s, %(grid_zoom)s, %(x0)s, %(y0)s, %(width)s,
+                    %(height)s, %(bandwidth_m)s, %(incident_count)s, %(max_density)s, %(counts)s,
+                    %(intensity)s, %(computed_at)s, %(window_start)s
+                )
+                ON CONFLICT (city, period, primary_type) DO UPDATE SET
+                    grid_zoom = EXCLUDED.grid_zoom,
+                    x0 = EXCLUDED.x0,
+                    y0 = EXCLUDED.y0,
+                    width = EXCLUDED.width,
+                    height = EXCLUDED.height,
+                    bandwidth_m = EXCLUDED.bandwidth_m,
+                    incident_count = EXCLUDED.incident_count,
+                    max_density = EXCLUDED.max_density,
+                    counts = EXCLUDED.counts,
+                    intensity = EXCLUDED.intensity,
+                    computed_at = EXCLUDED.computed_at,
+                    window_start = EXCLUDED.window_start;
+                """,
+                [
+                    {**grid, "city": city, "period": period, "computed_at": computed_at, "window_start": window_start}
+                    for grid in grids
+                ],
+            )
         conn.commit()
     except Exception:
         conn.rollback()
         raise
-
-    return inserted, updated
@@ -9,6 +9,8 @@ from typing import Iterator, Optional
 import psycopg
 from psycopg.rows import dict_row
 
+from .instrumentation import InstrumentedCursor
+
 
 DEFAULT_DSN = os.getenv(
     "CRIMEGRID_DB_DSN",
@@ -20,7 +22,12 @@ DEFAULT_DSN = os.getenv(
 def get_connection(*, dsn: Optional[str] = None, autocommit: bool = False) -> Iterator[psycopg.Connection]:
     """Yield a psycopg connection configured for ingestion use cases."""
 
-    conn = psycopg.connect(conninfo=dsn or DEFAULT_DSN, autocommit=autocommit, row_factory=dict_row)
+    conn = psycopg.connect(
+        conninfo=dsn or DEFAULT_DSN,
+        autocommit=autocommit,
+        row_factory=dict_row,
+        cursor_factory=InstrumentedCursor,
+    )
     try:
         yield conn
     finally:
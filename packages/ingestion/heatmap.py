@@ -0,0 +1,187 @@
+"""Grid kernel-density (KDE) surfaces for historic-risk heatmaps.
+
+Grids are aligned to web-mercator tiles at :data:`GRID_ZOOM`: cell ``(cx, cy)``
+is tile ``GRID_ZOOM/cx/cy``, so every tile recorded in ``tile_invalidations``
+(one zoom level coarser) covers exactly 2x2 cells. Counts are smoothed with a
+separable Gaussian kernel and quantized to ``uint8`` for storage and serving.
+"""
+
+from __future__ import annotations
+
+import math
+import zlib
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+
+
+GRID_ZOOM = 17
+EARTH_CIRCUMFERENCE_M = 40_075_016.686
+MAX_GRID_CELLS = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class GridExtent:
+    """Cell range ``[x0, x0 + width) x [y0, y0 + height)`` at :data:`GRID_ZOOM`."""
+
+    x0: int
+    y0: int
+    width: int
+    height: int
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return (self.height, self.width)
+
+    def contains(self, cx: np.ndarray, cy: np.ndarray) -> np.ndarray:
+        return (cx >= self.x0) & (cx < self.x0 + self.width) & (cy >= self.y0) & (cy < self.y0 + self.height)
+
+    def center_latitude(self) -> float:
+        return tile_latitude(self.y0 + self.height / 2, GRID_ZOOM)
+
+    def bounds(self) -> Tuple[float, float, float, float]:
+        """``(min_lng, min_lat, max_lng, max_lat)`` of the grid's outer edges."""
+
+        return (
+            tile_longitude(self.x0, GRID_ZOOM),
+            tile_latitude(self.y0 + self.height, GRID_ZOOM),
+            tile_longitude(self.x0 + self.width, GRID_ZOOM),
+            tile_latitude(self.y0, GRID_ZOOM),
+        )
+
+
+def tile_xy(latitude: np.ndarray, longitude: np.ndarray, zoom: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Integer web-mercator tile coordinates, matching the SQL used by the upsert path."""
+
+    lat = np.radians(np.asarray(latitude, dtype=np.float64))
+    scale = 2.0 ** zoom
+    x = np.floor((np.asarray(longitude, dtype=np.float64) + 180.0) / 360.0 * scale)
+    y = np.floor((1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / math.pi) / 2.0 * scale)
+    return np.clip(x, 0, scale - 1).astype(np.int64), np.clip(y, 0, scale - 1).astype(np.int64)
+
+
+def tile_longitude(x: float, zoom: int) -> float:
+    return x / 2.0 ** zoom * 360.0 - 180.0
+
+
+def tile_latitude(y: float, zoom: int) -> float:
+    return math.degrees(math.atan(math.sinh(math.pi * (1.0 - 2.0 * y / 2.0 ** zoom))))
+
+
+def cell_size_m(latitude: float, zoom: int = GRID_ZOOM) -> float:
+    """Ground width of one tile at ``latitude``."""
+
+    return EARTH_CIRCUMFERENCE_M * math.cos(math.radians(latitude)) / 2.0 ** zoom
+
+
+def gaussian_kernel(sigma_cells: float) -> np.ndarray:
+    """Normalized 1-D Gaussian taps covering +/- 3 sigma."""
+
+    radius = max(1, int(math.ceil(3.0 * sigma_cells)))
+    offsets = np.arange(-radius, radius + 1, dtype=np.float64)
+    taps = np.exp(-0.5 * (offsets / sigma_cells) ** 2)
+    return taps / taps.sum()
+
+
+def kernel_radius(bandwidth_m: float, latitude: float) -> int:
+    return len(gaussian_kernel(bandwidth_m / cell_size_m(latitude))) // 2
+
+
+def smooth(counts: np.ndarray, sigma_cells: float) -> np.ndarray:
+    """Convolve the last two axes of ``counts`` with a Gaussian of ``sigma_cells``.
+
+    The kernel is separable, so each axis is one pass of shifted, weighted
+    slice additions over the whole stack; mass near the edges falls off the
+    grid (extents are padded by the kernel radius to avoid that).
+    """
+
+    taps = gaussian_kernel(sigma_cells)
+    radius = len(taps) // 2
+    out = np.asarray(counts, dtype=np.float64)
+    for axis in (-1, -2):
+        size = out.shape[axis]
+        pad = [(0, 0)] * out.ndim
+        pad[axis] = (radius, radius)
+        padded = np.pad(out, pad)
+        acc = np.zeros_like(out)
+        for offset, weight in enumerate(taps):
+            acc += weight * np.take(padded, np.arange(offset, offset + size), axis=axis)
+        out = acc
+    return out
+
+
+def density_surface(counts: np.ndarray, *, bandwidth_m: float, latitude: float) -> np.ndarray:
+    """KDE surface in incidents per km^2 for a count grid (or stack of grids)."""
+
+    size_m = cell_size_m(latitude)
+    cell_area_km2 = (size_m / 1000.0) ** 2
+    return smooth(counts, bandwidth_m / size_m) / cell_area_km2
+
+
+def quantize(density: np.ndarray) -> Tuple[np.ndarray, float]:
+    """Scale a surface to ``uint8`` (0 = none, 255 = max); returns ``(levels, max)``.
+
+    A value decodes as ``level / 255 * max``.
+    """
+
+    peak = float(density.max()) if density.size else 0.0
+    if peak <= 0:
+        return np.zeros(density.shape, dtype=np.uint8), 0.0
+    levels = np.rint(density / peak * 255.0)
+    # Keep any non-zero density visible rather than rounding it away.
+    levels[(density > 0) & (levels == 0)] = 1
+    return levels.astype(np.uint8), peak
+
+
+def encode_array(array: np.ndarray) -> bytes:
+    return zlib.compress(np.ascontiguousarray(array).tobytes(), 6)
+
+
+def decode_array(data: bytes, dtype: np.dtype, shape: Tuple[int, int]) -> np.ndarray:
+    return np.frombuffer(zlib.decompress(data), dtype=dtype).reshape(shape).copy()
+
+
+def accumulate(
+    grid: np.ndarray,
+    extent: GridExtent,
+    cx: np.ndarray,
+    cy: np.ndarray,
+    counts: np.ndarray,
+) -> int:
+    """Add per-cell ``counts`` into ``grid``; returns how many fell outside ``extent``."""
+
+    cx, cy, counts = np.asarray(cx), np.asarray(cy), np.asarray(counts)
+    inside = extent.contains(cx, cy)
+    np.add.at(grid, (cy[inside] - extent.y0, cx[inside] - extent.x0), counts[inside])
+    return int(counts[~inside].sum())
+
+
+def clear_parent_tiles(grid: np.ndarray, extent: GridExtent, tx: np.ndarray, ty: np.ndarray) -> None:
+    """Zero the 2x2 cells under each tile ``(tx, ty)`` one zoom level above the grid."""
+
+    tx, ty = np.asarray(tx), np.asarray(ty)
+    for dx in (0, 1):
+        for dy in (0, 1):
+            cx, cy = tx * 2 + dx, ty * 2 + dy
+            inside = extent.contains(cx, cy)
+            grid[..., cy[inside] - extent.y0, cx[inside] - extent.x0] = 0
+
+
+__all__ = [
+    "GRID_ZOOM",
+    "GridExtent",
+    "accumulate",
+    "cell_size_m",
+    "clear_parent_tiles",
+    "decode_array",
+    "density_surface",
+    "encode_array",
+    "gaussian_kernel",
+    "kernel_radius",
+    "quantize",
+    "smooth",
+    "tile_latitude",
+    "tile_longitude",
+    "tile_xy",
+]
@@ -2,5 +2,7 @@
 
 from .chicago_recent import main as chicago_recent_main
 from .chicago_backfill import main as chicago_backfill_main
+from .heatmap_refresh import main as heatmap_refresh_main
+from .partition_maintenance import main as partition_maintenance_main
 
-__all__ = ["chicago_recent_main", "chicago_backfill_main"]
+__all__ = ["chicago_recent_main", "chicago_backfill_main", "heatmap_refresh_main", "partition_maintenance_main"]
@@ -5,24 +5,28 @@ from __future__ import annotations
 import argparse
 import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Iterable, Iterator, List, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 from ..clients import SocrataClient, SocrataRequest
 from ..db import get_connection
 from ..db.operations import (
+    UPSERT_METHODS,
     ensure_source,
     finalize_ingest_run,
     start_ingest_run,
     upsert_incidents,
 )
-from ..models import NormalizedIncident
 from ..normalizers import (
     CHICAGO_CITY_CODE,
     CHICAGO_DATASET_ID,
     CHICAGO_SOURCE_SLUG,
-    normalize_chicago_row,
+    normalize_chicago_rows,
 )
+from ..pipeline import PipelineStats, run_pipeline
 
 
 LOG = logging.getLogger(__name__)
@@ -30,6 +34,20 @@ LOG = logging.getLogger(__name__)
 CHICAGO_SOURCE_NAME = "Chicago Crimes - 2001 to Present"
 CHICAGO_API_BASE = "https://data.cityofchicago.org"
 
+Window = Tuple[datetime, datetime]
+
+
+@dataclass(frozen=True)
+class WindowResult:
+    """Counts recorded for one successfully processed backfill window."""
+
+    window_start: datetime
+    window_end: datetime
+    fetched: int
+    inserted: int
+    updated: int
+    unchanged: int
+
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description=__doc__)
@@ -54,12 +72,49 @@ def build_parser() -> argparse.ArgumentParser:
         default=5000,
         help="Rows per Socrata request (max 50000). Default 5000.",
     )
+    parser.add_argument(
+        "--paging",
+        choices=("keyset", "offset"),
+        default="keyset",
+        help="'keyset' pages by :id > last seen (flat page latency); 'offset' uses $offset.",
+    )
     parser.add_argument(
         "--batch-size",
         type=int,
         default=1000,
         help="Number of normalized incidents per database upsert batch (default 1000).",
     )
+    parser.add_argument(
+        "--upsert-method",
+        choices=UPSERT_METHODS,
+        default="copy",
+        help="'copy' stages each batch with COPY and merges it set-based; 'row' upserts one incident at a time.",
+    )
+    parser.add_argument(
+        "--max-buffered-batches",
+        type=int,
+        default=4,
+        help="Batches buffered between the fetch, normalize and write stages of a window (default 4).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of month windows processed concurrently (default 1 = sequential).",
+    )
+    parser.add_argument(
+        "--max-inflight-requests",
+        type=int,
+        default=None,
+        help="Global cap on concurrent Socrata requests across workers. Defaults to --workers.",
+    )
+    parser.add_argument(
+        "--on-error",
+        choices=("fail-fast", "continue"),
+        default="fail-fast",
+        help="'fail-fast' stops scheduling windows after the first failure; "
+        "'continue' processes every window and reports failures at the end.",
+    )
     parser.add_argument(
         "--app-token",
         default=os.getenv("CRIMEGRID_SOCRATA_APP_TOKEN"),
@@ -92,13 +147,10 @@ def main(argv: List[str] | None = None) -> None:
         end_bound.isoformat(),
     )
 
-    client = SocrataClient(
-        CHICAGO_API_BASE,
-        app_token=args.app_token,
-        page_size=min(args.page_size, 50_000),
-        max_retries=6,
-        backoff_seconds=1.5,
-    )
+    if args.workers < 1:
+        raise ValueError("--workers must be at least 1")
+
+    request_slots = threading.BoundedSemaphore(args.max_inflight_requests or args.workers)
 
     with get_connection() as conn:
         source_id = ensure_source(
@@ -111,16 +163,100 @@ def main(argv: List[str] | None = None) -> None:
             refresh_cadence="Daily",
         )
 
-    for window_start, window_end in _iter_month_windows(start_month, end_bound):
-        _process_window(
+    def run_window(window: Window) -> WindowResult:
+        # requests.Session is not safe to share between threads, so each
+        # window gets its own client; only the request slots are shared.
+        client = SocrataClient(
+            CHICAGO_API_BASE,
+            app_token=args.app_token,
+            page_size=min(args.page_size, 50_000),
+            max_retries=6,
+            backoff_seconds=1.5,
+            request_slots=request_slots,
+        )
+        return _process_window(
             client=client,
             source_id=source_id,
-            window_start=window_start,
-            window_end=window_end,
+            window_start=window[0],
+            window_end=window[1],
             limit=args.limit,
             batch_size=args.batch_size,
+            upsert_method=args.upsert_method,
+            max_buffered_batches=args.max_buffered_batches,
+            paging=args.paging,
         )
 
+    windows = list(_iter_month_windows(start_month, end_bound))
+    failures = _run_windows(
+        windows,
+        run_window,
+        workers=args.workers,
+        fail_fast=args.on_error == "fail-fast",
+    )
+    if failures:
+        failed = ", ".join(start.strftime("%Y-%m") for start, _ in failures)
+        raise RuntimeError(f"{len(failures)} of {len(windows)} backfill windows failed: {failed}")
+
+
+def _run_windows(
+    windows: Sequence[Window],
+    process: Callable[[Window], WindowResult],
+    *,
+    workers: int,
+    fail_fast: bool,
+) -> List[Window]:
+    """Process ``windows`` on a bounded thread pool, returning failed windows.
+
+    Completions are reported in window order regardless of which worker
+    finishes first. With ``fail_fast`` the first failure cancels windows that
+    have not started yet and is re-raised once running windows finish.
+    """
+
+    total = len(windows)
+    finished: Dict[int, Optional[WindowResult]] = {}
+    failures: List[Window] = []
+    next_to_report = 0
+
+    def report_in_order() -> None:
+        nonlocal next_to_report
+        while next_to_report in finished:
+            result = finished.pop(next_to_report)
+            start, end = windows[next_to_report]
+            next_to_report += 1
+            if result is None:
+                LOG.info("Progress %s/%s: window %s -> %s failed", next_to_report, total, start.date(), end.date())
+                continue
+            LOG.info(
+                "Progress %s/%s: window %s -> %s (fetched=%s inserted=%s updated=%s unchanged=%s)",
+                next_to_report,
+                total,
+                start.date(),
+                end.date(),
+                result.fetched,
+                result.inserted,
+                result.updated,
+                result.unchanged,
+            )
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backfill") as executor:
+        futures = {executor.submit(process, window): idx for idx, window in enumerate(windows)}
+        try:
+            for future in as_completed(futures):
+                idx = futures[future]
+                try:
+                    finished[idx] = future.result()
+                except Exception:
+                    if fail_fast:
+                        raise
+                    failures.append(windows[idx])
+                    finished[idx] = None
+                report_in_order()
+        except BaseException:
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+
+    return failures
+
 
 def _process_window(
     *,
@@ -130,20 +266,24 @@ def _process_window(
     window_end: datetime,
     limit: int | None,
     batch_size: int,
-) -> None:
+    upsert_method: str = "copy",
+    max_buffered_batches: int = 4,
+    paging: str = "keyset",
+) -> WindowResult:
     start_iso = window_start.strftime("%Y-%m-%dT%H:%M:%S")
     end_iso = window_end.strftime("%Y-%m-%dT%H:%M:%S")
 
     where_clause = f"date >= '{start_iso}' AND date < '{end_iso}'"
 
+    params = {"$select": "*", "$where": where_clause}
+    if paging == "offset":
+        params["$order"] = "date ASC"
+
     request = SocrataRequest(
         dataset_id=CHICAGO_DATASET_ID,
-        params={
-            "$select": "*",
-            "$order": "date ASC",
-            "$where": where_clause,
-        },
+        params=params,
         limit=limit,
+        keyset_column=":id" if paging == "keyset" else None,
     )
 
     LOG.info(
@@ -156,6 +296,8 @@ def _process_window(
     fetched = 0
     inserted_total = 0
     updated_total = 0
+    unchanged_total = 0
+    stage_stats = PipelineStats()
 
     with get_connection() as conn:
         run_id = start_ingest_run(
@@ -165,36 +307,24 @@ def _process_window(
         )
 
         try:
-            batch: List[NormalizedIncident] = []
-            for row in client.fetch_rows(request):
-                try:
-                    batch.append(normalize_chicago_row(row))
-                except Exception as exc:  # pragma: no cover - log and skip invalid rows
-                    LOG.exception("Failed to normalize row in window %s - skipping: %s", start_iso, exc)
-                    continue
-
-                fetched += 1
-
-                if len(batch) >= batch_size:
-                    ins, upd = upsert_incidents(
-                        conn,
-                        source_id=source_id,
-                        incidents=batch,
-                        ingest_run_id=run_id,
-                    )
-                    inserted_total += ins
-                    updated_total += upd
-                    batch.clear()
-
-            if batch:
-                ins, upd = upsert_incidents(
+            for batch in run_pipeline(
+                client.fetch_rows(request),
+                normalize_chicago_rows,
+                batch_size=batch_size,
+                max_buffered_batches=max_buffered_batches,
+                stats=stage_stats,
+            ):
+                fetched += len(batch)
+                ins, upd, unch = upsert_incidents(
                     conn,
                     source_id=source_id,
                     incidents=batch,
                     ingest_run_id=run_id,
+                    method=upsert_method,
                 )
                 inserted_total += ins
                 updated_total += upd
+                unchanged_total += unch
 
             finalize_ingest_run(
                 conn,
@@ -203,15 +333,26 @@ def _process_window(
                 rows_fetched=fetched,
                 rows_inserted=inserted_total,
                 rows_updated=updated_total,
-                notes=f"window={start_iso}->{end_iso}",
+                rows_unchanged=unchanged_total,
+                notes=f"window={start_iso}->{end_iso} stages: {stage_stats}",
             )
             LOG.info(
-                "Window complete %s -> %s (fetched=%s inserted=%s updated=%s)",
+                "Window complete %s -> %s (fetched=%s inserted=%s updated=%s unchanged=%s) stages: %s",
                 start_iso,
                 end_iso,
                 fetched,
                 inserted_total,
                 updated_total,
+                unchanged_total,
+                stage_stats,
+            )
+            return WindowResult(
+                window_start=window_start,
+                window_end=window_end,
+                fetched=fetched,
+                inserted=inserted_total,
+                updated=updated_total,
+                unchanged=unchanged_total,
             )
         except Exception as exc:  # pragma: no cover
             finalize_ingest_run(
@@ -221,6 +362,7 @@ def _process_window(
                 rows_fetched=fetched,
                 rows_inserted=inserted_total,
                 rows_updated=updated_total,
+                rows_unchanged=unchanged_total,
                 notes=str(exc),
             )
             LOG.exception("Window failed %s -> %s", start_iso, end_iso)
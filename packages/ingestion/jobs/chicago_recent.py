@@ -5,25 +5,31 @@ from __future__ import annotations
 import argparse
 import logging
 import os
+import resource
+import sys
 from datetime import datetime, timedelta, timezone
-from typing import List
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from ..clients import SocrataClient, SocrataRequest
 from ..db import get_connection
 from ..db.operations import (
     ensure_source,
     finalize_ingest_run,
+    get_high_watermark,
     start_ingest_run,
     upsert_incidents,
 )
-from ..models import NormalizedIncident
-from ..normalizers import CHICAGO_DATASET_ID, normalize_chicago_row
+from ..normalizers import CHICAGO_DATASET_ID, normalize_chicago_rows
+from ..pipeline import PipelineStats, run_pipeline
 
 
 LOG = logging.getLogger(__name__)
 
 CHICAGO_SOURCE_NAME = "Chicago Crimes - 2001 to Present"
 CHICAGO_API_BASE = "https://data.cityofchicago.org"
+FLOW_NAME = "chicago_recent"
+# updated_on is not unique, so incremental runs page on (updated_on, :id).
+KEYSET = ("updated_on", ":id")
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -35,6 +41,41 @@ def build_parser() -> argparse.ArgumentParser:
         default=50_000,
         help="Maximum records to fetch from Socrata (per run).",
     )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=5000,
+        help="Rows per Socrata request (max 50000). Default 5000.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Number of normalized incidents per database upsert batch (default 1000).",
+    )
+    parser.add_argument(
+        "--max-buffered-batches",
+        type=int,
+        default=4,
+        help="Batches buffered between the fetch, normalize and write stages (default 4).",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Fetch only rows with updated_on past the last run's watermark. "
+        "Falls back to --days when no watermark has been recorded yet.",
+    )
+    parser.add_argument(
+        "--overlap-minutes",
+        type=int,
+        default=10,
+        help="Minutes to re-read before the watermark in incremental mode (default 10).",
+    )
+    parser.add_argument(
+        "--rewrite-unchanged",
+        action="store_true",
+        help="Rewrite incidents even when their content hash matches the stored row.",
+    )
     parser.add_argument(
         "--app-token",
         default=os.getenv("CRIMEGRID_SOCRATA_APP_TOKEN"),
@@ -61,21 +102,7 @@ def main(argv: List[str] | None = None) -> None:
     client = SocrataClient(
         CHICAGO_API_BASE,
         app_token=args.app_token,
-        page_size=min(args.limit, 50_000),
-    )
-
-    cutoff = datetime.now(timezone.utc) - timedelta(days=args.days)
-    cutoff_str = cutoff.strftime("%Y-%m-%dT%H:%M:%S")
-    where_clause = f"date >= '{cutoff_str}'"
-
-    request = SocrataRequest(
-        dataset_id=CHICAGO_DATASET_ID,
-        params={
-            "$select": "*",
-            "$order": "date DESC",
-            "$where": where_clause,
-        },
-        limit=args.limit,
+        page_size=min(args.page_size, args.limit, 50_000),
     )
 
     with get_connection() as conn:
@@ -88,30 +115,104 @@ def main(argv: List[str] | None = None) -> None:
             license="Open Data Commons ODbL",
             refresh_cadence="Daily",
         )
+        previous_watermark = (
+            get_high_watermark(conn, source_id=source_id, flow_name=FLOW_NAME)
+            if args.incremental
+            else None
+        )
 
-    incidents: List[NormalizedIncident] = []
-    fetched = 0
+    keyset_start = None
+    if previous_watermark is not None:
+        watermark, watermark_id = previous_watermark
+        if watermark_id is not None:
+            # The previous run stopped at --limit: resume right after its last
+            # row so a burst of rows sharing one updated_on is still drained.
+            keyset_start = (_socrata_timestamp(watermark), watermark_id)
+            where_clause = None
+            run_scope = f"after={keyset_start[0]},{watermark_id}"
+        else:
+            since = watermark - timedelta(minutes=args.overlap_minutes)
+            cutoff_str = since.strftime("%Y-%m-%dT%H:%M:%S")
+            where_clause = f"updated_on > '{cutoff_str}'"
+            run_scope = f"updated_on>{cutoff_str}"
+        params = {"$select": "*, :id"}
+        if where_clause:
+            params["$where"] = where_clause
+        request = SocrataRequest(
+            dataset_id=CHICAGO_DATASET_ID,
+            params=params,
+            limit=args.limit,
+            keyset_column=KEYSET,
+            keyset_start=keyset_start,
+        )
+    else:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=args.days)
+        cutoff_str = cutoff.strftime("%Y-%m-%dT%H:%M:%S")
+        where_clause = f"date >= '{cutoff_str}'"
+        run_scope = f"cutoff={cutoff_str}"
+        request = SocrataRequest(
+            dataset_id=CHICAGO_DATASET_ID,
+            params={
+                "$select": "*",
+                "$order": "date DESC",
+                "$where": where_clause,
+            },
+            limit=args.limit,
+        )
 
-    for row in client.fetch_rows(request):
-        try:
-            incident = normalize_chicago_row(row)
-        except Exception as exc:  # pragma: no cover - logging for bad rows
-            LOG.exception("Failed to normalize row: %s", exc)
-            continue
-        incidents.append(incident)
-        fetched += 1
+    LOG.info("Fetching rows where %s", where_clause or run_scope)
 
-    LOG.info("Fetched %s records from Socrata", fetched)
+    fetched = 0
+    inserted = 0
+    updated = 0
+    unchanged = 0
+    high_watermark = previous_watermark[0] if previous_watermark else None
+    tracker = FetchTracker(keyset=request.keyset_column is not None)
+    stage_stats = PipelineStats()
 
     with get_connection() as conn:
-        run_id = start_ingest_run(conn, source_id=source_id, flow_name="chicago_recent")
+        run_id = start_ingest_run(conn, source_id=source_id, flow_name=FLOW_NAME)
         try:
-            inserted, updated = upsert_incidents(
-                conn,
-                source_id=source_id,
-                incidents=incidents,
-                ingest_run_id=run_id,
-            )
+            for batch in run_pipeline(
+                tracker.track(client.fetch_rows(request)),
+                normalize_chicago_rows,
+                batch_size=args.batch_size,
+                max_buffered_batches=args.max_buffered_batches,
+                stats=stage_stats,
+            ):
+                fetched += len(batch)
+                ins, upd, unch = upsert_incidents(
+                    conn,
+                    source_id=source_id,
+                    incidents=batch,
+                    ingest_run_id=run_id,
+                    skip_unchanged=not args.rewrite_unchanged,
+                )
+                inserted += ins
+                updated += upd
+                unchanged += unch
+                if args.incremental and not tracker.keyset:
+                    stamps = [stamp for stamp in batch.last_updated_at if stamp is not None]
+                    if high_watermark is not None:
+                        stamps.append(high_watermark)
+                    high_watermark = max(stamps, default=None)
+
+            LOG.info("Fetched %s records from Socrata", fetched)
+            truncated = tracker.rows >= args.limit
+            high_watermark_id = None
+            if tracker.keyset:
+                last_key = tracker.last_key or keyset_start
+                if last_key is not None:
+                    high_watermark = datetime.fromisoformat(last_key[0])
+                    high_watermark_id = last_key[1] if truncated else None
+            elif args.incremental and truncated:
+                # Ordered by date, a truncated window can hold unfetched rows
+                # updated before the newest updated_on seen, so bootstrap again.
+                LOG.warning(
+                    "--days window exceeded --limit=%s; not recording a watermark (raise --limit or lower --days)",
+                    args.limit,
+                )
+                high_watermark = None
             finalize_ingest_run(
                 conn,
                 run_id=run_id,
@@ -119,7 +220,10 @@ def main(argv: List[str] | None = None) -> None:
                 rows_fetched=fetched,
                 rows_inserted=inserted,
                 rows_updated=updated,
-                notes=f"cutoff={cutoff_str}",
+                rows_unchanged=unchanged,
+                notes=f"{run_scope} peak_rss_mb={_peak_rss_mb():.1f} stages: {stage_stats}",
+                high_watermark=high_watermark,
+                high_watermark_id=high_watermark_id,
             )
         except Exception as exc:  # pragma: no cover - logging for runtime errors
             finalize_ingest_run(
@@ -127,13 +231,52 @@ def main(argv: List[str] | None = None) -> None:
                 run_id=run_id,
                 status="failed",
                 rows_fetched=fetched,
-                rows_inserted=0,
-                rows_updated=0,
-                notes=str(exc),
+                rows_inserted=inserted,
+                rows_updated=updated,
+                rows_unchanged=unchanged,
+                notes=f"{exc} peak_rss_mb={_peak_rss_mb():.1f}",
             )
             raise
 
-    LOG.info("Ingestion complete: inserted=%s updated=%s", inserted, updated)
+    LOG.info(
+        "Ingestion complete: inserted=%s updated=%s unchanged=%s peak_rss_mb=%.1f",
+        inserted,
+        updated,
+        unchanged,
+        _peak_rss_mb(),
+    )
+
+
+class FetchTracker:
+    """Counts fetched rows and, for keyset requests, remembers the last key.
+
+    With ``keyset`` it strips ``:id`` from each row (stored rows and their
+    fingerprints never include it) after recording (updated_on, :id). A
+    watermark is only recorded once the pipeline has written every fetched
+    row, so the last fetched key is also the last stored one.
+    """
+
+    def __init__(self, *, keyset: bool) -> None:
+        self.keyset = keyset
+        self.rows = 0
+        self.last_key: Optional[Tuple[str, str]] = None
+
+    def track(self, rows: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for row in rows:
+            self.rows += 1
+            if self.keyset:
+                self.last_key = (row["updated_on"], row.pop(":id"))
+            yield row
+
+
+def _socrata_timestamp(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3]
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
 
 
 if __name__ == "__main__":  # pragma: no cover
@@ -0,0 +1,305 @@
+"""CLI to refresh precomputed KDE heatmap grids from stored incidents."""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from psycopg import Connection
+from psycopg.rows import dict_row
+
+from ..db import get_connection
+from ..db.operations import (
+    TILE_INVALIDATION_ZOOM,
+    fetch_heatmap_counts,
+    fetch_heatmap_extent,
+    fetch_incident_tiles,
+    fetch_tile_invalidations,
+    load_heatmap_grids,
+    save_heatmap_grids,
+)
+from ..heatmap import (
+    GRID_ZOOM,
+    MAX_GRID_CELLS,
+    GridExtent,
+    accumulate,
+    clear_parent_tiles,
+    decode_array,
+    density_surface,
+    encode_array,
+    kernel_radius,
+    quantize,
+    tile_latitude,
+)
+
+
+LOG = logging.getLogger(__name__)
+
+# Mirrors PERIOD_MAP in api/main.py.
+PERIODS: Dict[str, Optional[timedelta]] = {
+    "24h": timedelta(hours=24),
+    "7d": timedelta(days=7),
+    "30d": timedelta(days=30),
+    "90d": timedelta(days=90),
+    "365d": timedelta(days=365),
+    "all": None,
+}
+ALL_TYPES = "ALL"
+# Re-read tile invalidations this far before the previous refresh so rows from
+# transactions still open at that point are not missed.
+INVALIDATION_OVERLAP = timedelta(seconds=60)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--city", default="chicago", help="City to refresh (default chicago).")
+    parser.add_argument(
+        "--period",
+        action="append",
+        choices=sorted(PERIODS),
+        help="Period to refresh; repeat for several. Defaults to every period.",
+    )
+    parser.add_argument(
+        "--bandwidth-m",
+        type=float,
+        default=400.0,
+        help="Gaussian kernel bandwidth in meters (default 400). Changing it forces a full rebuild.",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Recount every cell instead of only tiles changed since the last refresh.",
+    )
+    parser.add_argument(
+        "--log-level",
+        default=os.getenv("CRIMEGRID_LOG_LEVEL", "INFO"),
+        help="Logging level (default INFO).",
+    )
+    return parser
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=getattr(logging, str(args.log_level).upper(), logging.INFO))
+
+    periods = args.period or list(PERIODS)
+    with get_connection() as conn:
+        refresh_city(conn, city=args.city, periods=periods, bandwidth_m=args.bandwidth_m, full=args.full)
+
+
+def refresh_city(
+    conn: Connection,
+    *,
+    city: str,
+    periods: Sequence[str],
+    bandwidth_m: float,
+    full: bool = False,
+) -> None:
+    """Bring the stored heatmap grids for ``city`` up to date.
+
+    Periods with stored grids on the same extent and bandwidth are refreshed
+    incrementally: only cells under tiles recorded in ``tile_invalidations``
+    since the last refresh, plus tiles whose incidents aged out of a relative
+    period, are recounted. Everything else (a first run, ``full``, or a new
+    bandwidth) recounts the whole period.
+    """
+
+    if TILE_INVALIDATION_ZOOM != GRID_ZOOM - 1:
+        raise RuntimeError("heatmap cells must be one zoom level below tile invalidations")
+
+    stored = load_heatmap_grids(conn, city=city)
+    conn.commit()
+
+    extent = None if full else _stored_extent(stored, bandwidth_m)
+    if extent is None:
+        extent = _compute_extent(conn, city=city, bandwidth_m=bandwidth_m)
+        if extent is None:
+            LOG.warning("No geocoded incidents for %s; nothing to refresh", city)
+            return
+        stored = []
+
+    by_period: Dict[str, List[dict]] = defaultdict(list)
+    for row in stored:
+        by_period[row["period"]].append(row)
+
+    for period in periods:
+        _refresh_period(
+            conn,
+            city=city,
+            period=period,
+            extent=extent,
+            bandwidth_m=bandwidth_m,
+            stored=by_period.get(period),
+        )
+
+
+def _refresh_period(
+    conn: Connection,
+    *,
+    city: str,
+    period: str,
+    extent: GridExtent,
+    bandwidth_m: float,
+    stored: Optional[List[dict]],
+) -> None:
+    started = time.perf_counter()
+    with conn.cursor(row_factory=dict_row) as cur:
+        cur.execute("SELECT clock_timestamp() AS computed_at")
+        computed_at: datetime = cur.fetchone()["computed_at"]
+    since = PERIODS[period]
+    window_start = computed_at - since if since is not None else None
+
+    counts: Dict[str, np.ndarray] = {}
+    if stored:
+        mode = "incremental"
+        for row in stored:
+            if row["primary_type"] != ALL_TYPES:
+                counts[row["primary_type"]] = decode_array(row["counts"], np.int32, extent.shape)
+
+        dirty = set(
+            fetch_tile_invalidations(
+                conn,
+                city=city,
+                zoom=TILE_INVALIDATION_ZOOM,
+                since=min(row["computed_at"] for row in stored) - INVALIDATION_OVERLAP,
+            )
+        )
+        previous_start = min((row["window_start"] for row in stored if row["window_start"]), default=None)
+        if window_start is not None and previous_start is not None and previous_start < window_start:
+            dirty.update(
+                fetch_incident_tiles(
+                    conn,
+                    city=city,
+                    zoom=TILE_INVALIDATION_ZOOM,
+                    occurred_from=previous_start,
+                    occurred_to=window_start,
+                )
+            )
+
+        rows: List[dict] = []
+        if dirty:
+            tiles = sorted(dirty)
+            tx = np.array([tile[0] for tile in tiles])
+            ty = np.array([tile[1] for tile in tiles])
+            for grid in counts.values():
+                clear_parent_tiles(grid, extent, tx, ty)
+            rows = fetch_heatmap_counts(
+                conn, city=city, zoom=GRID_ZOOM, start_at=window_start, parent_tiles=tiles
+            )
+        detail = f"dirty_tiles={len(dirty)}"
+    else:
+        mode = "full"
+        rows = fetch_heatmap_counts(conn, city=city, zoom=GRID_ZOOM, start_at=window_start)
+        detail = f"cells={len(rows)}"
+
+    skipped = _accumulate_rows(counts, extent, rows)
+
+    types = sorted(name for name, grid in counts.items() if grid.any())
+    stack = np.zeros((len(types) + 1, *extent.shape), dtype=np.int32)
+    for index, name in enumerate(types, start=1):
+        stack[index] = counts[name]
+    stack[0] = stack[1:].sum(axis=0)
+
+    latitude = extent.center_latitude()
+    density = density_surface(stack, bandwidth_m=bandwidth_m, latitude=latitude)
+
+    grids = []
+    for name, grid_counts, grid_density in zip([ALL_TYPES, *types], stack, density):
+        levels, peak = quantize(grid_density)
+        grids.append(
+            {
+                "primary_type": name,
+                "grid_zoom": GRID_ZOOM,
+                "x0": extent.x0,
+                "y0": extent.y0,
+                "width": extent.width,
+                "height": extent.height,
+                "bandwidth_m": bandwidth_m,
+                "incident_count": int(grid_counts.sum()),
+                "max_density": peak,
+                "counts": encode_array(grid_counts),
+                "intensity": encode_array(levels),
+            }
+        )
+
+    save_heatmap_grids(
+        conn,
+        city=city,
+        period=period,
+        grids=grids,
+        computed_at=computed_at,
+        window_start=window_start,
+    )
+    LOG.info(
+        "Heatmap %s/%s refreshed (%s, %s): types=%s incidents=%s outside_grid=%s elapsed=%.2fs",
+        city,
+        period,
+        mode,
+        detail,
+        len(types),
+        int(stack[0].sum()),
+        skipped,
+        time.perf_counter() - started,
+    )
+
+
+def _accumulate_rows(counts: Dict[str, np.ndarray], extent: GridExtent, rows: List[dict]) -> int:
+    """Add ``fetch_heatmap_counts`` rows into per-type grids; returns counts outside the grid."""
+
+    if not rows:
+        return 0
+    names = np.array([row["primary_type"] for row in rows], dtype=object)
+    cx = np.array([row["cx"] for row in rows], dtype=np.int64)
+    cy = np.array([row["cy"] for row in rows], dtype=np.int64)
+    values = np.array([row["count"] for row in rows], dtype=np.int32)
+
+    skipped = 0
+    for name in np.unique(names):
+        mask = names == name
+        grid = counts.setdefault(name, np.zeros(extent.shape, dtype=np.int32))
+        skipped += accumulate(grid, extent, cx[mask], cy[mask], values[mask])
+    return skipped
+
+
+def _stored_extent(stored: List[dict], bandwidth_m: float) -> Optional[GridExtent]:
+    extents = {
+        (row["grid_zoom"], row["x0"], row["y0"], row["width"], row["height"], row["bandwidth_m"])
+        for row in stored
+    }
+    if len(extents) != 1:
+        return None
+    zoom, x0, y0, width, height, stored_bandwidth = extents.pop()
+    if zoom != GRID_ZOOM or stored_bandwidth != bandwidth_m:
+        return None
+    return GridExtent(x0, y0, width, height)
+
+
+def _compute_extent(conn: Connection, *, city: str, bandwidth_m: float) -> Optional[GridExtent]:
+    bounds = fetch_heatmap_extent(conn, city=city, zoom=GRID_ZOOM)
+    conn.commit()
+    if bounds is None:
+        return None
+    x_min, y_min, x_max, y_max = bounds
+    # Pad by the kernel radius so density near the edge stays on the grid.
+    pad = kernel_radius(bandwidth_m, tile_latitude((y_min + y_max + 1) / 2, GRID_ZOOM))
+    extent = GridExtent(
+        x0=x_min - pad,
+        y0=y_min - pad,
+        width=x_max - x_min + 1 + 2 * pad,
+        height=y_max - y_min + 1 + 2 * pad,
+    )
+    if extent.width * extent.height > MAX_GRID_CELLS:
+        raise ValueError(f"Heatmap grid for {city} would be {extent.width}x{extent.height} cells")
+    return extent
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,79 @@
+"""CLI to create upcoming yearly incident partitions and report partition sizes.
+
+Ingestion creates missing partitions on demand, so this job only keeps the
+next years ready ahead of time (run it from cron, e.g. monthly) and gives a
+quick view of how rows are spread across partitions.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+from datetime import datetime, timezone
+from typing import List
+
+from psycopg import Connection
+
+from ..db import get_connection
+from ..db.operations import ensure_incident_partitions, fetch_incident_partitions
+
+
+LOG = logging.getLogger(__name__)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--city",
+        action="append",
+        help="City to maintain; repeat for several (default chicago).",
+    )
+    parser.add_argument(
+        "--years-ahead",
+        type=int,
+        default=1,
+        help="Create partitions through this many years after the current one (default 1).",
+    )
+    parser.add_argument(
+        "--log-level",
+        default=os.getenv("CRIMEGRID_LOG_LEVEL", "INFO"),
+        help="Logging level (default INFO).",
+    )
+    return parser
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=getattr(logging, str(args.log_level).upper(), logging.INFO))
+
+    with get_connection() as conn:
+        for city in args.city or ["chicago"]:
+            maintain_city(conn, city=city, years_ahead=args.years_ahead)
+
+
+def maintain_city(conn: Connection, *, city: str, years_ahead: int, now: datetime | None = None) -> int:
+    """Ensure ``city`` has partitions from the current year through ``years_ahead``."""
+
+    now = now or datetime.now(timezone.utc)
+    end = now.replace(year=now.year + years_ahead, month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    created = ensure_incident_partitions(conn, city=city, start=now, end=end)
+    LOG.info("Created %s incident partition(s) for %s through %s", created, city, end.year)
+
+    partitions = fetch_incident_partitions(conn, city=city)
+    conn.commit()
+    for partition in partitions:
+        LOG.info(
+            "%s %s: ~%s rows, %.1f MiB",
+            partition["name"],
+            partition["bounds"],
+            partition["estimated_rows"],
+            partition["total_bytes"] / (1024 * 1024),
+        )
+    return created
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -2,9 +2,13 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+import hashlib
+import json
+from dataclasses import dataclass, field, fields
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
 
 
 @dataclass(slots=True)
@@ -42,3 +46,113 @@ class NormalizedIncident:
         """Derived unique incident identifier."""
 
         return f"{self.city}:{self.source_slug}:{self.row_uid}"
+
+    def fingerprint(self) -> str:
+        """Stable digest of the normalized fields and raw record.
+
+        Stored as ``incidents.content_hash`` so upserts can skip rows whose
+        content has not changed since the previous ingest.
+        """
+
+        return _fingerprint([getattr(self, name) for name in _INCIDENT_FIELDS])
+
+
+_INCIDENT_FIELDS = tuple(f.name for f in fields(NormalizedIncident))
+_FLOAT_COLUMNS = ("latitude", "longitude", "x_coordinate", "y_coordinate")
+
+
+def _fingerprint(values: Sequence[Any]) -> str:
+    payload = json.dumps(values, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass(slots=True)
+class IncidentBatch:
+    """Columnar batch of normalized incidents from a single source.
+
+    Holds one list per :class:`NormalizedIncident` field instead of one object
+    per row. Coordinates are ``float64`` arrays with ``NaN`` for missing values
+    so they can be validated or transformed for a whole page at once, and
+    low-cardinality text columns (``primary_type``, ``district``, ``beat``) are
+    interned by the producer.
+    """
+
+    city: str
+    source_slug: str
+    row_uid: List[str] = field(default_factory=list)
+    occurred_at: List[datetime] = field(default_factory=list)
+    primary_type: List[str] = field(default_factory=list)
+    raw_record: List[Dict[str, Any]] = field(default_factory=list)
+    external_case_id: List[Optional[str]] = field(default_factory=list)
+    reported_at: List[Optional[datetime]] = field(default_factory=list)
+    last_updated_at: List[Optional[datetime]] = field(default_factory=list)
+    description: List[Optional[str]] = field(default_factory=list)
+    iucr: List[Optional[str]] = field(default_factory=list)
+    arrest: List[Optional[bool]] = field(default_factory=list)
+    domestic: List[Optional[bool]] = field(default_factory=list)
+    district: List[Optional[str]] = field(default_factory=list)
+    beat: List[Optional[str]] = field(default_factory=list)
+    ward: List[Optional[str]] = field(default_factory=list)
+    community_area: List[Optional[str]] = field(default_factory=list)
+    location_description: List[Optional[str]] = field(default_factory=list)
+    street_block: List[Optional[str]] = field(default_factory=list)
+    latitude: np.ndarray = field(default_factory=lambda: np.empty(0))
+    longitude: np.ndarray = field(default_factory=lambda: np.empty(0))
+    x_coordinate: np.ndarray = field(default_factory=lambda: np.empty(0))
+    y_coordinate: np.ndarray = field(default_factory=lambda: np.empty(0))
+    receipt_url: List[Optional[str]] = field(default_factory=list)
+    metadata: List[Dict[str, Any]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.row_uid)
+
+    @classmethod
+    def from_incidents(cls, incidents: Sequence[NormalizedIncident]) -> "IncidentBatch":
+        """Build a batch from row objects that share a city and source."""
+
+        if not incidents:
+            raise ValueError("Cannot infer city/source for an empty batch")
+        first = incidents[0]
+        columns: Dict[str, Any] = {}
+        for name in _INCIDENT_FIELDS:
+            if name in ("city", "source_slug"):
+                continue
+            values = [getattr(incident, name) for incident in incidents]
+            columns[name] = _float_array(values) if name in _FLOAT_COLUMNS else values
+        return cls(city=first.city, source_slug=first.source_slug, **columns)
+
+    def column(self, name: str) -> List[Any]:
+        """Return a field as a Python list, with ``NaN`` coordinates as ``None``."""
+
+        if name in ("city", "source_slug"):
+            return [getattr(self, name)] * len(self)
+        values = getattr(self, name)
+        if name in _FLOAT_COLUMNS:
+            return [None if value != value else value for value in values.tolist()]
+        return values
+
+    def incident_ids(self) -> List[str]:
+        prefix = f"{self.city}:{self.source_slug}:"
+        return [prefix + uid for uid in self.row_uid]
+
+    def fingerprints(self) -> List[str]:
+        """Per-row digests identical to :meth:`NormalizedIncident.fingerprint`."""
+
+        columns = [self.column(name) for name in _INCIDENT_FIELDS]
+        return [_fingerprint(list(values)) for values in zip(*columns)]
+
+    def has_coordinates(self) -> np.ndarray:
+        """Boolean mask of rows with finite, in-range latitude and longitude."""
+
+        lat, lon = self.latitude, self.longitude
+        with np.errstate(invalid="ignore"):
+            return np.isfinite(lat) & np.isfinite(lon) & (np.abs(lat) <= 90) & (np.abs(lon) <= 180)
+
+    def iter_incidents(self) -> Iterator[NormalizedIncident]:
+        columns = [self.column(name) for name in _INCIDENT_FIELDS]
+        for values in zip(*columns):
+            yield NormalizedIncident(**dict(zip(_INCIDENT_FIELDS, values)))
+
+
+def _float_array(values: Sequence[Optional[float]]) -> np.ndarray:
+    return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
@@ -5,6 +5,7 @@ from .chicago import (
     CHICAGO_DATASET_ID,
     CHICAGO_SOURCE_SLUG,
     normalize_row as normalize_chicago_row,
+    normalize_rows as normalize_chicago_rows,
 )
 
 __all__ = [
@@ -12,4 +13,5 @@ __all__ = [
     "CHICAGO_DATASET_ID",
     "CHICAGO_SOURCE_SLUG",
     "normalize_chicago_row",
+    "normalize_chicago_rows",
 ]
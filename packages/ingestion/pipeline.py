@@ -0,0 +1,177 @@
+"""Bounded producer/transform/consumer pipeline for ingestion jobs."""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, TypeVar
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_DONE = object()
+_POLL_SECONDS = 0.1
+
+
+@dataclass
+class StageStats:
+    """Timing for one pipeline stage.
+
+    ``busy_seconds`` is time spent doing the stage's own work; ``wait_seconds``
+    is time blocked on a neighbouring queue (starved for input or held back by
+    a full output queue). A saturated stage shows high busy and low wait.
+    """
+
+    name: str
+    busy_seconds: float = 0.0
+    wait_seconds: float = 0.0
+    batches: int = 0
+
+    def __str__(self) -> str:
+        return f"{self.name}(busy={self.busy_seconds:.2f}s wait={self.wait_seconds:.2f}s batches={self.batches})"
+
+
+@dataclass
+class PipelineStats:
+    """Per-stage timings collected by :func:`run_pipeline`."""
+
+    stages: Dict[str, StageStats] = field(
+        default_factory=lambda: {name: StageStats(name) for name in ("fetch", "normalize", "write")}
+    )
+
+    def __getitem__(self, name: str) -> StageStats:
+        return self.stages[name]
+
+    def __str__(self) -> str:
+        return " ".join(str(stage) for stage in self.stages.values())
+
+
+class _Failure:
+    __slots__ = ("exc",)
+
+    def __init__(self, exc: BaseException) -> None:
+        self.exc = exc
+
+
+def run_pipeline(
+    source: Iterable[T],
+    transform: Callable[[List[T]], Sequence[R]],
+    *,
+    batch_size: int,
+    max_buffered_batches: int = 4,
+    stats: PipelineStats | None = None,
+) -> Iterator[Sequence[R]]:
+    """Yield transformed batches while the next ones are fetched and transformed.
+
+    ``source`` is drained on a fetch thread in chunks of ``batch_size`` and
+    ``transform`` runs on a second thread; the caller consumes the results
+    (typically writing them to the database). Both hand-offs are bounded
+    queues of ``max_buffered_batches`` so a slow consumer applies backpressure
+    instead of growing memory. Exceptions raised by either thread are
+    re-raised in the caller, and closing the generator early stops both
+    threads.
+    """
+
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    if max_buffered_batches < 1:
+        raise ValueError("max_buffered_batches must be at least 1")
+
+    stats = stats if stats is not None else PipelineStats()
+    fetch_stats, normalize_stats, write_stats = stats["fetch"], stats["normalize"], stats["write"]
+    raw_queue: queue.Queue = queue.Queue(maxsize=max_buffered_batches)
+    out_queue: queue.Queue = queue.Queue(maxsize=max_buffered_batches)
+    stop = threading.Event()
+
+    def put(q: queue.Queue, item: object, stage: StageStats) -> bool:
+        started = time.perf_counter()
+        try:
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=_POLL_SECONDS)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            stage.wait_seconds += time.perf_counter() - started
+
+    def get(q: queue.Queue, stage: StageStats) -> object:
+        started = time.perf_counter()
+        try:
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=_POLL_SECONDS)
+                except queue.Empty:
+                    continue
+            return _DONE
+        finally:
+            stage.wait_seconds += time.perf_counter() - started
+
+    def fetch() -> None:
+        try:
+            iterator = iter(source)
+            chunk: List[T] = []
+            while not stop.is_set():
+                started = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    fetch_stats.busy_seconds += time.perf_counter() - started
+                chunk.append(item)
+                if len(chunk) >= batch_size:
+                    fetch_stats.batches += 1
+                    if not put(raw_queue, chunk, fetch_stats):
+                        return
+                    chunk = []
+            if chunk:
+                fetch_stats.batches += 1
+                if not put(raw_queue, chunk, fetch_stats):
+                    return
+            put(raw_queue, _DONE, fetch_stats)
+        except BaseException as exc:
+            put(raw_queue, _Failure(exc), fetch_stats)
+
+    def normalize() -> None:
+        try:
+            while True:
+                item = get(raw_queue, normalize_stats)
+                if item is _DONE or isinstance(item, _Failure):
+                    put(out_queue, item, normalize_stats)
+                    return
+                started = time.perf_counter()
+                result = transform(item)
+                normalize_stats.busy_seconds += time.perf_counter() - started
+                normalize_stats.batches += 1
+                if not put(out_queue, result, normalize_stats):
+                    return
+        except BaseException as exc:
+            put(out_queue, _Failure(exc), normalize_stats)
+
+    threads = [
+        threading.Thread(target=fetch, name="pipeline-fetch", daemon=True),
+        threading.Thread(target=normalize, name="pipeline-normalize", daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        while True:
+            item = get(out_queue, write_stats)
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.exc
+            started = time.perf_counter()
+            yield item
+            write_stats.busy_seconds += time.perf_counter() - started
+            write_stats.batches += 1
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
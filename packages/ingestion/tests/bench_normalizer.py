@@ -0,0 +1,88 @@
+"""Micro-benchmark for Chicago row normalization throughput.
+
+Compares ``normalize_row`` with every timestamp forced through dateutil (the
+previous behaviour, minus its duplicate parse of ``date``) against the
+``fromisoformat`` fast path. No database or network access is required.
+
+    PYTHONPATH=. python -m packages.ingestion.tests.bench_normalizer --rows 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+from unittest import mock
+
+from dateutil import parser as dateutil_parser
+
+from packages.ingestion.normalizers import chicago
+
+
+def make_rows(count: int, *, seed: int = 11) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    base = datetime(2024, 1, 1)
+    rows = []
+    for idx in range(count):
+        occurred = base + timedelta(minutes=rng.randint(0, 525_600))
+        rows.append(
+            {
+                "id": str(10_000_000 + idx),
+                "case_number": f"JH{idx:06d}",
+                "date": occurred.strftime("%Y-%m-%dT%H:%M:%S.000"),
+                "updated_on": (occurred + timedelta(days=7)).strftime("%Y-%m-%dT%H:%M:%S.000"),
+                "primary_type": rng.choice(["THEFT", "BATTERY", "ASSAULT", "BURGLARY"]),
+                "description": "SIMPLE",
+                "iucr": "0486",
+                "arrest": rng.choice([True, False]),
+                "domestic": rng.choice([True, False]),
+                "district": f"{rng.randint(1, 25):03d}",
+                "beat": f"{rng.randint(100, 2500):04d}",
+                "ward": str(rng.randint(1, 50)),
+                "community_area": str(rng.randint(1, 77)),
+                "location_description": "STREET",
+                "block": "012XX S STATE ST",
+                "latitude": f"{41.6 + rng.random() * 0.4:.9f}",
+                "longitude": f"{-87.9 + rng.random() * 0.4:.9f}",
+                "x_coordinate": str(rng.randint(1_100_000, 1_200_000)),
+                "y_coordinate": str(rng.randint(1_800_000, 1_950_000)),
+                "fbi_code": "08B",
+            }
+        )
+    return rows
+
+
+def _dateutil_only(value):
+    return dateutil_parser.parse(value) if value else None
+
+
+def measure(label: str, rows: List[Dict[str, Any]], fn: Callable[[Dict[str, Any]], Any]) -> float:
+    started = time.perf_counter()
+    for row in rows:
+        fn(row)
+    elapsed = time.perf_counter() - started
+    rate = len(rows) / elapsed
+    print(f"{label:<28} rows={len(rows)} elapsed={elapsed:.3f}s rate={rate:,.0f} rows/s")
+    return rate
+
+
+def run(count: int) -> None:
+    rows = make_rows(count)
+
+    with mock.patch.object(chicago, "_parse_dt", _dateutil_only):
+        before = measure("normalize_row (dateutil)", rows, chicago.normalize_row)
+    after = measure("normalize_row (fast path)", rows, chicago.normalize_row)
+    print(f"speedup: {after / before:.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+    run(args.rows)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
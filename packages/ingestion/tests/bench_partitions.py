@@ -0,0 +1,105 @@
+"""Show partition pruning for the API's recent-window incident queries.
+
+Runs ``EXPLAIN (ANALYZE, BUFFERS)`` for the ``/incidents`` page query and a
+per-type count over several periods and reports which ``incidents``
+partitions were actually scanned, the shared buffers touched and the
+execution time. Read-only; needs a migrated database with incidents reachable
+through ``CRIMEGRID_DB_DSN``.
+
+    PYTHONPATH=. python -m packages.ingestion.tests.bench_partitions --city chicago
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, Optional
+
+from psycopg.rows import tuple_row
+
+from packages.ingestion.db import get_connection
+from packages.ingestion.db.operations import fetch_incident_partitions
+
+
+PERIODS = {
+    "7d": timedelta(days=7),
+    "30d": timedelta(days=30),
+    "365d": timedelta(days=365),
+    "all": None,
+}
+
+# Mirror the statements behind GET /incidents.
+QUERIES = {
+    "page": """
+        SELECT id, city, primary_type, description, occurred_at, latitude, longitude
+        FROM incidents
+        WHERE {where}
+        ORDER BY occurred_at DESC, id DESC
+        LIMIT 1000
+    """,
+    "type_counts": """
+        SELECT primary_type, COUNT(*)
+        FROM incidents
+        WHERE {where}
+        GROUP BY primary_type
+    """,
+}
+
+
+def _nodes(node: dict) -> Iterator[dict]:
+    yield node
+    for child in node.get("Plans", ()):
+        yield from _nodes(child)
+
+
+def summarize(plan: dict) -> tuple[list[str], int]:
+    """(partitions scanned, shared buffers touched) for an analyzed plan."""
+
+    root = plan["Plan"]
+    scanned = set()
+    for node in _nodes(root):
+        # Run-time pruning leaves never-executed scans in the plan.
+        if "Relation Name" in node and node.get("Actual Loops", 0) > 0:
+            scanned.add(node["Relation Name"])
+    buffers = root.get("Shared Hit Blocks", 0) + root.get("Shared Read Blocks", 0)
+    return sorted(scanned), buffers
+
+
+def run(city: str, runs: int) -> None:
+    now = datetime.now(timezone.utc)
+    with get_connection() as conn:
+        partitions = len(fetch_incident_partitions(conn, city=city))
+        with conn.cursor(row_factory=tuple_row) as cur:
+            for period, since in PERIODS.items():
+                start_at: Optional[datetime] = now - since if since else None
+                where = "city = %s" + (" AND occurred_at >= %s" if start_at else "")
+                params = [city] + ([start_at] if start_at else [])
+
+                for name, template in QUERIES.items():
+                    best = None
+                    for _ in range(runs):
+                        cur.execute(
+                            "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + template.format(where=where),
+                            params,
+                        )
+                        plan = cur.fetchone()[0][0]
+                        if best is None or plan["Execution Time"] < best["Execution Time"]:
+                            best = plan
+                    scanned, buffers = summarize(best)
+                    print(
+                        f"{period:>4} {name:<11} time={best['Execution Time']:.2f}ms buffers={buffers} "
+                        f"scanned={len(scanned)}/{partitions} {','.join(scanned)}"
+                    )
+        conn.rollback()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--city", default="chicago")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per query; the fastest is reported.")
+    args = parser.parse_args()
+    run(args.city, args.runs)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,119 @@
+"""Benchmark the row-wise and COPY-based ``upsert_incidents`` paths.
+
+Requires a migrated database reachable through ``CRIMEGRID_DB_DSN``. Rows are
+written under a throwaway ``benchmark`` city (default partition) and removed
+afterwards.
+
+    PYTHONPATH=. python -m packages.ingestion.tests.bench_upsert --rows 5000 --batch-size 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from packages.ingestion.db import get_connection
+from packages.ingestion.db.operations import UPSERT_METHODS, ensure_source, upsert_incidents
+from packages.ingestion.models import NormalizedIncident
+
+
+BENCH_CITY = "benchmark"
+BENCH_SLUG = "benchmark_incidents"
+
+
+def make_incidents(count: int, *, seed: int = 7) -> List[NormalizedIncident]:
+    rng = random.Random(seed)
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    incidents = []
+    for idx in range(count):
+        occurred_at = base + timedelta(minutes=idx)
+        row_uid = f"bench-{idx}"
+        lat = 41.6 + rng.random() * 0.4
+        lon = -87.9 + rng.random() * 0.4
+        incidents.append(
+            NormalizedIncident(
+                city=BENCH_CITY,
+                source_slug=BENCH_SLUG,
+                row_uid=row_uid,
+                occurred_at=occurred_at,
+                reported_at=occurred_at,
+                last_updated_at=occurred_at,
+                primary_type=rng.choice(["THEFT", "BATTERY", "ASSAULT", "BURGLARY"]),
+                description="BENCHMARK",
+                district=f"{rng.randint(1, 25):03d}",
+                beat=f"{rng.randint(100, 2500):04d}",
+                latitude=lat,
+                longitude=lon,
+                raw_record={"id": row_uid, "latitude": str(lat), "longitude": str(lon)},
+            )
+        )
+    return incidents
+
+
+def run(rows: int, batch_size: int) -> None:
+    incidents = make_incidents(rows)
+    changed = [dataclasses.replace(incident, description="BENCHMARK (revised)") for incident in incidents]
+    phases = (("insert", incidents), ("same", incidents), ("update", changed))
+
+    with get_connection() as conn:
+        source_id = ensure_source(
+            conn,
+            city=BENCH_CITY,
+            portal_slug=BENCH_SLUG,
+            name="Upsert benchmark",
+            api_base="local",
+        )
+
+        try:
+            for method in UPSERT_METHODS:
+                # Insert every row, re-send identical rows, then send revised rows.
+                for phase, payload in phases:
+                    started = time.perf_counter()
+                    inserted = updated = unchanged = 0
+                    for offset in range(0, rows, batch_size):
+                        ins, upd, unch = upsert_incidents(
+                            conn,
+                            source_id=source_id,
+                            incidents=payload[offset : offset + batch_size],
+                            method=method,
+                        )
+                        inserted += ins
+                        updated += upd
+                        unchanged += unch
+                    elapsed = time.perf_counter() - started
+                    print(
+                        f"{method:>4} {phase:<6} rows={rows} inserted={inserted} updated={updated} "
+                        f"unchanged={unchanged} elapsed={elapsed:.3f}s rate={rows / elapsed:,.0f} rows/s"
+                    )
+
+                _cleanup(conn)
+        finally:
+            _cleanup(conn)
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM sources WHERE id = %s", (source_id,))
+            conn.commit()
+
+
+def _cleanup(conn) -> None:
+    """Drop the benchmark city's incidents and the rollups upserts kept for them."""
+
+    with conn.cursor() as cur:
+        for table in ("incidents", "incident_daily_summary", "tile_invalidations"):
+            cur.execute(f"DELETE FROM {table} WHERE city = %s", (BENCH_CITY,))
+    conn.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    run(args.rows, args.batch_size)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
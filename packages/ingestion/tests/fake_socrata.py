@@ -0,0 +1,82 @@
+"""Minimal local stand-in for a Socrata ``/resource/<id>.json`` endpoint.
+
+Understands the subset of SoQL the ingestion clients emit: ``date >=`` /
+``date <`` bounds, ``:id >`` keyset clauses, ``$order=:id ASC``, ``$limit`` and
+``$offset``. Tracks the peak number of concurrent requests it served.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeSocrata:
+    def __init__(self, rows: List[Dict[str, Any]], *, latency: float = 0.0) -> None:
+        self.rows = sorted(rows, key=lambda row: row[":id"])
+        self.latency = latency
+        self.requests: List[Dict[str, str]] = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FakeSocrata":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def select(self, params: Dict[str, str]) -> List[Dict[str, Any]]:
+        rows = self.rows
+        where = params.get("$where", "")
+        for op, value in re.findall(r"date (>=|<) '([^']+)'", where):
+            if op == ">=":
+                rows = [row for row in rows if row["date"] >= value]
+            else:
+                rows = [row for row in rows if row["date"] < value]
+        for value in re.findall(r":id > '([^']+)'", where):
+            rows = [row for row in rows if row[":id"] > value]
+        offset = int(params.get("$offset", 0))
+        limit = int(params.get("$limit", 1000))
+        return rows[offset : offset + limit]
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802 - http.server API
+                params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+                with fake._lock:
+                    fake.requests.append(params)
+                    fake.active += 1
+                    fake.peak = max(fake.peak, fake.active)
+                try:
+                    time.sleep(fake.latency)
+                    body = json.dumps(fake.select(params)).encode()
+                finally:
+                    with fake._lock:
+                        fake.active -= 1
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
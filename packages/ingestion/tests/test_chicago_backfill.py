@@ -0,0 +1,80 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from packages.ingestion.jobs.chicago_backfill import (
+    WindowResult,
+    _add_month,
+    _iter_month_windows,
+    _run_windows,
+)
+
+
+def _windows(count):
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    end = start
+    for _ in range(count):
+        end = _add_month(end)
+    return list(_iter_month_windows(start, end))
+
+
+def _result(window):
+    return WindowResult(window[0], window[1], fetched=1, inserted=1, updated=0, unchanged=0)
+
+
+def test_run_windows_processes_every_window_concurrently():
+    windows = _windows(6)
+    seen = []
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def process(window):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+            seen.append(window)
+        return _result(window)
+
+    failures = _run_windows(windows, process, workers=3, fail_fast=True)
+
+    assert failures == []
+    assert sorted(seen) == windows
+    assert 1 < peak <= 3
+
+
+def test_run_windows_continue_collects_failures():
+    windows = _windows(4)
+
+    def process(window):
+        if window == windows[1]:
+            raise RuntimeError("boom")
+        return _result(window)
+
+    failures = _run_windows(windows, process, workers=2, fail_fast=False)
+
+    assert failures == [windows[1]]
+
+
+def test_run_windows_fail_fast_cancels_pending_windows():
+    windows = _windows(12)
+    started = []
+
+    def process(window):
+        started.append(window)
+        if window == windows[0]:
+            raise RuntimeError("boom")
+        time.sleep(0.01)
+        return _result(window)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        _run_windows(windows, process, workers=1, fail_fast=True)
+
+    assert started[0] == windows[0]
+    assert len(started) < len(windows)
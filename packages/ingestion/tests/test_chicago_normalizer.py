@@ -1,9 +1,11 @@
 from datetime import datetime
 
 import pytest
+from dateutil import parser
 
 from packages.ingestion.models import NormalizedIncident
 from packages.ingestion.normalizers import CHICAGO_CITY_CODE, CHICAGO_SOURCE_SLUG, normalize_chicago_row
+from packages.ingestion.normalizers.chicago import _parse_dt
 
 
 def test_normalize_chicago_row_success():
@@ -51,3 +53,27 @@ def test_normalize_chicago_row_missing_date():
 
     with pytest.raises(ValueError):
         normalize_chicago_row(raw)
+
+
+def test_fingerprint_tracks_content_changes():
+    raw = {"id": "fp-1", "date": "2025-09-20T13:45:00.000", "primary_type": "THEFT"}
+
+    first = normalize_chicago_row(dict(raw))
+    again = normalize_chicago_row(dict(raw))
+    revised = normalize_chicago_row({**raw, "primary_type": "BATTERY"})
+
+    assert first.fingerprint() == again.fingerprint()
+    assert first.fingerprint() != revised.fingerprint()
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "2025-09-20T13:45:00.000",
+        "2025-09-20T13:45:00",
+        "09/20/2025 01:45:00 PM",
+        "2025-09-20 13:45:00.000",
+    ],
+)
+def test_parse_dt_fast_path_matches_dateutil(value):
+    assert _parse_dt(value) == parser.parse(value)
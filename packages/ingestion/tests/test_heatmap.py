@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from packages.ingestion.heatmap import (
+    GridExtent,
+    accumulate,
+    clear_parent_tiles,
+    decode_array,
+    density_surface,
+    encode_array,
+    quantize,
+    smooth,
+    tile_latitude,
+    tile_longitude,
+    tile_xy,
+)
+
+
+def test_tile_xy_matches_known_tile():
+    x, y = tile_xy(np.array([41.8781]), np.array([-87.6298]), 10)
+
+    assert (x[0], y[0]) == (262, 380)
+    assert tile_longitude(262, 10) <= -87.6298 < tile_longitude(263, 10)
+    assert tile_latitude(381, 10) < 41.8781 <= tile_latitude(380, 10)
+
+
+def test_tile_xy_parent_is_half_child():
+    rng = np.random.default_rng(3)
+    lat = 41.6 + rng.random(1000) * 0.4
+    lon = -87.9 + rng.random(1000) * 0.4
+
+    child_x, child_y = tile_xy(lat, lon, 17)
+    parent_x, parent_y = tile_xy(lat, lon, 16)
+
+    assert np.array_equal(child_x // 2, parent_x)
+    assert np.array_equal(child_y // 2, parent_y)
+
+
+def test_smooth_conserves_mass_and_is_symmetric():
+    counts = np.zeros((2, 41, 41), dtype=np.int32)
+    counts[0, 20, 20] = 10
+    counts[1, 8, 30] = 3
+
+    out = smooth(counts, sigma_cells=2.0)
+
+    assert out[0].sum() == pytest.approx(10)
+    assert out[1].sum() == pytest.approx(3)
+    assert out[0, 20, 20] == out[0].max()
+    assert np.allclose(out[0], out[0].T)
+    assert np.allclose(out[0], out[0, ::-1, ::-1])
+
+
+def test_density_surface_is_per_square_km():
+    counts = np.zeros((31, 31), dtype=np.int32)
+    counts[15, 15] = 100
+
+    density = density_surface(counts, bandwidth_m=400.0, latitude=41.88)
+    cell_km = 40_075.016686 * np.cos(np.radians(41.88)) / 2 ** 17
+
+    assert density.sum() * cell_km ** 2 == pytest.approx(100)
+
+
+def test_quantize_scales_to_uint8_and_keeps_small_values():
+    density = np.array([[0.0, 1e-6], [5.0, 10.0]])
+
+    levels, peak = quantize(density)
+
+    assert peak == 10.0
+    assert levels.dtype == np.uint8
+    assert levels.tolist() == [[0, 1], [128, 255]]
+    assert quantize(np.zeros((2, 2)))[1] == 0.0
+
+
+def test_encode_round_trip():
+    grid = np.arange(12, dtype=np.int32).reshape(3, 4)
+
+    assert np.array_equal(decode_array(encode_array(grid), np.int32, (3, 4)), grid)
+
+
+def test_accumulate_and_clear_parent_tiles():
+    extent = GridExtent(x0=100, y0=200, width=4, height=4)
+    grid = np.zeros(extent.shape, dtype=np.int32)
+
+    skipped = accumulate(
+        grid,
+        extent,
+        cx=np.array([100, 101, 103, 100, 99]),
+        cy=np.array([200, 201, 203, 200, 200]),
+        counts=np.array([1, 2, 3, 4, 5]),
+    )
+
+    assert skipped == 5
+    assert grid[0, 0] == 5 and grid[1, 1] == 2 and grid[3, 3] == 3
+
+    # Parent tile (50, 100) covers cells x 100-101, y 200-201.
+    clear_parent_tiles(grid, extent, np.array([50]), np.array([100]))
+
+    assert grid[:2, :2].sum() == 0
+    assert grid[3, 3] == 3
@@ -0,0 +1,62 @@
+import math
+
+import numpy as np
+
+from packages.ingestion.models import IncidentBatch
+from packages.ingestion.normalizers import normalize_chicago_row, normalize_chicago_rows
+
+
+ROWS = [
+    {
+        "id": "1",
+        "date": "2025-09-20T13:45:00.000",
+        "updated_on": "2025-09-21T02:30:00.000",
+        "primary_type": "THEFT",
+        "district": "012",
+        "beat": "1234",
+        "latitude": "41.881903",
+        "longitude": "-87.627909",
+        "x_coordinate": "1176445",
+        "y_coordinate": "1899394",
+        "arrest": "true",
+    },
+    {"id": "2", "date": "2025-09-20T14:00:00.000", "primary_type": "THEFT", "district": "012"},
+    {"id": "3"},  # missing date: skipped
+    {"id": "4", "date": "2025-09-20T15:00:00.000", "latitude": "95.0", "longitude": "-87.6"},
+]
+
+
+def test_normalize_rows_matches_row_normalizer():
+    batch = normalize_chicago_rows(ROWS)
+    expected = [normalize_chicago_row(row) for row in ROWS if "date" in row]
+
+    assert len(batch) == 3
+    assert batch.row_uid == ["1", "2", "4"]
+    assert batch.incident_ids() == [incident.incident_id for incident in expected]
+    assert batch.fingerprints() == [incident.fingerprint() for incident in expected]
+    assert list(batch.iter_incidents()) == expected
+    assert batch.latitude.dtype == np.float64
+    assert math.isnan(batch.latitude[1])
+    assert batch.column("latitude")[1] is None
+
+
+def test_normalize_rows_interns_low_cardinality_columns():
+    batch = normalize_chicago_rows(ROWS)
+
+    assert batch.primary_type[0] is batch.primary_type[1]
+    assert batch.district[0] is batch.district[1]
+
+
+def test_has_coordinates_is_vectorized_mask():
+    batch = normalize_chicago_rows(ROWS)
+
+    assert batch.has_coordinates().tolist() == [True, False, False]
+
+
+def test_from_incidents_round_trip():
+    incidents = [normalize_chicago_row(row) for row in ROWS if "date" in row]
+
+    batch = IncidentBatch.from_incidents(incidents)
+
+    assert list(batch.iter_incidents()) == incidents
+    assert batch.fingerprints() == [incident.fingerprint() for incident in incidents]
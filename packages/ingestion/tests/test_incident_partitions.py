@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from packages.ingestion.db import operations
+from packages.ingestion.models import NormalizedIncident
+
+
+CHICAGO_WINTER = timezone(timedelta(hours=-6))
+
+
+def _incident(occurred_at):
+    return NormalizedIncident(
+        city="chicago",
+        source_slug="chicago",
+        row_uid="1",
+        occurred_at=occurred_at,
+        reported_at=None,
+        last_updated_at=None,
+        primary_type="THEFT",
+        description=None,
+        latitude=None,
+        longitude=None,
+        raw_record={},
+    )
+
+
+@pytest.fixture
+def ensured(monkeypatch):
+    calls = []
+    monkeypatch.setattr(operations, "_ensured_partition_years", set())
+    monkeypatch.setattr(
+        operations,
+        "ensure_incident_partitions",
+        lambda conn, *, city, start, end: calls.append((city, start, end)) or 0,
+    )
+    return calls
+
+
+def test_late_local_new_years_eve_ensures_next_utc_year(ensured):
+    operations._ensure_partitions_for(None, [_incident(datetime(2024, 6, 1, 12, tzinfo=CHICAGO_WINTER))])
+    # 2024-12-31 20:00 in Chicago is already 2025 in UTC.
+    operations._ensure_partitions_for(None, [_incident(datetime(2024, 12, 31, 20, tzinfo=CHICAGO_WINTER))])
+
+    assert len(ensured) == 2
+    assert ensured[1][2].astimezone(timezone.utc).year == 2025
+    assert ("chicago", 2025) in operations._ensured_partition_years
+
+
+def test_naive_timestamps_cache_the_padded_utc_years(ensured):
+    operations._ensure_partitions_for(None, [_incident(datetime(2024, 6, 1, 12))])
+    operations._ensure_partitions_for(None, [_incident(datetime(2024, 12, 31, 23))])
+    operations._ensure_partitions_for(None, [_incident(datetime(2025, 1, 1, 6))])
+
+    assert [(start.year, end.year) for _, start, end in ensured] == [(2024, 2024), (2024, 2025)]
+    assert all(start.tzinfo is timezone.utc for _, start, _ in ensured)
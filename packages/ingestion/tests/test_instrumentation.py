@@ -0,0 +1,102 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from psycopg import sql
+
+from packages.ingestion.db import instrumentation
+from packages.ingestion.db.instrumentation import (
+    explain_query,
+    function_names,
+    may_analyze,
+    normalize_params,
+    should_capture,
+    statement_text,
+    summarize_plan,
+)
+
+
+PLAN = [
+    {
+        "Plan": {
+            "Node Type": "Limit",
+            "Plans": [
+                {
+                    "Node Type": "Append",
+                    "Plans": [
+                        {
+                            "Node Type": "Index Scan",
+                            "Relation Name": "incidents_city_chicago",
+                            "Index Name": "incidents_city_chicago_city_occurred_at_idx",
+                        },
+                        {"Node Type": "Seq Scan", "Relation Name": "incidents_city_default"},
+                    ],
+                }
+            ],
+        }
+    }
+]
+
+
+def test_summarize_plan_collects_indexes_and_seq_scans():
+    assert summarize_plan(PLAN) == (
+        ["incidents_city_chicago_city_occurred_at_idx"],
+        ["incidents_city_default"],
+    )
+    assert summarize_plan(None) == ([], [])
+
+
+def test_normalize_params_bounds_size():
+    when = datetime(2025, 9, 20, 13, 45, tzinfo=timezone.utc)
+
+    assert normalize_params(["chicago", when, Decimal("1.5"), b"abc", None]) == [
+        "chicago",
+        "2025-09-20T13:45:00+00:00",
+        1.5,
+        "<3 bytes>",
+        None,
+    ]
+    assert normalize_params({"ids": list(range(12))})["ids"][-1] == "<2 more>"
+    assert normalize_params(["x" * 500])[0].endswith("...")
+
+
+def test_statement_text_collapses_whitespace():
+    assert statement_text("SELECT *\n    FROM incidents\n  WHERE city = %s", None) == (
+        "SELECT * FROM incidents WHERE city = %s"
+    )
+
+
+def test_explain_query_prefixes_strings_and_composed():
+    assert explain_query("SELECT 1", analyze=True) == "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) SELECT 1"
+    composed = explain_query(sql.SQL("DELETE FROM {}").format(sql.Identifier("t")), analyze=False)
+    assert isinstance(composed, sql.Composed)
+
+
+def test_should_capture_applies_threshold_kind_and_cooldown(monkeypatch):
+    monkeypatch.setattr(instrumentation, "SLOW_QUERY_MS", 100.0)
+    monkeypatch.setattr(instrumentation, "SLOW_QUERY_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(instrumentation, "_last_captured", {})
+
+    assert not should_capture("SELECT 1", 50)
+    assert not should_capture("CREATE TEMP TABLE t (x int)", 500)
+    assert should_capture("SELECT 1", 500)
+    assert not should_capture("SELECT 1", 500)  # same shape, inside the cooldown
+    assert should_capture("SELECT 2", 500)
+
+    monkeypatch.setattr(instrumentation, "SLOW_QUERY_SAMPLE_RATE", 0.0)
+    assert not should_capture("SELECT 3", 500)
+
+
+def test_may_analyze_only_plain_queries():
+    assert may_analyze("SELECT * FROM incidents WHERE city = %s")
+    assert may_analyze("WITH page AS (SELECT 1) SELECT * FROM page")
+    assert not may_analyze("WITH moved AS (DELETE FROM incidents RETURNING id) SELECT 1")
+    assert not may_analyze("VALUES (1)")
+    assert not may_analyze("INSERT INTO incidents VALUES (%s)")
+
+
+def test_function_names_lists_call_candidates():
+    assert function_names("SELECT ensure_incident_partitions(%s, %s, %s), COUNT (*) FROM t WHERE x IN (1)") == [
+        "count",
+        "ensure_incident_partitions",
+        "in",
+    ]
@@ -0,0 +1,69 @@
+import threading
+import time
+
+import pytest
+
+from packages.ingestion.pipeline import PipelineStats, run_pipeline
+
+
+def test_run_pipeline_preserves_order_and_batches():
+    stats = PipelineStats()
+
+    batches = list(
+        run_pipeline(range(10), lambda rows: [row * 2 for row in rows], batch_size=4, stats=stats)
+    )
+
+    assert batches == [[0, 2, 4, 6], [8, 10, 12, 14], [16, 18]]
+    assert stats["fetch"].batches == 3
+    assert stats["normalize"].batches == 3
+    assert stats["write"].batches == 3
+
+
+def test_run_pipeline_applies_backpressure():
+    produced = []
+
+    def source():
+        for idx in range(100):
+            produced.append(idx)
+            yield idx
+
+    pipeline = run_pipeline(source(), list, batch_size=1, max_buffered_batches=2)
+    first = next(pipeline)
+    time.sleep(0.2)
+
+    # One batch held by the consumer, two per queue, one in each worker thread.
+    assert first == [0]
+    assert len(produced) <= 1 + 2 + 1 + 2 + 1
+    pipeline.close()
+
+
+def test_run_pipeline_overlaps_fetch_with_write():
+    def slow_source():
+        for idx in range(4):
+            time.sleep(0.05)
+            yield idx
+
+    started = time.perf_counter()
+    for _ in run_pipeline(slow_source(), list, batch_size=1):
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.05 * 8 * 0.8
+
+
+def test_run_pipeline_propagates_stage_errors():
+    def transform(rows):
+        raise ValueError("bad batch")
+
+    with pytest.raises(ValueError, match="bad batch"):
+        list(run_pipeline(range(3), transform, batch_size=1))
+
+
+def test_run_pipeline_stops_threads_when_consumer_fails():
+    before = threading.active_count()
+
+    with pytest.raises(RuntimeError):
+        for _ in run_pipeline(iter(range(1000)), list, batch_size=1, max_buffered_batches=1):
+            raise RuntimeError("writer failed")
+
+    assert threading.active_count() == before
@@ -0,0 +1,75 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from packages.ingestion.clients import AsyncSocrataClient, SocrataRequest
+from packages.ingestion.tests.fake_socrata import FakeSocrata
+
+
+def _rows(days, per_day):
+    rows = []
+    for day in range(days):
+        for idx in range(per_day):
+            stamp = datetime(2024, 1, 1) + timedelta(days=day, minutes=idx)
+            rows.append({":id": f"row-{day:02d}-{idx:03d}", "id": f"{day}-{idx}", "date": stamp.isoformat()})
+    return rows
+
+
+def _collect(client, request, **kwargs):
+    async def run():
+        async with client:
+            return [row async for row in client.fetch_range(request, **kwargs)]
+
+    return asyncio.run(run())
+
+
+def test_fetch_range_fans_out_slices_in_order():
+    with FakeSocrata(_rows(days=6, per_day=5), latency=0.05) as server:
+        client = AsyncSocrataClient(server.url, page_size=2, concurrency=3)
+        request = SocrataRequest(dataset_id="abcd", params={"$select": "*"}, keyset_column=":id")
+
+        rows = _collect(
+            client,
+            request,
+            column="date",
+            start=datetime(2024, 1, 1),
+            end=datetime(2024, 1, 7),
+            slice_size=timedelta(days=1),
+        )
+
+    assert [row["date"] for row in rows] == sorted(row["date"] for row in _rows(6, 5))
+    assert all(":id" not in row for row in rows)
+    assert 1 < server.peak <= 3
+
+
+def test_fetch_range_unordered_yields_every_row_once():
+    with FakeSocrata(_rows(days=4, per_day=3)) as server:
+        client = AsyncSocrataClient(server.url, page_size=10, concurrency=4)
+        request = SocrataRequest(dataset_id="abcd", params={"$select": "*"})
+
+        rows = _collect(
+            client,
+            request,
+            column="date",
+            start=datetime(2024, 1, 1),
+            end=datetime(2024, 1, 5),
+            slice_size=timedelta(hours=12),
+            ordered=False,
+        )
+
+    assert sorted(row["id"] for row in rows) == sorted(row["id"] for row in _rows(4, 3))
+
+
+def test_fetch_range_honours_limit():
+    with FakeSocrata(_rows(days=3, per_day=4)) as server:
+        client = AsyncSocrataClient(server.url, page_size=2, concurrency=2)
+        request = SocrataRequest(dataset_id="abcd", params={"$select": "*"}, limit=5, keyset_column=":id")
+
+        rows = _collect(
+            client,
+            request,
+            column="date",
+            start=datetime(2024, 1, 1),
+            end=datetime(2024, 1, 4),
+        )
+
+    assert [row["id"] for row in rows] == ["0-0", "0-1", "0-2", "0-3", "1-0"]
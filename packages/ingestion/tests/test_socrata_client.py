@@ -0,0 +1,147 @@
+import re
+
+import pytest
+
+from packages.ingestion.clients import SocrataClient, SocrataRequest
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    """Serves ``rows`` honouring $limit/$offset or a ``:id > 'x'`` keyset clause."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.calls.append(dict(params))
+        rows = sorted(self.rows, key=lambda row: row[":id"])
+        where = params.get("$where", "")
+        if ":id > '" in where:
+            last = where.split(":id > '")[1].rstrip("'")
+            rows = [row for row in rows if row[":id"] > last]
+        offset = int(params.get("$offset", 0))
+        limit = int(params["$limit"])
+        return FakeResponse([dict(row) for row in rows[offset : offset + limit]])
+
+
+def _rows(count):
+    return [{":id": f"row-{idx:03d}", "id": str(idx)} for idx in range(count)]
+
+
+def test_fetch_rows_offset_paging():
+    session = FakeSession(_rows(7))
+    client = SocrataClient("https://example.test", page_size=3, session=session)
+
+    rows = list(client.fetch_rows(SocrataRequest(dataset_id="abcd", params={"$select": "*, :id"})))
+
+    assert [row["id"] for row in rows] == [str(idx) for idx in range(7)]
+    assert [call["$offset"] for call in session.calls] == [0, 3, 6]
+
+
+def test_fetch_rows_keyset_paging_resumes_after_last_seen():
+    session = FakeSession(_rows(7))
+    client = SocrataClient("https://example.test", page_size=3, session=session)
+    request = SocrataRequest(
+        dataset_id="abcd",
+        params={"$select": "*", "$where": "date >= '2024-01-01'"},
+        keyset_column=":id",
+    )
+
+    rows = list(client.fetch_rows(request))
+
+    assert [row["id"] for row in rows] == [str(idx) for idx in range(7)]
+    assert all(":id" not in row for row in rows)
+    assert all("$offset" not in call for call in session.calls)
+    assert session.calls[0]["$select"] == "*, :id"
+    assert session.calls[0]["$order"] == ":id ASC"
+    assert session.calls[0]["$where"] == "(date >= '2024-01-01')"
+    assert session.calls[1]["$where"] == "(date >= '2024-01-01') AND :id > 'row-002'"
+    assert len(session.calls) == 3
+
+
+def test_fetch_rows_keyset_respects_limit():
+    session = FakeSession(_rows(10))
+    client = SocrataClient("https://example.test", page_size=4, session=session)
+    request = SocrataRequest(dataset_id="abcd", params={"$select": "*"}, limit=5, keyset_column=":id")
+
+    rows = list(client.fetch_rows(request))
+
+    assert len(rows) == 5
+    assert [call["$limit"] for call in session.calls] == [4, 1]
+
+
+def test_fetch_rows_keyset_rejects_foreign_order():
+    client = SocrataClient("https://example.test", session=FakeSession([]))
+    request = SocrataRequest(dataset_id="abcd", params={"$order": "date ASC"}, keyset_column=":id")
+
+    with pytest.raises(ValueError):
+        list(client.fetch_rows(request))
+
+
+class CompositeKeySession:
+    """Serves rows ordered by (updated_on, :id), honouring the pager's resume predicate."""
+
+    def __init__(self, rows):
+        self.rows = sorted(rows, key=lambda row: (row["updated_on"], row[":id"]))
+        self.calls = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.calls.append(dict(params))
+        rows = self.rows
+        match = re.search(
+            r"\(\(updated_on > '([^']*)'\) OR \(updated_on = '[^']*' AND :id > '([^']*)'\)\)",
+            params.get("$where", ""),
+        )
+        if match:
+            after = (match.group(1), match.group(2))
+            rows = [row for row in rows if (row["updated_on"], row[":id"]) > after]
+        return FakeResponse([dict(row) for row in rows[: int(params["$limit"])]])
+
+
+def test_fetch_rows_composite_keyset_pages_through_ties():
+    # Five rows share one updated_on, more than a page: a single-column
+    # updated_on cursor would skip or repeat rows at the page boundary.
+    rows = [{":id": f"row-{idx}", "id": str(idx), "updated_on": "2025-01-01T00:00:00.000"} for idx in range(5)]
+    rows.append({":id": "row-0", "id": "9", "updated_on": "2025-01-02T00:00:00.000"})
+    session = CompositeKeySession(rows)
+    client = SocrataClient("https://example.test", page_size=2, session=session)
+    request = SocrataRequest(dataset_id="abcd", params={"$select": "*"}, keyset_column=("updated_on", ":id"))
+
+    fetched = list(client.fetch_rows(request))
+
+    assert [row["id"] for row in fetched] == ["0", "1", "2", "3", "4", "9"]
+    assert session.calls[0]["$select"] == "*, :id"
+    assert session.calls[0]["$order"] == "updated_on ASC, :id ASC"
+    assert session.calls[1]["$where"] == (
+        "((updated_on > '2025-01-01T00:00:00.000') OR "
+        "(updated_on = '2025-01-01T00:00:00.000' AND :id > 'row-1'))"
+    )
+
+
+def test_fetch_rows_composite_keyset_resumes_from_start_key():
+    rows = [{":id": f"row-{idx}", "id": str(idx), "updated_on": "2025-01-01T00:00:00.000"} for idx in range(5)]
+    session = CompositeKeySession(rows)
+    client = SocrataClient("https://example.test", page_size=10, session=session)
+    request = SocrataRequest(
+        dataset_id="abcd",
+        params={"$select": "*, :id"},
+        keyset_column=("updated_on", ":id"),
+        keyset_start=("2025-01-01T00:00:00.000", "row-2"),
+    )
+
+    fetched = list(client.fetch_rows(request))
+
+    assert [row[":id"] for row in fetched] == ["row-3", "row-4"]
@@ -0,0 +1,151 @@
+"""``upsert_incidents`` counts and summary upkeep, checked for both methods.
+
+Needs a migrated database: set ``CRIMEGRID_TEST_DSN`` to run. Rows are
+written under throwaway cities and removed afterwards.
+"""
+
+import dataclasses
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import psycopg
+import pytest
+
+from packages.ingestion.db import get_connection
+from packages.ingestion.db.operations import UPSERT_METHODS, ensure_source, upsert_incidents
+from packages.ingestion.models import NormalizedIncident
+
+
+TEST_DSN = os.getenv("CRIMEGRID_TEST_DSN")
+TEST_CITY = "upsert_counts"
+
+pytestmark = pytest.mark.skipif(not TEST_DSN, reason="CRIMEGRID_TEST_DSN not set")
+
+
+def _incidents(count):
+    base = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    return [
+        NormalizedIncident(
+            city=TEST_CITY,
+            source_slug=TEST_CITY,
+            row_uid=f"row-{idx}",
+            occurred_at=base + timedelta(hours=idx),
+            reported_at=base,
+            last_updated_at=base,
+            primary_type="THEFT",
+            description="ORIGINAL",
+            latitude=41.8 + idx / 1000,
+            longitude=-87.6,
+            raw_record={"id": idx},
+        )
+        for idx in range(count)
+    ]
+
+
+def _cleanup(conn):
+    with conn.cursor() as cur:
+        for table in ("incidents", "incident_daily_summary", "tile_invalidations"):
+            cur.execute(f"DELETE FROM {table} WHERE city = %s", (TEST_CITY,))
+    conn.commit()
+
+
+@pytest.fixture
+def conn():
+    try:
+        psycopg.connect(TEST_DSN).close()
+    except psycopg.OperationalError as exc:
+        pytest.skip(f"test database unavailable: {exc}")
+
+    with get_connection(dsn=TEST_DSN) as connection:
+        _cleanup(connection)
+        try:
+            yield connection
+        finally:
+            connection.rollback()
+            _cleanup(connection)
+            with connection.cursor() as cur:
+                cur.execute("DELETE FROM sources WHERE city = %s", (TEST_CITY,))
+            connection.commit()
+
+
+def test_copy_and_row_methods_report_identical_counts(conn):
+    source_id = ensure_source(conn, city=TEST_CITY, portal_slug=TEST_CITY, name="Upsert counts", api_base="local")
+    first = _incidents(6)
+    changed = [dataclasses.replace(incident, description="REVISED") for incident in first]
+    moved = [
+        dataclasses.replace(incident, occurred_at=incident.occurred_at + timedelta(days=400)) if idx < 2 else incident
+        for idx, incident in enumerate(changed)
+    ]
+    phases = [first, first, changed, moved]
+
+    counts = {}
+    for method in UPSERT_METHODS:
+        counts[method] = [
+            upsert_incidents(conn, source_id=source_id, incidents=batch, method=method) for batch in phases
+        ]
+        with conn.cursor() as cur:
+            cur.execute("SELECT COUNT(*) AS rows, COUNT(DISTINCT id) AS ids FROM incidents WHERE city = %s", (TEST_CITY,))
+            assert cur.fetchone() == {"rows": 6, "ids": 6}
+        _cleanup(conn)
+
+    assert counts["copy"] == [(6, 0, 0), (0, 0, 6), (0, 6, 0), (0, 2, 4)]
+    assert counts["row"] == counts["copy"]
+
+
+@pytest.mark.parametrize("method", UPSERT_METHODS)
+def test_summary_last_occurred_at_drops_when_latest_incident_moves(conn, method):
+    source_id = ensure_source(conn, city=TEST_CITY, portal_slug=TEST_CITY, name="Upsert counts", api_base="local")
+    first = _incidents(3)
+    upsert_incidents(conn, source_id=source_id, incidents=first, method=method)
+    retyped = dataclasses.replace(first[1], primary_type="BATTERY")
+    moved = dataclasses.replace(first[2], occurred_at=first[2].occurred_at + timedelta(days=1))
+    upsert_incidents(conn, source_id=source_id, incidents=[retyped, moved], method=method)
+
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT day, primary_type, incident_count, last_occurred_at
+            FROM incident_daily_summary
+            WHERE city = %s
+            ORDER BY day, primary_type
+            """,
+            (TEST_CITY,),
+        )
+        rows = [tuple(row.values()) for row in cur.fetchall()]
+
+    day = first[0].occurred_at.date()
+    assert rows == [
+        (day, "BATTERY", 1, first[1].occurred_at),
+        (day, "THEFT", 1, first[0].occurred_at),
+        (day + timedelta(days=1), "THEFT", 1, moved.occurred_at),
+    ]
+
+
+def test_concurrent_writers_keep_summary_in_step(conn):
+    source_id = ensure_source(conn, city=TEST_CITY, portal_slug=TEST_CITY, name="Upsert counts", api_base="local")
+    rounds = 5
+    barrier = threading.Barrier(2)
+
+    def write(method):
+        with get_connection(dsn=TEST_DSN) as own:
+            for round_ in range(rounds):
+                batch = [
+                    dataclasses.replace(incident, row_uid=f"{round_}-{incident.row_uid}") for incident in _incidents(200)
+                ]
+                barrier.wait()
+                upsert_incidents(own, source_id=source_id, incidents=batch, method=method)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        for future in [pool.submit(write, method) for method in UPSERT_METHODS]:
+            future.result()
+
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) AS n FROM incidents WHERE city = %s", (TEST_CITY,))
+        stored = cur.fetchone()["n"]
+        cur.execute("SELECT SUM(incident_count) AS n FROM incident_daily_summary WHERE city = %s", (TEST_CITY,))
+        summarized = cur.fetchone()["n"]
+
+    assert stored == rounds * 200
+    assert summarized == stored